@@ -13,4 +13,6 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Config.settings')
 
+# جریان‌های Server-Sent Events (مانند /api/seats/stream/) فقط روی سرور ASGI اجرا می‌شوند،
+# مثلاً: uvicorn Config.asgi:application
 application = get_asgi_application()
@@ -48,6 +48,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'EducationApp.middleware.StaticFilesMiddleware',
+    'EducationApp.middleware.AdmissionControlMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -92,10 +94,15 @@ USE_TZ = True
 
 
 STATIC_URL = '/static/'
-if DEBUG:
-    STATICFILES_DIRS = [os.path.join(BASE_DIR,"static")]
-else:
-    STATIC_ROOT = os.path.join(BASE_DIR, "static")
+STATICFILES_DIRS = [os.path.join(BASE_DIR,"static")]
+# خروجی collectstatic: نام‌های hash شده، staticfiles.json و نسخه‌های gz/br (EducationApp/storage.py)
+# در حالت غیر DEBUG پیش از اجرا باید collectstatic اجرا شود (README)؛ StaticFilesMiddleware این فایل‌ها را سرو می‌کند.
+# اجراکننده تست (SnapshotTestRunner) به جای آن ذخیره‌ساز ساده بدون manifest را به کار می‌برد.
+STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'EducationApp.storage.CompressedManifestStaticFilesStorage'},
+}
 MEDIA_URL = '/media/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -105,5 +112,62 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+    },
+    # کلاس‌ها، ثبت‌نام‌ها و تخصیص‌های ترم‌های بسته‌شده (EducationApp/archive.py)
+    # پیش از اولین بایگانی: python manage.py migrate --database=archive
+    'archive': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'archive.sqlite3',
+    },
+}
+DATABASE_ROUTERS = ['EducationApp.routers.ArchiveRouter']
+
+# مدت نگهداری رکوردهای حذف‌شده برای همگام‌سازی modified_since (روز)؛ دستور prune_tombstones
+# رکوردهای قدیمی‌تر را پاک می‌کند و کلاینتی که آخرین همگام‌سازی‌اش قدیمی‌تر است باید همه داده را دوباره بخواند
+TOMBSTONE_RETENTION_DAYS = 90
+
+# کش مشترک بین پردازه‌های سرور تا باطل‌سازی کش در همه پردازه‌ها دیده شود
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+        'TIMEOUT': 60 * 60,
+        'OPTIONS': {'MAX_ENTRIES': 50000},
     }
 }
+
+# snapshotهای آماده پایگاه داده برای تست و بنچمارک (EducationApp/snapshots.py)
+SNAPSHOT_DIR = BASE_DIR / 'snapshots'
+TEST_RUNNER = 'EducationApp.snapshots.SnapshotTestRunner'
+
+# سقف تعداد زیردرخواست‌ها و رشته‌های اجرای موازی در endpoint دسته‌ای /api/batch/
+BATCH_MAX_REQUESTS = 20
+BATCH_MAX_WORKERS = 4
+
+# رندرکننده‌های سریع JSON (orjson) و MessagePack با انتخاب بر اساس هدر Accept (EducationApp/renderers.py)
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'EducationApp.renderers.FastJSONRenderer',
+        'EducationApp.renderers.MessagePackRenderer',
+    ],
+    'DEFAULT_CONTENT_NEGOTIATION_CLASS': 'EducationApp.renderers.AvailableContentNegotiation',
+    # محدودسازی token bucket به ازای کاربر و دسته endpoint (EducationApp/throttling.py)
+    'DEFAULT_THROTTLE_CLASSES': ['EducationApp.throttling.TokenBucketThrottle'],
+    'DEFAULT_THROTTLE_RATES': {
+        'default': '300/min',
+        'default.write': '60/min',
+        'registration': '120/min',
+        'registration.write': '20/min',
+    },
+}
+
+# فایل SQLite مشترک بین پردازه‌ها برای سطل‌های توکن و صف پذیرش
+THROTTLE_DB = BASE_DIR / 'throttle.sqlite3'
+# صف پذیرش درخواست‌های نوشتنی API (EducationApp/middleware.py)
+ADMISSION_CONTROL = {
+    'limit': 4,
+    'queue': 32,
+    'timeout': 5,
+    'retry_after': 2,
+    'path_prefix': '/EducationApp/api/',
+}
@@ -1,3 +1,277 @@
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.utils.functional import cached_property
+from .models import (
+    Faculty, Major, Student, Professor, Course, Term, Room, Class, Enrollment, CourseAssignment, ContactInfo,
+    CoursePrerequisite, CoursePrerequisiteClosure, ChangeEvent, Tombstone, Job, RankingCohort, StudentRanking,
+    StudentArchiveSummary, ArchivedClass, ArchivedEnrollment, ArchivedCourseAssignment,
+)
 
-# Register your models here.
+# برای جدول‌های بزرگ‌تر از این تعداد، تعداد کل بدون فیلتر از آمار پایگاه داده خوانده می‌شود
+ESTIMATED_COUNT_THRESHOLD = 100_000
+
+
+def estimated_count(model, using):
+    """
+    تعداد تقریبی سطرهای جدول از آمار پایگاه داده (بدون اسکن کامل جدول)
+    PostgreSQL: pg_class.reltuples، MySQL: information_schema و SQLite: جدول sqlite_stat1 (پس از ANALYZE)
+    اگر آماری در دسترس نباشد None برمی‌گردد.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    queries = {
+        'postgresql': 'SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)',
+        'mysql': 'SELECT table_rows FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = %s',
+        'sqlite': 'SELECT CAST(stat AS INTEGER) FROM sqlite_stat1 WHERE tbl = %s LIMIT 1',
+    }
+    if connection.vendor not in queries:
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(queries[connection.vendor], [table])
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    if not row or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    صفحه‌بندی با تعداد تقریبی برای لیست بدون فیلتر جدول‌های بزرگ
+    با فیلتر یا جستجو (که روی ستون‌های ایندکس‌شده اجرا می‌شوند) تعداد دقیق شمرده می‌شود.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_count(queryset.model, queryset.db)
+            if estimate is not None and estimate > ESTIMATED_COUNT_THRESHOLD:
+                return estimate
+        return super().count
+
+
+class BaseAdmin(admin.ModelAdmin):
+    """
+    پایه مدیریت مدل‌ها؛ روابط list_select_related در همه کوئری‌های مدیر (از جمله جستجوی
+    autocomplete که __str__ هر نتیجه را نمایش می‌دهد) با join خوانده می‌شوند.
+    """
+    list_per_page = 50
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_ordering(self, request):
+        # ترتیب پایدار برای صفحه‌بندی مدل‌هایی که ترتیب پیش‌فرض ندارند
+        return self.ordering or self.model._meta.ordering or ['-pk']
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if isinstance(self.list_select_related, (list, tuple)) and self.list_select_related:
+            queryset = queryset.select_related(*self.list_select_related)
+        return queryset
+
+
+class AdminQuerysetListFilter(admin.RelatedFieldListFilter):
+    """فیلتر رابطه‌ای که گزینه‌هایش را از get_queryset مدیر مدل مقصد (همراه با روابط join شده) می‌سازد"""
+
+    def field_choices(self, field, request, model_admin):
+        related_admin = model_admin.admin_site._registry.get(field.remote_field.model)
+        if related_admin is None:
+            return super().field_choices(field, request, model_admin)
+        ordering = self.field_admin_ordering(field, request, model_admin)
+        return [(obj.pk, str(obj)) for obj in related_admin.get_queryset(request).order_by(*ordering)]
+
+
+class ReadOnlyAdmin(BaseAdmin):
+    """مدیریت فقط خواندنی برای جدول‌هایی که توسط خود برنامه پر می‌شوند"""
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(Faculty)
+class FacultyAdmin(BaseAdmin):
+    list_display = ['name', 'updated_at']
+    search_fields = ['name']
+
+
+@admin.register(Major)
+class MajorAdmin(BaseAdmin):
+    list_display = ['name', 'faculty']
+    list_select_related = ['faculty']
+    list_filter = ['faculty']
+    search_fields = ['name']
+
+
+@admin.register(Student)
+class StudentAdmin(BaseAdmin):
+    list_display = ['student_id', 'first_name', 'last_name', 'national_id', 'major', 'entry_year', 'graduation_status']
+    list_select_related = ['major__faculty']
+    list_filter = ['graduation_status', 'entry_year', ('major', AdminQuerysetListFilter)]
+    search_fields = ['=student_id', '=national_id', '^last_name']
+    autocomplete_fields = ['major']
+    readonly_fields = ['birth_date_gregorian', 'birth_month']
+
+
+@admin.register(Professor)
+class ProfessorAdmin(BaseAdmin):
+    list_display = ['professor_id', 'first_name', 'last_name', 'national_id', 'faculty', 'contract_type']
+    list_select_related = ['faculty']
+    list_filter = ['faculty']
+    search_fields = ['=professor_id', '=national_id', '^last_name']
+    autocomplete_fields = ['faculty']
+    readonly_fields = ['birth_date_gregorian', 'birth_month']
+
+
+@admin.register(Course)
+class CourseAdmin(BaseAdmin):
+    list_display = ['code', 'name', 'credits', 'major', 'term']
+    list_select_related = ['major__faculty', 'term']
+    list_filter = ['term', ('major', AdminQuerysetListFilter)]
+    search_fields = ['^code', 'name']
+    autocomplete_fields = ['major', 'term']
+
+
+@admin.register(Term)
+class TermAdmin(BaseAdmin):
+    list_display = ['__str__', 'year', 'season', 'is_current']
+    list_filter = ['is_current']
+    search_fields = ['=year']
+
+
+@admin.register(Room)
+class RoomAdmin(BaseAdmin):
+    list_display = ['name', 'building', 'capacity']
+    list_filter = ['building']
+    search_fields = ['^name', '^building']
+
+
+@admin.register(Class)
+class ClassAdmin(BaseAdmin):
+    list_display = ['__str__', 'course', 'room', 'day_of_week', 'start_time', 'end_time']
+    list_select_related = ['course', 'room']
+    list_filter = ['course__term']
+    search_fields = ['^course__code']
+    autocomplete_fields = ['course', 'room']
+
+
+@admin.register(Enrollment)
+class EnrollmentAdmin(BaseAdmin):
+    list_display = ['__str__', 'grade', 'status', 'updated_at']
+    list_select_related = ['student', 'class_instance__course']
+    list_filter = ['class_instance__course__term']
+    search_fields = ['=student__student_id', '^class_instance__course__code']
+    autocomplete_fields = ['student', 'class_instance']
+    readonly_fields = ['status']
+
+
+@admin.register(CourseAssignment)
+class CourseAssignmentAdmin(BaseAdmin):
+    list_display = ['__str__', 'updated_at']
+    list_select_related = ['professor', 'class_instance__course']
+    list_filter = ['class_instance__course__term']
+    search_fields = ['=professor__professor_id', '^class_instance__course__code']
+    autocomplete_fields = ['professor', 'class_instance']
+
+
+@admin.register(ContactInfo)
+class ContactInfoAdmin(BaseAdmin):
+    list_display = ['value', 'contact_type', 'content_type', 'object_id']
+    list_select_related = ['content_type']
+    list_filter = ['content_type']
+    search_fields = ['=normalized_value']
+    readonly_fields = ['normalized_value']
+
+    def get_queryset(self, request):
+        # __str__ صاحب اطلاعات تماس را نمایش می‌دهد؛ با prefetch برای هر نوع مدل یک کوئری اجرا می‌شود
+        return super().get_queryset(request).prefetch_related('person')
+
+
+@admin.register(CoursePrerequisite)
+class CoursePrerequisiteAdmin(BaseAdmin):
+    list_display = ['course', 'prerequisite']
+    list_select_related = ['course', 'prerequisite']
+    search_fields = ['^course__code', '^prerequisite__code']
+    autocomplete_fields = ['course', 'prerequisite']
+
+
+@admin.register(CoursePrerequisiteClosure)
+class CoursePrerequisiteClosureAdmin(ReadOnlyAdmin):
+    list_display = ['course', 'prerequisite']
+    list_select_related = ['course', 'prerequisite']
+    search_fields = ['^course__code']
+
+
+@admin.register(ChangeEvent)
+class ChangeEventAdmin(ReadOnlyAdmin):
+    list_display = ['id', 'model', 'object_id', 'action', 'created_at']
+    list_filter = ['model', 'action']
+    search_fields = ['=object_id']
+
+
+@admin.register(Tombstone)
+class TombstoneAdmin(ReadOnlyAdmin):
+    list_display = ['model', 'object_id', 'deleted_at']
+    list_filter = ['model']
+    search_fields = ['=object_id']
+
+
+@admin.register(Job)
+class JobAdmin(ReadOnlyAdmin):
+    list_display = ['id', 'kind', 'status', 'progress', 'worker', 'created_at', 'finished_at']
+    list_filter = ['status', 'kind']
+
+    def has_delete_permission(self, request, obj=None):
+        # پاک کردن کارهای قدیمی مجاز است
+        return admin.ModelAdmin.has_delete_permission(self, request, obj)
+
+
+@admin.register(RankingCohort)
+class RankingCohortAdmin(ReadOnlyAdmin):
+    list_display = ['major', 'entry_year', 'size', 'is_stale', 'refreshed_at']
+    list_select_related = ['major__faculty']
+    list_filter = ['is_stale']
+
+
+@admin.register(StudentRanking)
+class StudentRankingAdmin(ReadOnlyAdmin):
+    list_display = ['student', 'major', 'entry_year', 'rank', 'gpa']
+    list_select_related = ['student', 'major__faculty']
+    search_fields = ['=student__student_id']
+
+
+@admin.register(StudentArchiveSummary)
+class StudentArchiveSummaryAdmin(ReadOnlyAdmin):
+    list_display = ['student', 'graded_credits', 'grade_points', 'passed_credits']
+    list_select_related = ['student']
+    search_fields = ['=student__student_id']
+
+
+@admin.register(ArchivedClass)
+class ArchivedClassAdmin(ReadOnlyAdmin):
+    list_display = ['id', 'course_code', 'course_name', 'term_year', 'term_season', 'day_of_week', 'start_time']
+    list_filter = ['term_year', 'term_season']
+    search_fields = ['^course_code']
+
+
+@admin.register(ArchivedEnrollment)
+class ArchivedEnrollmentAdmin(ReadOnlyAdmin):
+    list_display = ['id', 'student_id', 'class_instance', 'grade', 'status']
+    list_select_related = ['class_instance']
+    search_fields = ['=student_id']
+
+
+@admin.register(ArchivedCourseAssignment)
+class ArchivedCourseAssignmentAdmin(ReadOnlyAdmin):
+    list_display = ['id', 'professor_id', 'class_instance']
+    list_select_related = ['class_instance']
+    search_fields = ['=professor_id']
@@ -0,0 +1,225 @@
+"""
+بایگانی ترم‌های بسته‌شده در پایگاه داده جداگانه archive
+
+کلاس‌ها، ثبت‌نام‌ها و تخصیص استادهای ترم‌های گذشته با همان شناسه‌ها به پایگاه داده archive
+منتقل و از پایگاه داده اصلی حذف می‌شوند تا جدول‌های جاری و ایندکس‌هایشان فقط داده ترم‌های
+باز را نگه دارند (مسیریابی در routers.py).
+
+مجموع واحدها و نمرات بایگانی‌شده هر دانشجو در StudentArchiveSummary (در پایگاه داده اصلی) جمع
+می‌شود؛ معدل، واحدهای گذرانده، رتبه‌بندی و فارغ‌التحصیلی این خلاصه را به ثبت‌نام‌های جاری اضافه
+می‌کنند و کارنامه و بررسی پیش‌نیازها ثبت‌نام‌های بایگانی‌شده را مستقیماً از archive می‌خوانند.
+"""
+from django.db import transaction
+from django.db.models import F, FloatField, IntegerField, Value
+from django.db.models.functions import Coalesce
+from .caching import bump_cache_version
+from .models import (
+    Term, Class, Enrollment, CourseAssignment, ChangeEvent, Tombstone, StudentArchiveSummary,
+    ArchivedClass, ArchivedEnrollment, ArchivedCourseAssignment, PASSING_GRADE,
+)
+from .routers import ARCHIVE_DATABASE
+from .workers import batched
+
+# تعداد کلاس‌های هر دسته انتقال
+DEFAULT_BATCH_SIZE = 500
+INSERT_BATCH_SIZE = 2000
+# سقف تعداد شناسه در هر کوئری IN
+DELETE_BATCH_SIZE = 900
+
+
+def archived_graded_credits():
+    """عبارت واحدهای دارای نمره بایگانی‌شده دانشجو (صفر برای دانشجوی بدون بایگانی)"""
+    return Coalesce(F('archive_summary__graded_credits'), Value(0), output_field=IntegerField())
+
+
+def archived_grade_points():
+    """عبارت مجموع نمره × واحد بایگانی‌شده دانشجو"""
+    return Coalesce(F('archive_summary__grade_points'), Value(0.0), output_field=FloatField())
+
+
+def archived_passed_credits():
+    """عبارت واحدهای گذرانده بایگانی‌شده دانشجو"""
+    return Coalesce(F('archive_summary__passed_credits'), Value(0), output_field=IntegerField())
+
+
+def archivable_terms(before_year=None):
+    """
+    ترم‌های پیش از before_year (پیش‌فرض: سال ترم جاری)؛ ترم جاری هرگز بایگانی نمی‌شود
+    before_year بعد از سال ترم جاری با ValueError رد می‌شود تا ترم‌های دیگر سال جاری بایگانی نشوند.
+    """
+    current = Term.objects.filter(is_current=True).values_list('year', flat=True).first()
+    if before_year is None:
+        if current is None:
+            return Term.objects.none()
+        before_year = current
+    elif current is not None and int(before_year) > int(current):
+        raise ValueError(f'سال {before_year} بعد از سال ترم جاری ({current}) است.')
+    return Term.objects.filter(year__lt=str(before_year), is_current=False).order_by('year', 'season')
+
+
+def _archive_rows(classes, enrollments, assignments):
+    """کپی سطرها در archive با همان شناسه‌ها؛ اجرای دوباره پس از قطع شدن کار سطر تکراری نمی‌سازد"""
+    with transaction.atomic(using=ARCHIVE_DATABASE):
+        ArchivedClass.objects.bulk_create(
+            [
+                ArchivedClass(
+                    id=row['id'], course_id=row['course_id'], course_code=row['course__code'],
+                    course_name=row['course__name'], credits=row['course__credits'],
+                    term_id=row['course__term_id'], term_year=row['course__term__year'],
+                    term_season=row['course__term__season'], room_id=row['room_id'],
+                    day_of_week=row['day_of_week'], start_time=row['start_time'], end_time=row['end_time'],
+                )
+                for row in classes
+            ],
+            batch_size=INSERT_BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+        ArchivedEnrollment.objects.bulk_create(
+            [
+                ArchivedEnrollment(
+                    id=enrollment.pk, class_instance_id=enrollment.class_instance_id,
+                    student_id=enrollment.student_id, grade=enrollment.grade, status=enrollment.status,
+                )
+                for enrollment in enrollments
+            ],
+            batch_size=INSERT_BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+        ArchivedCourseAssignment.objects.bulk_create(
+            [
+                ArchivedCourseAssignment(
+                    id=pk, class_instance_id=class_id, professor_id=professor_id,
+                )
+                for pk, class_id, professor_id in assignments
+            ],
+            batch_size=INSERT_BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+
+
+def _add_to_summaries(enrollments, credits):
+    """افزودن واحدها و نمرات ثبت‌نام‌های منتقل‌شده به خلاصه بایگانی دانشجویان"""
+    totals = {}
+    for enrollment in enrollments:
+        if enrollment.grade is None:
+            continue
+        course_credits = credits[enrollment.class_instance_id]
+        summary = totals.setdefault(enrollment.student_id, [0, 0.0, 0])
+        summary[0] += course_credits
+        summary[1] += enrollment.grade * course_credits
+        if enrollment.grade >= PASSING_GRADE:
+            summary[2] += course_credits
+
+    for batch in batched(sorted(totals), DELETE_BATCH_SIZE):
+        existing = StudentArchiveSummary.objects.select_for_update().in_bulk(batch)
+        created = []
+        for student_id in batch:
+            graded, points, passed = totals[student_id]
+            summary = existing.get(student_id)
+            if summary is None:
+                created.append(StudentArchiveSummary(
+                    student_id=student_id, graded_credits=graded, grade_points=points, passed_credits=passed,
+                ))
+            else:
+                summary.graded_credits += graded
+                summary.grade_points += points
+                summary.passed_credits += passed
+        StudentArchiveSummary.objects.bulk_create(created)
+        StudentArchiveSummary.objects.bulk_update(
+            existing.values(), ['graded_credits', 'grade_points', 'passed_credits'],
+        )
+
+
+def _delete_live(model, ids, instances=None):
+    """
+    حذف دسته‌ای سطرها بدون سیگنال‌های هر سطر؛ رویداد حذف فید تغییرات و Tombstone
+    همگام‌سازی به صورت دسته‌ای در همان تراکنش ثبت می‌شوند.
+    """
+    for batch in batched(ids, DELETE_BATCH_SIZE):
+        if instances is not None:
+            ChangeEvent.record_many([instances[pk] for pk in batch], ChangeEvent.Action.DELETE)
+        Tombstone.objects.bulk_create([Tombstone(model=model._meta.model_name, object_id=pk) for pk in batch])
+        queryset = model.objects.filter(pk__in=batch)
+        queryset._raw_delete(queryset.db)
+
+
+def archive_term(term, batch_size=DEFAULT_BATCH_SIZE, dry_run=False):
+    """
+    انتقال کلاس‌ها، ثبت‌نام‌ها و تخصیص استادهای یک ترم به archive، دسته به دسته
+    هر دسته ابتدا در archive نوشته و سپس در یک تراکنش پایگاه داده اصلی حذف و به خلاصه‌ها اضافه می‌شود.
+    """
+    class_ids = list(Class.objects.filter(course__term=term).order_by('pk').values_list('pk', flat=True))
+    counts = {'classes': len(class_ids), 'enrollments': 0, 'assignments': 0}
+    if dry_run:
+        counts['enrollments'] = Enrollment.objects.filter(class_instance__course__term=term).count()
+        counts['assignments'] = CourseAssignment.objects.filter(class_instance__course__term=term).count()
+        return counts
+
+    for batch in batched(class_ids, batch_size):
+        classes = list(Class.objects.filter(pk__in=batch).values(
+            'id', 'course_id', 'course__code', 'course__name', 'course__credits', 'course__term_id',
+            'course__term__year', 'course__term__season', 'room_id', 'day_of_week', 'start_time', 'end_time',
+        ))
+        enrollments = list(Enrollment.objects.filter(class_instance_id__in=batch).order_by('pk'))
+        assignments = list(CourseAssignment.objects.filter(class_instance_id__in=batch).order_by('pk').values_list(
+            'pk', 'class_instance_id', 'professor_id',
+        ))
+        _archive_rows(classes, enrollments, assignments)
+
+        credits = {row['id']: row['course__credits'] for row in classes}
+        with transaction.atomic():
+            _add_to_summaries(enrollments, credits)
+            _delete_live(Enrollment, [enrollment.pk for enrollment in enrollments],
+                         {enrollment.pk: enrollment for enrollment in enrollments})
+            _delete_live(CourseAssignment, [pk for pk, _, _ in assignments])
+            _delete_live(Class, batch, Class.objects.in_bulk(batch))
+        counts['enrollments'] += len(enrollments)
+        counts['assignments'] += len(assignments)
+
+    if class_ids:
+        bump_cache_version('term', term.pk)
+        bump_cache_version('classes', term.pk)
+        bump_cache_version('stats')
+    return counts
+
+
+def archived_transcript_rows(student_id):
+    """ثبت‌نام‌های بایگانی‌شده دانشجو با همان کلیدهای ردیف‌های کارنامه (transcript.py)"""
+    rows = (
+        ArchivedEnrollment.objects
+        .filter(student_id=student_id)
+        .values(
+            'id', 'grade', 'status', 'class_instance_id', 'class_instance__course_id',
+            'class_instance__course_code', 'class_instance__course_name', 'class_instance__credits',
+            'class_instance__term_id', 'class_instance__term_year', 'class_instance__term_season',
+        )
+    )
+    return [
+        {
+            'id': row['id'], 'grade': row['grade'], 'status': row['status'],
+            'class_instance_id': row['class_instance_id'],
+            'class_instance__course_id': row['class_instance__course_id'],
+            'class_instance__course__code': row['class_instance__course_code'],
+            'class_instance__course__name': row['class_instance__course_name'],
+            'class_instance__course__credits': row['class_instance__credits'],
+            'class_instance__course__term_id': row['class_instance__term_id'],
+            'class_instance__course__term__year': row['class_instance__term_year'],
+            'class_instance__course__term__season': row['class_instance__term_season'],
+        }
+        for row in rows
+    ]
+
+
+def archived_passed_courses(student_id):
+    """شناسه دروسی که دانشجو در ترم‌های بایگانی‌شده پاس کرده است"""
+    return list(
+        ArchivedEnrollment.objects
+        .filter(student_id=student_id, status=Enrollment.Status.PASSED)
+        .values_list('class_instance__course_id', flat=True)
+        .distinct()
+    )
+
+
+def delete_student_archive(student_id):
+    """حذف ثبت‌نام‌های بایگانی‌شده دانشجوی حذف‌شده (بین دو پایگاه داده CASCADE وجود ندارد)"""
+    ArchivedEnrollment.objects.filter(student_id=student_id).delete()
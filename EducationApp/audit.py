@@ -0,0 +1,167 @@
+"""
+بررسی دسته‌ای صحت داده‌ها بر اساس اعتبارسنج‌های مدل‌ها
+
+به جای full_clean روی تک‌تک سطرها، هر جدول بر اساس بازه کلید اصلی به بخش‌هایی تقسیم می‌شود و
+هر بخش در یک پردازه از pool فقط با ستون‌های لازم خوانده و با اعتبارسنج‌های برداری (NumPy)
+بررسی می‌شود. تداخل زمانی کلاس‌های یک اتاق با یک پیمایش مرتب (sweep_overlaps) پیدا می‌شود.
+"""
+import numpy as np
+from .jalali import parse_jalali
+from .models import Student, Professor, ContactInfo, Enrollment, Class, phone_validator, national_id_validator
+from .timetable import sweep_overlaps
+from .workers import process_pool, pk_ranges
+
+# تعداد سطرهای هر بخش (بر اساس بازه شناسه)
+DEFAULT_CHUNK_SIZE = 20000
+ROOM_OVERLAPS = 'room_overlaps'
+
+BIRTH_DATE_MESSAGE = 'تاریخ تولد باید تاریخ شمسی معتبر با فرمت YYYY/MM/DD باشد.'
+EMAIL_MESSAGE = 'ایمیل نامعتبر است.'
+GRADE_MESSAGE = 'نمره باید بین 0 تا 20 باشد.'
+ROOM_OVERLAP_MESSAGE = 'تداخل زمانی با کلاس {other} در این اتاق وجود دارد.'
+
+
+def _strings(values):
+    return np.array(values, dtype=str) if len(values) else np.array([], dtype='U1')
+
+
+def invalid_national_ids(values):
+    """معادل برداری national_id_validator: دقیقاً 10 رقم"""
+    values = _strings(values)
+    return ~((np.char.str_len(values) == 10) & np.char.isdecimal(values))
+
+
+def invalid_birth_dates(values):
+    """تاریخ‌هایی که با قالب YYYY/MM/DD نیستند یا در تقویم شمسی وجود ندارند"""
+    return ~parse_jalali(_strings(values))[3]
+
+
+def invalid_phones(values):
+    """معادل برداری phone_validator: + اختیاری، سپس 10 تا 15 رقم (یا 16 رقم با 1 در ابتدا)"""
+    values = _strings(values)
+    digits = np.char.lstrip(values, '+')
+    signs = np.char.str_len(values) - np.char.str_len(digits)
+    lengths = np.char.str_len(digits)
+    valid_length = ((lengths >= 10) & (lengths <= 15)) | ((lengths == 16) & np.char.startswith(digits, '1'))
+    return ~((signs <= 1) & np.char.isdecimal(digits) & valid_length)
+
+
+def invalid_emails(values):
+    """معادل برداری بررسی ایمیل در ContactInfo.clean"""
+    values = _strings(values)
+    return (np.char.find(values, '@') < 0) | (np.char.find(values, '.') < 0)
+
+
+def invalid_grades(values):
+    """نمره‌های خارج از بازه 0 تا 20 (نمره خالی مجاز است)"""
+    grades = np.array(values, dtype=float)
+    return ~np.isnan(grades) & ((grades < 0) | (grades > 20))
+
+
+def check_person(columns):
+    return [
+        ('national_id', invalid_national_ids(columns['national_id']), national_id_validator.message),
+        ('birth_date', invalid_birth_dates(columns['birth_date']), BIRTH_DATE_MESSAGE),
+    ]
+
+
+def check_contact(columns):
+    emails = np.array(columns['contact_type']) == ContactInfo.ContactType.EMAIL
+    return [
+        ('value', emails & invalid_emails(columns['value']), EMAIL_MESSAGE),
+        ('value', ~emails & invalid_phones(columns['value']), phone_validator.message),
+    ]
+
+
+def check_grade(columns):
+    return [('grade', invalid_grades(columns['grade']), GRADE_MESSAGE)]
+
+
+# جدول‌های بررسی‌شده: نام ← (مدل، ستون‌ها، تابع بررسی برداری)
+AUDITS = {
+    'student': (Student, ('national_id', 'birth_date'), check_person),
+    'professor': (Professor, ('national_id', 'birth_date'), check_person),
+    'contactinfo': (ContactInfo, ('contact_type', 'value'), check_contact),
+    'enrollment': (Enrollment, ('grade',), check_grade),
+}
+
+
+def audit_chunk(task):
+    """
+    بررسی یک بخش از یک جدول با یک کوئری
+    خروجی: (نام جدول، تعداد سطرهای بررسی‌شده، تخلف‌ها به شکل (جدول، شناسه، فیلد، مقدار، پیام))
+    """
+    name, start, end = task
+    if name == ROOM_OVERLAPS:
+        return room_overlaps()
+    model, fields, check = AUDITS[name]
+    rows = list(model.objects.filter(pk__gte=start, pk__lt=end).order_by().values_list('pk', *fields))
+    if not rows:
+        return name, 0, []
+    pks, *values = zip(*rows)
+    columns = dict(zip(fields, values))
+    violations = []
+    for field, mask, message in check(columns):
+        violations.extend((name, pks[row], field, columns[field][row], message) for row in np.flatnonzero(mask))
+    violations.sort(key=lambda violation: violation[1])
+    return name, len(rows), violations
+
+
+def room_overlaps():
+    """
+    کلاس‌هایی از یک ترم که در یک اتاق و روز با هم تداخل زمانی دارند (همان شرط Class.clean)
+    کلاس‌ها مرتب بر اساس ترم، اتاق، روز و زمان شروع خوانده و با یک پیمایش بررسی می‌شوند.
+    """
+    rows = (
+        Class.objects
+        .order_by('course__term_id', 'room_id', 'day_of_week', 'start_time')
+        .values_list('course__term_id', 'room_id', 'day_of_week', 'start_time', 'end_time', 'id')
+        .iterator(chunk_size=5000)
+    )
+    count = 0
+
+    def grouped():
+        nonlocal count
+        for term_id, room_id, day, start, end, class_id in rows:
+            count += 1
+            yield (term_id, room_id, day), start, end, class_id
+
+    violations = [
+        ('class', second, 'start_time', '', ROOM_OVERLAP_MESSAGE.format(other=first))
+        for _, first, second in sweep_overlaps(grouped())
+    ]
+    return 'class', count, violations
+
+
+def audit_tasks(chunk_size=DEFAULT_CHUNK_SIZE):
+    """بخش‌های کار؛ بررسی تداخل اتاق‌ها (که یک پیمایش کامل است) اول شروع می‌شود"""
+    return [(ROOM_OVERLAPS, None, None)] + [
+        (name, start, end)
+        for name, (model, _, _) in AUDITS.items()
+        for start, end in pk_ranges(model.objects.all(), chunk_size)
+    ]
+
+
+def run_audit(write, chunk_size=DEFAULT_CHUNK_SIZE, workers=None, progress=None):
+    """
+    بررسی همه جدول‌ها؛ بخش‌ها به صورت موازی در pool پردازه‌ها بررسی و تخلف‌های هر بخش با
+    write در پردازه اصلی نوشته می‌شوند.
+    خروجی: {جدول: {'checked': تعداد سطر، 'violations': تعداد تخلف}}
+    """
+    tasks = audit_tasks(chunk_size)
+    summary = {name: {'checked': 0, 'violations': 0} for name in ['class', *AUDITS]}
+
+    def collect(results):
+        for done, (name, count, violations) in enumerate(results, 1):
+            summary[name]['checked'] += count
+            summary[name]['violations'] += len(violations)
+            write(violations)
+            if progress is not None:
+                progress(done / len(tasks))
+
+    if workers == 1 or len(tasks) <= 1:
+        collect(map(audit_chunk, tasks))
+    else:
+        with process_pool(workers) as pool:
+            collect(pool.map(audit_chunk, tasks))
+    return summary
@@ -0,0 +1,138 @@
+"""
+اجرای زیردرخواست‌های endpoint دسته‌ای (/api/batch/)
+
+زیردرخواست‌ها بدون رفت و برگشت شبکه و بدون عبور دوباره از middlewareها، مستقیماً به view
+مسیر متناظر در router داده می‌شوند. کاربر احراز هویت‌شده و نشست درخواست اصلی به همه
+زیردرخواست‌ها منتقل می‌شود و در اجرای ترتیبی از همان اتصال پایگاه داده استفاده می‌شود.
+فقط viewهای DRF (APIView و ViewSet) پذیرفته می‌شوند، پس مجوزها و محدودسازی نرخ هر
+زیردرخواست مانند درخواست مستقل بررسی می‌شود؛ viewهای ناهمگام یا جریانی (مانند seats/stream/)
+و صفحات HTML با 400 رد می‌شوند. کنترل پذیرش (AdmissionControlMiddleware) یک بار برای خود
+درخواست دسته‌ای اعمال می‌شود و نوشتن‌های آن به ترتیب در همان یک مجوز اجرا می‌شوند.
+"""
+import json
+import logging
+from asgiref.sync import iscoroutinefunction
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import urlsplit
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connections
+from django.urls import Resolver404, get_script_prefix, resolve, reverse
+from rest_framework.views import APIView
+
+logger = logging.getLogger(__name__)
+
+# مقادیر پیش‌فرض تنظیمات BATCH_MAX_REQUESTS و BATCH_MAX_WORKERS
+DEFAULT_MAX_REQUESTS = 20
+DEFAULT_MAX_WORKERS = 4
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def max_requests():
+    return getattr(settings, 'BATCH_MAX_REQUESTS', DEFAULT_MAX_REQUESTS)
+
+
+def max_workers():
+    return getattr(settings, 'BATCH_MAX_WORKERS', DEFAULT_MAX_WORKERS)
+
+
+def _path_info(path):
+    """مسیر زیردرخواست (نسبی به ریشه API یا مطلق) به صورت path_info و رشته query"""
+    parts = urlsplit(path)
+    api_root = reverse('EducationApp:api-root')
+    full_path = parts.path if parts.path.startswith('/') else api_root + parts.path
+    if not full_path.startswith(api_root):
+        return None, parts.query
+    return '/' + full_path[len(get_script_prefix()):], parts.query
+
+
+def _build_request(parent, method, path_info, query, body):
+    """ساخت درخواست WSGI زیردرخواست با هدرها و هویت درخواست اصلی"""
+    payload = b'' if body is None else json.dumps(body).encode()
+    environ = {
+        **parent._request.META,
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path_info,
+        'QUERY_STRING': query,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(payload)),
+        'wsgi.input': BytesIO(payload),
+    }
+    request = WSGIRequest(environ)
+    if hasattr(parent._request, 'session'):
+        request.session = parent._request.session
+    # احراز هویت (و بررسی CSRF) یک بار برای درخواست اصلی انجام شده است
+    request.user = parent.user
+    request._force_auth_user = parent.user
+    request._force_auth_token = parent.auth
+    request._dont_enforce_csrf_checks = True
+    return request
+
+
+def _response_body(response):
+    if hasattr(response, 'data'):
+        return response.data
+    content = response.content.decode(response.charset or 'utf-8')
+    if response.get('Content-Type', '').startswith('application/json') and content:
+        return json.loads(content)
+    return content
+
+
+def _unsupported(match):
+    """دلیل قابل اجرا نبودن view در درخواست دسته‌ای، یا None"""
+    if match.url_name == 'batch':
+        return 'درخواست دسته‌ای تودرتو مجاز نیست.'
+    view_class = getattr(match.func, 'cls', None)
+    if iscoroutinefunction(match.func) or not (isinstance(view_class, type) and issubclass(view_class, APIView)):
+        return 'این مسیر در درخواست دسته‌ای پشتیبانی نمی‌شود.'
+    return None
+
+
+def run_request(parent, item):
+    """اجرای یک زیردرخواست و برگرداندن وضعیت و بدنه پاسخ آن"""
+    result = {'id': item.get('id'), 'status': 404, 'body': {'detail': 'مسیر یافت نشد.'}}
+    try:
+        path_info, query = _path_info(item['path'])
+        if path_info is None:
+            return result
+        try:
+            match = resolve(path_info)
+        except Resolver404:
+            return result
+        reason = _unsupported(match)
+        if reason is not None:
+            result.update(status=400, body={'detail': reason})
+            return result
+
+        request = _build_request(parent, item['method'], path_info, query, item.get('body'))
+        response = match.func(request, *match.args, **match.kwargs)
+        if response.streaming:
+            response.close()
+            result.update(status=400, body={'detail': 'پاسخ جریانی در درخواست دسته‌ای پشتیبانی نمی‌شود.'})
+            return result
+        result.update(status=response.status_code, body=_response_body(response))
+    except Exception:
+        logger.exception('خطا در اجرای زیردرخواست %s %s', item['method'], item['path'])
+        result.update(status=500, body={'detail': 'خطای داخلی سرور.'})
+    return result
+
+
+def _run_in_thread(parent, item):
+    try:
+        return run_request(parent, item)
+    finally:
+        # اتصال‌های پایگاه داده هر رشته مختص همان رشته است
+        connections.close_all()
+
+
+def run_batch(parent, items, parallel=False):
+    """
+    اجرای زیردرخواست‌ها به ترتیب ارسال
+    اگر parallel درخواست شده باشد و همه زیردرخواست‌ها خواندنی باشند، به صورت موازی در
+    رشته‌ها اجرا می‌شوند؛ در غیر این صورت ترتیبی اجرا می‌شوند تا نوشتن‌ها به ترتیب انجام شوند.
+    """
+    if parallel and len(items) > 1 and all(item['method'] in SAFE_METHODS for item in items):
+        with ThreadPoolExecutor(max_workers=min(max_workers(), len(items))) as executor:
+            return list(executor.map(lambda item: _run_in_thread(parent, item), items))
+    return [run_request(parent, item) for item in items]
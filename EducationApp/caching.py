@@ -0,0 +1,35 @@
+"""
+نسخه‌بندی کلیدهای کش
+
+به جای پیدا کردن و حذف تک‌تک کلیدهای وابسته، شماره نسخه یک فضای نام (مثلاً یک ترم)
+در کلید کش قرار می‌گیرد و با هر تغییر مرتبط افزایش می‌یابد؛ مقادیر قدیمی دیگر خوانده
+نمی‌شوند و با پایان زمان اعتبار از کش خارج می‌شوند.
+"""
+from django.core.cache import cache
+
+# نسخه‌ها نباید زودتر از داده‌های وابسته منقضی شوند
+VERSION_TIMEOUT = None
+
+
+def _version_key(namespace, key):
+    return f'version:{namespace}:{key}'
+
+
+def cache_version(namespace, key=''):
+    """شماره نسخه فعلی یک فضای نام"""
+    version_key = _version_key(namespace, key)
+    version = cache.get(version_key)
+    if version is None:
+        cache.add(version_key, 1, VERSION_TIMEOUT)
+        version = cache.get(version_key, 1)
+    return version
+
+
+def bump_cache_version(namespace, key=''):
+    """افزایش نسخه یک فضای نام و در نتیجه باطل شدن همه کش‌های وابسته"""
+    version_key = _version_key(namespace, key)
+    cache.add(version_key, 1, VERSION_TIMEOUT)
+    try:
+        cache.incr(version_key)
+    except ValueError:
+        cache.set(version_key, 2, VERSION_TIMEOUT)
@@ -0,0 +1,125 @@
+"""
+یکسان‌سازی و جستجوی معکوس اطلاعات تماس
+
+مقدار هر اطلاعات تماس به شکل استاندارد در ستون ایندکس‌شده normalized_value هم ذخیره می‌شود:
+شماره‌ها با قالب E.164 (مثلاً ‎+989121234567) و ایمیل‌ها با حروف کوچک. جستجوی «این شماره یا
+ایمیل مال کیست» و تشخیص تکراری بودن اطلاعات تماس هنگام ورود داده روی همین ستون انجام می‌شود.
+"""
+import re
+from django.contrib.contenttypes.models import ContentType
+from .models import ContactInfo, Student, Professor
+from .workers import batched
+
+# کد کشور برای شماره‌های بدون پیش‌شماره بین‌المللی
+DEFAULT_COUNTRY_CODE = '98'
+# حداکثر تعداد مقدار در هر کوئری IN
+LOOKUP_BATCH_SIZE = 500
+# مدل‌هایی که اطلاعات تماس به آن‌ها تعلق دارد، با نام نمایشی در پاسخ جستجو
+OWNER_MODELS = {Student: 'student', Professor: 'professor'}
+
+_DIGITS = str.maketrans('۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', '01234567890123456789')
+
+
+def normalize_phone(value, country_code=DEFAULT_COUNTRY_CODE):
+    """شماره تلفن با قالب E.164؛ ارقام فارسی و عربی، فاصله، خط تیره و پرانتز پذیرفته می‌شوند"""
+    value = value.strip().translate(_DIGITS)
+    digits = re.sub(r'\D', '', value)
+    if value.startswith('+'):
+        return f'+{digits}'
+    if digits.startswith('00'):
+        return f'+{digits[2:]}'
+    if digits.startswith('0'):
+        return f'+{country_code}{digits[1:]}'
+    if digits.startswith(country_code) and len(digits) > 10:
+        return f'+{digits}'
+    return f'+{country_code}{digits}'
+
+
+def normalize_email(value):
+    return value.strip().lower()
+
+
+def normalize_contact(contact_type, value):
+    """مقدار استاندارد یک اطلاعات تماس بر اساس نوع آن"""
+    if contact_type == ContactInfo.ContactType.EMAIL:
+        return normalize_email(value)
+    return normalize_phone(value)
+
+
+def normalize_query(value):
+    """مقدار استاندارد عبارت جستجو؛ نوع (ایمیل یا تلفن) از روی وجود @ تشخیص داده می‌شود"""
+    return normalize_email(value) if '@' in value else normalize_phone(value)
+
+
+def existing_contacts(normalized_values):
+    """
+    مقادیر استانداردی که در پایگاه داده ثبت شده‌اند، همراه با صاحبانشان:
+    {مقدار: [(content_type_id، object_id، contact_type)، ...]}
+    """
+    found = {}
+    for batch in batched(sorted(set(normalized_values)), LOOKUP_BATCH_SIZE):
+        rows = ContactInfo.objects.filter(normalized_value__in=batch).order_by().values_list(
+            'normalized_value', 'content_type_id', 'object_id', 'contact_type',
+        )
+        for value, content_type_id, object_id, contact_type in rows:
+            found.setdefault(value, []).append((content_type_id, object_id, contact_type))
+    return found
+
+
+def find_owners(values):
+    """
+    صاحبان (دانشجو یا استاد) هر شماره یا ایمیل، با یک کوئری روی اطلاعات تماس و یک کوئری برای هر مدل
+    خروجی: {مقدار ورودی: {'normalized': ...، 'owners': [...]}}
+    """
+    normalized = {value: normalize_query(value) for value in values}
+    found = existing_contacts(normalized.values())
+
+    content_types = ContentType.objects.get_for_models(*OWNER_MODELS)
+    models_by_type = {content_type.pk: model for model, content_type in content_types.items()}
+    object_ids = {}
+    for owners in found.values():
+        for content_type_id, object_id, _ in owners:
+            if content_type_id in models_by_type:
+                object_ids.setdefault(content_type_id, set()).add(object_id)
+    people = {
+        content_type_id: models_by_type[content_type_id].objects.in_bulk(ids)
+        for content_type_id, ids in object_ids.items()
+    }
+
+    result = {}
+    for value, normalized_value in normalized.items():
+        owners = []
+        for content_type_id, object_id, contact_type in found.get(normalized_value, []):
+            person = people.get(content_type_id, {}).get(object_id)
+            if person is not None:
+                owners.append({
+                    'model': OWNER_MODELS[models_by_type[content_type_id]],
+                    'id': person.pk,
+                    'full_name': person.full_name,
+                    'contact_type': contact_type,
+                })
+        result[value] = {'normalized': normalized_value, 'owners': owners}
+    return result
+
+
+def split_duplicate_contacts(contacts):
+    """
+    جدا کردن اطلاعات تماس تکراری یک دسته ورودی (مثلاً پیش از bulk_create) با کوئری‌های دسته‌ای
+    روی ستون ایندکس‌شده: مقادیری که پیش‌تر ثبت شده‌اند یا در خود دسته تکرار شده‌اند.
+    تلفن ثابت می‌تواند بین چند نفر مشترک باشد و بررسی نمی‌شود.
+    خروجی: (اطلاعات تماس یکتا، اطلاعات تماس تکراری)
+    """
+    for contact in contacts:
+        contact.normalized_value = normalize_contact(contact.contact_type, contact.value)
+    checked = [contact for contact in contacts if contact.contact_type != ContactInfo.ContactType.HOME]
+    registered = set(existing_contacts(contact.normalized_value for contact in checked))
+    unique, duplicates = [], []
+    for contact in contacts:
+        if contact.contact_type == ContactInfo.ContactType.HOME:
+            unique.append(contact)
+        elif contact.normalized_value in registered:
+            duplicates.append(contact)
+        else:
+            registered.add(contact.normalized_value)
+            unique.append(contact)
+    return unique, duplicates
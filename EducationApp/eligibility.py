@@ -0,0 +1,158 @@
+"""
+کلاس‌هایی از یک ترم که دانشجو می‌تواند در آن‌ها ثبت‌نام کند
+
+اطلاعات ثابت کلاس‌های ترم (درس، رشته، زمان، ظرفیت و پیش‌نیازها) یک بار به صورت آرایه‌های
+NumPy ساخته و تا تغییر کلاس‌های ترم، دروس، اتاق‌ها یا پیش‌نیازها کش می‌شود؛ ثبت‌نام‌ها این کش
+را باطل نمی‌کنند. در هر فراخوانی تعداد ثبت‌نام کلاس‌های ترم با یک کوئری Count و ثبت‌نام‌های
+دانشجو با یک کوئری خوانده می‌شوند و همه شرط‌ها به صورت ماسک‌های برداری روی کلاس‌های ترم
+اعمال می‌شوند.
+"""
+import numpy as np
+from django.core.cache import cache
+from django.db.models import Count
+from .archive import archived_passed_courses
+from .caching import cache_version
+from .models import Class, Enrollment, CoursePrerequisiteClosure
+
+CLASS_INDEX_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def class_index_cache_key(term_id):
+    """کلید کش وابسته به نسخه کلاس‌های ترم و نسخه اتاق‌ها، دروس و پیش‌نیازها (نه ثبت‌نام‌ها)"""
+    return f"class_index:{term_id}:{cache_version('classes', term_id)}:{cache_version('schedule')}"
+
+
+def _minutes(value):
+    return value.hour * 60 + value.minute
+
+
+def build_class_index(term_id):
+    """آرایه‌های مشخصات کلاس‌های یک ترم، مرتب بر اساس شناسه کلاس"""
+    rows = list(
+        Class.objects
+        .filter(course__term_id=term_id)
+        .order_by('id')
+        .values_list(
+            'id', 'course_id', 'course__code', 'course__name', 'course__major_id',
+            'room_id', 'room__capacity', 'day_of_week', 'start_time', 'end_time',
+        )
+    )
+    days = {}
+    positions = {}
+    for position, row in enumerate(rows):
+        days.setdefault(row[7], len(days))
+        positions.setdefault(row[1], []).append(position)
+
+    # هر سطر نیازمندی: (جایگاه کلاس، پیش‌نیاز مستقیم یا غیرمستقیم درس آن)
+    requirements = [
+        (position, prerequisite_id)
+        for course_id, prerequisite_id in CoursePrerequisiteClosure.objects.filter(
+            course__term_id=term_id,
+        ).values_list('course_id', 'prerequisite_id')
+        for position in positions.get(course_id, ())
+    ]
+
+    return {
+        'classes': [
+            {
+                'id': class_id, 'course': course_id, 'course_code': code, 'course_name': name,
+                'room': room_id, 'day_of_week': day, 'start_time': start.strftime('%H:%M'),
+                'end_time': end.strftime('%H:%M'),
+            }
+            for class_id, course_id, code, name, _, room_id, _, day, start, end in rows
+        ],
+        'ids': np.array([row[0] for row in rows], dtype=np.int64),
+        'courses': np.array([row[1] for row in rows], dtype=np.int64),
+        'majors': np.array([row[4] for row in rows], dtype=np.int64),
+        'days': np.array([days[row[7]] for row in rows], dtype=np.int16),
+        'starts': np.array([_minutes(row[8]) for row in rows], dtype=np.int16),
+        'ends': np.array([_minutes(row[9]) for row in rows], dtype=np.int16),
+        'capacities': np.array([row[6] for row in rows], dtype=np.int32),
+        'requirement_positions': np.array([position for position, _ in requirements], dtype=np.int64),
+        'requirement_courses': np.array([prerequisite for _, prerequisite in requirements], dtype=np.int64),
+    }
+
+
+def get_class_index(term_id):
+    key = class_index_cache_key(term_id)
+    index = cache.get(key)
+    if index is None:
+        index = build_class_index(term_id)
+        cache.set(key, index, CLASS_INDEX_CACHE_TIMEOUT)
+    return index
+
+
+def remaining_seats(index, term_id):
+    """صندلی خالی کلاس‌های ترم به ترتیب آرایه‌های index، با یک کوئری Count روی ثبت‌نام‌ها"""
+    counts = (
+        Enrollment.objects
+        .filter(class_instance__course__term_id=term_id)
+        .order_by()
+        .values_list('class_instance_id')
+        .annotate(enrolled=Count('id'))
+    )
+    ids = index['ids']
+    counts = np.array(list(counts), dtype=np.int64).reshape(-1, 2)
+    enrolled = np.zeros(len(ids), dtype=np.int32)
+    if len(ids):
+        positions = np.searchsorted(ids, counts[:, 0])
+        # ثبت‌نام کلاسی که پس از ساخت index اضافه شده باشد کنار گذاشته می‌شود
+        found = (positions < len(ids)) & (ids[np.minimum(positions, len(ids) - 1)] == counts[:, 0])
+        enrolled[positions[found]] = counts[found, 1]
+    return index['capacities'] - enrolled
+
+
+def eligible_classes(student, term_id):
+    """
+    کلاس‌های ترم که دانشجو مجاز به ثبت‌نام در آن‌هاست:
+    درس از رشته دانشجو باشد، قبلاً پاس یا در همین ترم گرفته نشده باشد، همه پیش‌نیازهایش پاس شده
+    باشد، با کلاس‌های فعلی دانشجو تداخل زمانی نداشته باشد و صندلی خالی داشته باشد.
+    rejected تعداد کلاس‌هایی است که هر شرط را نقض می‌کنند (یک کلاس ممکن است چند شرط را نقض کند).
+    """
+    index = get_class_index(term_id)
+    ids = index['ids']
+    courses = index['courses']
+    remaining = remaining_seats(index, term_id)
+
+    enrollments = list(Enrollment.objects.filter(student_id=student.pk).values_list(
+        'class_instance_id', 'class_instance__course_id', 'status',
+    ))
+    passed = np.array(
+        [course_id for _, course_id, status in enrollments if status == Enrollment.Status.PASSED]
+        + archived_passed_courses(student.pk),
+        dtype=np.int64,
+    )
+    enrolled_ids = np.array([class_id for class_id, _, _ in enrollments], dtype=np.int64)
+    # جایگاه کلاس‌های همین ترم دانشجو در آرایه‌ها (ids مرتب است)
+    found = np.searchsorted(ids, enrolled_ids)
+    current = found[(found < len(ids)) & (ids[np.minimum(found, len(ids) - 1)] == enrolled_ids)] if len(ids) else found[:0]
+
+    unmet = np.zeros(len(ids), dtype=bool)
+    missing = ~np.isin(index['requirement_courses'], passed)
+    unmet[index['requirement_positions'][missing]] = True
+
+    clash = (
+        (index['days'][:, None] == index['days'][current])
+        & (index['starts'][:, None] < index['ends'][current])
+        & (index['ends'][:, None] > index['starts'][current])
+    ).any(axis=1)
+
+    checks = {
+        'major': index['majors'] == student.major_id,
+        'passed': ~np.isin(courses, passed),
+        'enrolled': ~np.isin(courses, courses[current]),
+        'prerequisites': ~unmet,
+        'clash': ~clash,
+        'seats': remaining > 0,
+    }
+    eligible = np.logical_and.reduce(list(checks.values()))
+    return {
+        'student': student.pk,
+        'term': term_id,
+        'count': int(eligible.sum()),
+        'rejected': {reason: int((~mask).sum()) for reason, mask in checks.items()},
+        'classes': [
+            {**index['classes'][position], 'remaining_seats': int(remaining[position])}
+            for position in np.flatnonzero(eligible)
+        ],
+    }
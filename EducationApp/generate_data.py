@@ -1,9 +1,23 @@
 from django.utils import timezone
 from datetime import time
-from random import choice, randint, shuffle
+import random
+from random import choice, randint, shuffle, uniform
 import numpy as np
 from django.contrib.contenttypes.models import ContentType
-from .models import Faculty, Major, Student, Professor, Course, Term, Room, Class, Enrollment, CourseAssignment, ContactInfo
+from django.db import transaction
+from .models import Faculty, Major, Student, Professor, Course, Term, Room, Class, Enrollment, CourseAssignment, ContactInfo, ChangeEvent, ChangeLoggedModel
+from .graduation import evaluate_graduation
+from .workers import batched
+from .caching import bump_cache_version
+from .transcript import invalidate_transcript
+from .rankings import mark_all_stale
+from .contacts import split_duplicate_contacts
+
+# تعداد تلاش برای یافتن نام تکراری‌نشده؛ پس از آن نام تکراری پذیرفته می‌شود
+# (تعداد ترکیب‌های نام محدود است و در داده‌های بزرگ یکتایی ممکن نیست)
+NAME_ATTEMPTS = 20
+# اندازه هر دسته در ایجاد دسته‌ای رکوردها
+BULK_BATCH_SIZE = 2000
 
 def generate_national_id():
     """
@@ -17,10 +31,51 @@ def generate_national_id():
     digits.append(control_digit)
     return ''.join(map(str, digits))
 
-def generate_sample_data():
+def pick_name(first_names, last_names, used):
+    """انتخاب نام و نام خانوادگی، تا حد امکان غیرتکراری"""
+    for _ in range(NAME_ATTEMPTS):
+        first_name, last_name = choice(first_names), choice(last_names)
+        if f'{first_name} {last_name}' not in used:
+            break
+    used.add(f'{first_name} {last_name}')
+    return first_name, last_name
+
+def create_people(model, people, contacts):
+    """
+    ایجاد دسته‌ای افراد به همراه اطلاعات تماس و رویدادهای فید تغییرات
+    contacts برای هر فرد لیستی از (نوع تماس، مقدار) است؛ شماره‌ها و ایمیل‌هایی که پیش‌تر برای
+    شخص دیگری ثبت شده‌اند کنار گذاشته می‌شوند.
+    """
+    model.fill_birth_fields(people)
+    content_type = ContentType.objects.get_for_model(model)
+    created = []
+    for batch, batch_contacts in zip(batched(people, BULK_BATCH_SIZE), batched(contacts, BULK_BATCH_SIZE)):
+        batch = model.objects.bulk_create(batch)
+        unique, _ = split_duplicate_contacts([
+            ContactInfo(content_type=content_type, object_id=person.id, contact_type=contact_type, value=value)
+            for person, person_contacts in zip(batch, batch_contacts)
+            for contact_type, value in person_contacts
+        ])
+        ContactInfo.objects.bulk_create(unique)
+        if issubclass(model, ChangeLoggedModel):
+            ChangeEvent.record_many(batch, ChangeEvent.Action.CREATE)
+        created.extend(batch)
+    return created
+
+def generate_sample_data(students=1000, professors=100, courses=70, classes=80, rooms=20, seed=None):
     """
     اسکریپت برای تولید داده‌های نمونه با شروط مشخص‌شده
+    اندازه هر بخش قابل تنظیم است و با seed ثابت، داده تولیدشده روی پایگاه داده خالی همیشه یکسان است.
     """
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed)
+    with transaction.atomic():
+        _generate(students, professors, courses, classes, rooms)
+    # تعیین وضعیت فارغ‌التحصیلی با ارزیابی دسته‌ای
+    evaluate_graduation(workers=1)
+
+def _generate(student_count, professor_count, course_count, class_count, room_count):
     # لیست اسامی غیرتکراری
     first_names_male = [
         'علی', 'محمد', 'حسین', 'رضا', 'مهدی', 'احمد', 'امیر', 'سجاد', 'جواد', 'حسن',
@@ -104,7 +159,7 @@ def generate_sample_data():
     # ایجاد اتاق‌ها
     rooms = list(Room.objects.all())
     existing_names = set(room.name for room in rooms)
-    for i in range(20):
+    for i in range(room_count):
         name = f'R{i+1:03d}'
         if name not in existing_names:
             room = Room.objects.create(
@@ -119,23 +174,18 @@ def generate_sample_data():
     professors = list(Professor.objects.all())
     professor_ids = set(f'{p.first_name} {p.last_name}' for p in professors)
     existing_national_ids = set(p.national_id for p in professors)
-    for i in range(100 - len(professors)):
+    new_professors, contacts = [], []
+    for i in range(professor_count - len(professors)):
         gender = choice(['M', 'F'])
         first_names = first_names_male if gender == 'M' else first_names_female
-        first_name = choice(first_names)
-        last_name = choice(last_names)
-        
-        while f'{first_name} {last_name}' in professor_ids:
-            first_name = choice(first_names)
-            last_name = choice(last_names)
-        professor_ids.add(f'{first_name} {last_name}')
+        first_name, last_name = pick_name(first_names, last_names, professor_ids)
 
         national_id = generate_national_id()
         while national_id in existing_national_ids:
             national_id = generate_national_id()
         existing_national_ids.add(national_id)
 
-        professor = Professor.objects.create(
+        new_professors.append(Professor(
             first_name=first_name,
             last_name=last_name,
             national_id=national_id,
@@ -149,35 +199,22 @@ def generate_sample_data():
             professor_id=f'P{i+1:04d}',
             faculty=choice(faculties),
             contract_type=choice(['F', 'P'])
-        )
-        ContactInfo.objects.create(
-            content_type=ContentType.objects.get_for_model(Professor),
-            object_id=professor.id,
-            contact_type='M',
-            value=f'+989{randint(10000000, 99999999)}'
-        )
-        ContactInfo.objects.create(
-            content_type=ContentType.objects.get_for_model(Professor),
-            object_id=professor.id,
-            contact_type='E',
-            value=f'prof{i+1}@university.ac.ir'
-        )
-        professors.append(professor)
+        ))
+        contacts.append([
+            ('M', f'+989{randint(10000000, 99999999)}'),
+            ('E', f'prof{i+1}@university.ac.ir'),
+        ])
+    professors.extend(create_people(Professor, new_professors, contacts))
 
     # ایجاد دانشجویان
     students = list(Student.objects.all())
     student_ids = set(f'{s.first_name} {s.last_name}' for s in students)
     existing_national_ids = set(s.national_id for s in students)
-    for i in range(1000 - len(students)):
+    new_students, contacts = [], []
+    for i in range(student_count - len(students)):
         gender = choice(['M', 'F'])
         first_names = first_names_male if gender == 'M' else first_names_female
-        first_name = choice(first_names)
-        last_name = choice(last_names)
-        
-        while f'{first_name} {last_name}' in student_ids:
-            first_name = choice(first_names)
-            last_name = choice(last_names)
-        student_ids.add(f'{first_name} {last_name}')
+        first_name, last_name = pick_name(first_names, last_names, student_ids)
 
         national_id = generate_national_id()
         while national_id in existing_national_ids:
@@ -185,7 +222,7 @@ def generate_sample_data():
         existing_national_ids.add(national_id)
 
         entry_year = str(randint(1398, 1403))
-        student = Student.objects.create(
+        new_students.append(Student(
             first_name=first_name,
             last_name=last_name,
             national_id=national_id,
@@ -200,25 +237,19 @@ def generate_sample_data():
             major=choice(majors),
             entry_year=entry_year,
             military_status=choice(['E', 'P', 'S']) if gender == 'M' else ''
-        )
-        ContactInfo.objects.create(
-            content_type=ContentType.objects.get_for_model(Student),
-            object_id=student.id,
-            contact_type='M',
-            value=f'+989{randint(10000000, 99999999)}'
-        )
-        ContactInfo.objects.create(
-            content_type=ContentType.objects.get_for_model(Student),
-            object_id=student.id,
-            contact_type='E',
-            value=f'student{i+1}@university.ac.ir'
-        )
-        students.append(student)
+        ))
+        contacts.append([
+            ('M', f'+989{randint(10000000, 99999999)}'),
+            ('E', f'student{i+1}@university.ac.ir'),
+        ])
+    new_students = create_people(Student, new_students, contacts)
+    new_student_ids = {student.id for student in new_students}
+    students.extend(new_students)
 
     # ایجاد دروس
     courses = list(Course.objects.all())
     existing_codes = set(course.code for course in courses)
-    for i in range(70 - len(courses)):
+    for i in range(course_count - len(courses)):
         code = f'C{i+1:03d}'
         if code not in existing_codes:
             course = Course.objects.create(
@@ -232,7 +263,7 @@ def generate_sample_data():
             existing_codes.add(code)
 
     # ایجاد کلاس‌ها (با زمان‌بندی بدون تداخل)
-    classes = list(Class.objects.all())
+    classes = list(Class.objects.select_related('course'))
     time_slots = [
         (time(8, 0), time(10, 0)),
         (time(10, 0), time(12, 0)),
@@ -240,9 +271,13 @@ def generate_sample_data():
         (time(15, 0), time(17, 0)),
     ]
     days = ['شنبه', 'یک‌شنبه', 'دوشنبه', 'سه‌شنبه', 'چهارشنبه']
-    used_slots = {}
+    used_slots = {
+        (c.room_id, c.day_of_week, c.start_time, c.end_time): True for c in classes
+    }
+    if class_count > len(rooms) * len(days) * len(time_slots):
+        raise ValueError('تعداد کلاس‌ها از ظرفیت زمان‌بندی اتاق‌ها بیشتر است؛ تعداد اتاق‌ها را افزایش دهید.')
 
-    for i in range(80 - len(classes)):
+    for i in range(class_count - len(classes)):
         course = choice(courses)
         room = choice(rooms)
         day = choice(days)
@@ -250,6 +285,7 @@ def generate_sample_data():
 
         slot_key = (room.id, day, start_time, end_time)
         while slot_key in used_slots:
+            room = choice(rooms)
             day = choice(days)
             start_time, end_time = choice(time_slots)
             slot_key = (room.id, day, start_time, end_time)
@@ -269,31 +305,37 @@ def generate_sample_data():
         )
         classes.append(class_instance)
 
-    # ثبت‌نام دانشجویان و تعیین وضعیت فارغ‌التحصیلی
+    # ثبت‌نام دانشجویان
+    existing_pairs = set(Enrollment.objects.values_list('student_id', 'class_instance_id'))
+    enrollments = []
     for student in students:
         num_enrollments = randint(1, 10)
-        selected_classes = np.random.choice(classes, size=min(num_enrollments, len(classes)), replace=False)
-        
-        total_credits = 0
-        for class_instance in selected_classes:
+        selected_classes = np.random.choice(len(classes), size=min(num_enrollments, len(classes)), replace=False)
+
+        for class_instance in (classes[index] for index in selected_classes):
             # جلوگیری از ثبت‌نام تکراری
-            if not Enrollment.objects.filter(student=student, class_instance=class_instance).exists():
+            if (student.id, class_instance.id) not in existing_pairs:
+                existing_pairs.add((student.id, class_instance.id))
                 grade = uniform(0, 20) if randint(0, 1) else None
-                status = 'P' if grade and grade >= 10 else ('F' if grade else 'R')
-                if status == 'P':
-                    total_credits += class_instance.course.credits
-                
-                Enrollment.objects.create(
+                enrollments.append(Enrollment(
                     student=student,
                     class_instance=class_instance,
                     grade=grade,
-                    status=status
-                )
-        
-        # تعیین فارغ‌التحصیلی
-        if total_credits >= 140:
-            student.marital_status = 'S'  # نشانه فارغ‌التحصیلی
-            student.save()
+                    status=Enrollment.status_for_grade(grade)
+                ))
+
+    for batch in batched(enrollments, BULK_BATCH_SIZE):
+        ChangeEvent.record_many(Enrollment.objects.bulk_create(batch), ChangeEvent.Action.CREATE)
+
+    # ایجاد دسته‌ای سیگنال ندارد؛ کش ترم‌ها، برنامه‌های هفتگی، رتبه‌بندی‌ها و کارنامه دانشجویان قبلی دستی باطل می‌شود
+    for term_id in {class_instance.course.term_id for class_instance in classes}:
+        bump_cache_version('term', term_id)
+        bump_cache_version('classes', term_id)
+    bump_cache_version('stats')
+    bump_cache_version('timetable')
+    mark_all_stale()
+    for student_id in {enrollment.student_id for enrollment in enrollments} - new_student_ids:
+        invalidate_transcript(student_id)
 
 if __name__ == '__main__':
-    generate_sample_data()
\ No newline at end of file
+    generate_sample_data()
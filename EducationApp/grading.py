@@ -0,0 +1,43 @@
+from django.db import transaction
+from .models import Enrollment, ChangeEvent
+from .transcript import invalidate_transcript
+from .caching import bump_cache_version
+from .rankings import mark_students_stale
+
+
+def grade_sheet(class_instance):
+    """لیست نمرات یک کلاس با اطلاعات دانشجو، با یک کوئری"""
+    return list(
+        Enrollment.objects
+        .filter(class_instance=class_instance)
+        .order_by('student__last_name', 'student__first_name')
+        .values(
+            'id', 'student_id', 'student__student_id', 'student__first_name',
+            'student__last_name', 'grade', 'status',
+        )
+    )
+
+
+def apply_grades(grades):
+    """
+    ثبت دسته‌ای نمرات
+    grades: لیست (ثبت‌نام، نمره)؛ وضعیت هر ثبت‌نام از روی نمره تعیین و همه تغییرات با یک
+    bulk_update در یک تراکنش همراه با رویدادهای فید تغییرات ذخیره می‌شود.
+    """
+    changed = []
+    for enrollment, grade in grades:
+        status = Enrollment.status_for_grade(grade)
+        if enrollment.grade != grade or enrollment.status != status:
+            enrollment.grade = grade
+            enrollment.status = status
+            changed.append(enrollment)
+
+    if changed:
+        with transaction.atomic():
+            Enrollment.objects.bulk_update(changed, ['grade', 'status'])
+            ChangeEvent.record_many(changed, ChangeEvent.Action.UPDATE)
+            student_ids = {enrollment.student_id for enrollment in changed}
+            transaction.on_commit(lambda: [invalidate_transcript(student_id) for student_id in student_ids])
+            transaction.on_commit(lambda: bump_cache_version('stats'))
+            transaction.on_commit(lambda: mark_students_stale(student_ids))
+    return changed
@@ -0,0 +1,80 @@
+from django.db import transaction
+from django.db.models import Sum, Q
+from .archive import archived_passed_credits
+from .models import Student, ChangeEvent, PASSING_GRADE, GRADUATION_CREDITS
+from .workers import process_pool, batched, pk_ranges
+
+# تعداد دانشجویان هر بخش (بر اساس بازه شناسه) در ارزیابی دسته‌ای
+DEFAULT_CHUNK_SIZE = 5000
+# سقف تعداد شناسه در هر دستور UPDATE برای سازگاری با محدودیت پارامترهای SQLite
+UPDATE_BATCH_SIZE = 900
+
+
+def chunk_bounds(chunk_size=DEFAULT_CHUNK_SIZE):
+    """بازه‌های [شروع، پایان) شناسه دانشجویان برای تقسیم کار"""
+    return pk_ranges(Student.objects.all(), chunk_size)
+
+
+def evaluate_chunk(bounds):
+    """
+    ارزیابی فارغ‌التحصیلی دانشجویان یک بازه با یک کوئری تجمیعی (همراه با واحدهای بایگانی‌شده)
+    خروجی: (شناسه‌هایی که باید فارغ‌التحصیل شوند، شناسه‌هایی که باید به در حال تحصیل برگردند، تعداد ارزیابی‌شده)
+    """
+    start, end = bounds
+    rows = (
+        Student.objects
+        .filter(pk__gte=start, pk__lt=end)
+        .order_by()
+        .annotate(passed=Sum(
+            'enrollments__class_instance__course__credits',
+            filter=Q(enrollments__grade__gte=PASSING_GRADE),
+        ))
+        .annotate(archived=archived_passed_credits())
+        .values_list('pk', 'passed', 'archived', 'graduation_status')
+    )
+    graduated, studying = [], []
+    count = 0
+    for pk, passed, archived, status in rows:
+        count += 1
+        eligible = (passed or 0) + archived >= GRADUATION_CREDITS
+        if eligible and status != Student.GraduationStatus.GRADUATED:
+            graduated.append(pk)
+        elif not eligible and status == Student.GraduationStatus.GRADUATED:
+            studying.append(pk)
+    return graduated, studying, count
+
+
+def apply_graduation(graduated, studying):
+    """ثبت نتیجه ارزیابی با به‌روزرسانی‌های دسته‌ای، همراه با رویدادهای فید تغییرات در همان تراکنش"""
+    for status, ids in ((Student.GraduationStatus.GRADUATED, graduated),
+                        (Student.GraduationStatus.STUDYING, studying)):
+        for batch in batched(ids, UPDATE_BATCH_SIZE):
+            with transaction.atomic():
+                Student.objects.filter(pk__in=batch).update(graduation_status=status)
+                ChangeEvent.record_many(Student.objects.filter(pk__in=batch), ChangeEvent.Action.UPDATE)
+
+
+def evaluate_graduation(chunk_size=DEFAULT_CHUNK_SIZE, workers=None, progress=None):
+    """
+    ارزیابی فارغ‌التحصیلی همه دانشجویان بر اساس قاعده 140 واحد
+    بخش‌ها به صورت موازی در pool پردازه‌ها محاسبه و نتیجه در پردازه اصلی ثبت می‌شود.
+    progress در صورت وجود پس از ثبت هر بخش با کسر انجام‌شده (0 تا 1) فراخوانی می‌شود.
+    """
+    chunks = chunk_bounds(chunk_size)
+    summary = {'evaluated': 0, 'graduated': 0, 'reverted': 0}
+
+    def collect(results):
+        for done, (graduated, studying, count) in enumerate(results, 1):
+            apply_graduation(graduated, studying)
+            summary['evaluated'] += count
+            summary['graduated'] += len(graduated)
+            summary['reverted'] += len(studying)
+            if progress is not None:
+                progress(done / len(chunks))
+
+    if workers == 1 or len(chunks) <= 1:
+        collect(map(evaluate_chunk, chunks))
+    else:
+        with process_pool(workers) as pool:
+            collect(pool.map(evaluate_chunk, chunks))
+    return summary
@@ -0,0 +1,117 @@
+"""
+تبدیل برداری (NumPy) تاریخ شمسی و میلادی
+
+الگوریتم بر پایه چرخه‌های 33 ساله تقویم جلالی است و برای سال‌های 1244 تا 1472 شمسی
+با تقویم رسمی مطابقت دارد. توابع روی آرایه کار می‌کنند تا تبدیل ستون‌های بزرگ (مهاجرت
+داده و ورود دسته‌ای) بدون حلقه پایتونی انجام شود.
+"""
+from datetime import date
+import numpy as np
+
+# 1 فروردین 1403 برابر 20 مارس 2024 است؛ مبنای تبدیل شماره روز به datetime64
+_EPOCH_JALALI = (1403, 1, 1)
+_EPOCH_GREGORIAN = np.datetime64('2024-03-20', 'D')
+# تعداد روزهای چرخه 33 ساله و چرخه 4 ساله
+_CYCLE_33 = 12053
+_CYCLE_4 = 1461
+# بازه سال‌هایی که تبدیل با تقویم رسمی مطابقت دارد
+MIN_JALALI_YEAR = 1244
+MAX_JALALI_YEAR = 1472
+
+
+def _day_number(years, months, days):
+    """شماره روز پیوسته برای تاریخ شمسی"""
+    years = np.asarray(years, dtype=np.int64) + 1595
+    months = np.asarray(months, dtype=np.int64)
+    days = np.asarray(days, dtype=np.int64)
+    month_offset = np.where(months < 7, (months - 1) * 31, (months - 7) * 30 + 186)
+    return (365 * years + (years // 33) * 8 + ((years % 33) + 3) // 4
+            + days + month_offset)
+
+
+_EPOCH_DAY = _day_number(*_EPOCH_JALALI)
+
+
+def jalali_to_gregorian(years, months, days):
+    """تبدیل آرایه‌های سال، ماه و روز شمسی به آرایه datetime64[D] میلادی"""
+    offset = _day_number(years, months, days) - _EPOCH_DAY
+    return _EPOCH_GREGORIAN + offset.astype('timedelta64[D]')
+
+
+def gregorian_to_jalali(dates):
+    """تبدیل آرایه تاریخ میلادی (datetime64 یا date) به آرایه‌های سال، ماه و روز شمسی"""
+    dates = np.asarray(dates, dtype='datetime64[D]')
+    # شماره روز از ابتدای چرخه‌ها (1 فروردین سال صفر در مقیاس _day_number برابر روز 1 است)
+    remaining = (dates - _EPOCH_GREGORIAN).astype(np.int64) + _EPOCH_DAY - 1
+
+    years = 33 * (remaining // _CYCLE_33)
+    remaining = remaining % _CYCLE_33
+    years = years + 4 * (remaining // _CYCLE_4)
+    remaining = remaining % _CYCLE_4
+    overflow = remaining > 365
+    years = years + np.where(overflow, (remaining - 1) // 365, 0)
+    remaining = np.where(overflow, (remaining - 1) % 365, remaining)
+
+    first_half = remaining < 186
+    months = np.where(first_half, 1 + remaining // 31, 7 + (remaining - 186) // 30)
+    days = np.where(first_half, 1 + remaining % 31, 1 + (remaining - 186) % 30)
+    return years - 1595, months, days
+
+
+def parse_jalali(values):
+    """
+    تجزیه برداری رشته‌های YYYY/MM/DD
+    خروجی: (سال، ماه، روز، ماسک اعتبار)؛ مقادیر ردیف‌های نامعتبر صفر است.
+    """
+    values = np.asarray(values, dtype='U10')
+    lengths = np.char.str_len(values)
+    codes = values.view(np.uint32).reshape(len(values), 10).astype(np.int64) - ord('0')
+
+    separators = (codes[:, 4] == ord('/') - ord('0')) & (codes[:, 7] == ord('/') - ord('0'))
+    digit_columns = codes[:, [0, 1, 2, 3, 5, 6, 8, 9]]
+    digits = ((digit_columns >= 0) & (digit_columns <= 9)).all(axis=1)
+
+    years = codes[:, 0] * 1000 + codes[:, 1] * 100 + codes[:, 2] * 10 + codes[:, 3]
+    months = codes[:, 5] * 10 + codes[:, 6]
+    days = codes[:, 8] * 10 + codes[:, 9]
+    month_length = np.where(months <= 6, 31, 30)
+    valid = (lengths == 10) & separators & digits & (months >= 1) & (months <= 12) & (days >= 1) & (days <= month_length)
+
+    # روز 30 اسفند فقط در سال کبیسه معتبر است
+    esfand_30 = valid & (months == 12) & (days == 30)
+    if esfand_30.any():
+        _, next_month, _ = gregorian_to_jalali(jalali_to_gregorian(years[esfand_30], 12, 30))
+        valid[np.flatnonzero(esfand_30)[next_month != 12]] = False
+
+    zero = np.zeros_like(years)
+    return np.where(valid, years, zero), np.where(valid, months, zero), np.where(valid, days, zero), valid
+
+
+def jalali_strings_to_gregorian(values):
+    """
+    تبدیل برداری رشته‌های شمسی به datetime64[D]
+    خروجی: (تاریخ‌های میلادی، ماه‌های شمسی)؛ برای مقادیر نامعتبر NaT و ماه صفر
+    """
+    years, months, days, valid = parse_jalali(values)
+    result = np.full(len(valid), np.datetime64('NaT'), dtype='datetime64[D]')
+    result[valid] = jalali_to_gregorian(years[valid], months[valid], days[valid])
+    return result, months
+
+
+def to_gregorian(value):
+    """تبدیل یک رشته شمسی YYYY/MM/DD به date؛ برای مقدار نامعتبر None"""
+    converted, _ = jalali_strings_to_gregorian([value or ''])
+    if np.isnat(converted[0]):
+        return None
+    return converted[0].astype(date)
+
+
+def to_jalali(value):
+    """تبدیل یک date میلادی به سه‌تایی (سال، ماه، روز) شمسی"""
+    years, months, days = gregorian_to_jalali([value])
+    return int(years[0]), int(months[0]), int(days[0])
+
+
+def format_jalali(year, month, day):
+    """قالب‌بندی تاریخ شمسی به صورت YYYY/MM/DD"""
+    return f'{year:04d}/{month:02d}/{day:02d}'
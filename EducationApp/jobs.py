@@ -0,0 +1,179 @@
+"""
+کارهای پس‌زمینه بدون نیاز به broker خارجی
+
+کارها در جدول Job ثبت می‌شوند و دستور run_jobs آن‌ها را برمی‌دارد و در pool پردازه‌ها اجرا
+می‌کند. برداشتن کار با یک UPDATE شرطی (فقط اگر هنوز در صف باشد) انجام می‌شود تا چند
+اجراکننده همزمان یک کار را دو بار اجرا نکنند. اجراکننده هر HEARTBEAT_INTERVAL ثانیه زمان
+heartbeat_at کارهای در حال اجرای خود را به‌روز می‌کند و فقط کارهایی که اعلام حیاتشان قطع
+شده دوباره در صف قرار می‌گیرند، پس کار طولانی یک اجراکننده زنده دو بار اجرا نمی‌شود.
+
+هر نوع کار با register_job ثبت می‌شود؛ تابع آن پارامترهای اعتبارسنجی‌شده و یک تابع گزارش
+پیشرفت می‌گیرد و نتیجه‌ای قابل تبدیل به JSON برمی‌گرداند.
+"""
+import logging
+import os
+import socket
+import time
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import serializers
+from .models import Job, Student, Term
+from .graduation import evaluate_graduation
+from .rankings import refresh_stale, RANKINGS_JOB
+from .timetable import term_clash_report
+from .transcript import build_transcript, transcript_cache_key, TRANSCRIPT_CACHE_TIMEOUT
+from .utilization import get_utilization
+from .workers import batched
+
+logger = logging.getLogger(__name__)
+
+# انواع کار: نام -> (تابع، سریالایزر پارامترها)
+JOB_TYPES = {}
+# فاصله حداقل (ثانیه) بین دو ثبت پیشرفت در پایگاه داده
+PROGRESS_INTERVAL = 1.0
+# فاصله (ثانیه) اعلام حیات اجراکننده برای کارهای در حال اجرا
+HEARTBEAT_INTERVAL = 10
+
+
+def register_job(kind, params_serializer=None):
+    """ثبت یک نوع کار؛ params_serializer پارامترهای ارسالی در API را اعتبارسنجی می‌کند"""
+    def decorator(func):
+        JOB_TYPES[kind] = (func, params_serializer)
+        return func
+    return decorator
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def submit_job(kind, params=None):
+    """ثبت کار جدید در صف"""
+    if kind not in JOB_TYPES:
+        raise ValueError(f'نوع کار {kind} ثبت نشده است.')
+    return Job.objects.create(kind=kind, params=params or {})
+
+
+def claim_jobs(limit):
+    """برداشتن حداکثر limit کار از ابتدای صف برای اجرا"""
+    claimed = []
+    for job_id in Job.objects.filter(status=Job.Status.QUEUED).order_by('id').values_list('id', flat=True)[:limit]:
+        now = timezone.now()
+        updated = Job.objects.filter(pk=job_id, status=Job.Status.QUEUED).update(
+            status=Job.Status.RUNNING, started_at=now, heartbeat_at=now, worker=worker_name(),
+        )
+        if updated:
+            claimed.append(job_id)
+    return claimed
+
+
+def heartbeat(job_ids):
+    """اعلام حیات اجراکننده برای کارهای در حال اجرای آن"""
+    return Job.objects.filter(pk__in=job_ids, status=Job.Status.RUNNING).update(heartbeat_at=timezone.now())
+
+
+def requeue_stale(older_than):
+    """
+    بازگرداندن کارهای در حال اجرایی که بیش از older_than (timedelta) اعلام حیات نداشته‌اند به صف؛
+    مثلاً پس از از کار افتادن اجراکننده. older_than باید چند برابر HEARTBEAT_INTERVAL باشد.
+    """
+    cutoff = timezone.now() - older_than
+    return Job.objects.filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff),
+        status=Job.Status.RUNNING,
+    ).update(status=Job.Status.QUEUED, progress=0, started_at=None, heartbeat_at=None, worker='')
+
+
+def release_jobs(job_ids):
+    """بازگرداندن کارهای برداشته‌شده‌ای که اجرایشان شروع نشد به صف"""
+    return Job.objects.filter(pk__in=job_ids, status=Job.Status.RUNNING).update(
+        status=Job.Status.QUEUED, progress=0, started_at=None, heartbeat_at=None, worker='',
+    )
+
+
+def fail_jobs(job_ids, error):
+    """ثبت شکست کارهایی که بدون ثبت نتیجه متوقف شدند (مثلاً از کار افتادن پردازه اجراکننده)"""
+    return Job.objects.filter(pk__in=job_ids, status=Job.Status.RUNNING).update(
+        status=Job.Status.FAILED, error=error, finished_at=timezone.now(),
+    )
+
+
+class ProgressReporter:
+    """ثبت پیشرفت کار با محدودیت تعداد نوشتن در پایگاه داده"""
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.reported_at = 0
+
+    def __call__(self, fraction):
+        now = time.monotonic()
+        if now - self.reported_at >= PROGRESS_INTERVAL:
+            self.reported_at = now
+            Job.objects.filter(pk=self.job_id).update(progress=min(max(fraction, 0), 1))
+
+
+def run_job(job_id):
+    """اجرای یک کار برداشته‌شده (در پردازه اجراکننده) و ثبت نتیجه یا خطای آن"""
+    job = Job.objects.get(pk=job_id)
+    try:
+        func, _ = JOB_TYPES[job.kind]
+        result = func(job.params, ProgressReporter(job_id))
+    except Exception as exc:
+        # جزئیات خطا فقط در لاگ سرور؛ API فقط پیام خطا را نشان می‌دهد
+        logger.exception('کار پس‌زمینه #%s (%s) ناموفق بود', job_id, job.kind)
+        Job.objects.filter(pk=job_id).update(
+            status=Job.Status.FAILED, error=str(exc) or type(exc).__name__, finished_at=timezone.now(),
+        )
+        return False
+    Job.objects.filter(pk=job_id).update(
+        status=Job.Status.SUCCEEDED, result=result, progress=1, finished_at=timezone.now(),
+    )
+    return True
+
+
+class TermParamsSerializer(serializers.Serializer):
+    term = serializers.IntegerField()
+
+    def validate_term(self, value):
+        if not Term.objects.filter(pk=value).exists():
+            raise serializers.ValidationError('ترم یافت نشد.')
+        return value
+
+
+@register_job('graduation')
+def graduation_job(params, progress):
+    """ارزیابی فارغ‌التحصیلی همه دانشجویان"""
+    return evaluate_graduation(workers=1, progress=progress)
+
+
+@register_job('transcripts')
+def transcripts_job(params, progress):
+    """محاسبه دوباره کارنامه و معدل همه دانشجویان و جایگزینی نسخه‌های کش‌شده"""
+    student_ids = list(Student.objects.order_by('pk').values_list('pk', flat=True))
+    for done, batch in enumerate(batched(student_ids, 500), 1):
+        cache.set_many(
+            {transcript_cache_key(student.pk): build_transcript(student) for student in Student.objects.filter(pk__in=batch)},
+            TRANSCRIPT_CACHE_TIMEOUT,
+        )
+        progress(done * 500 / len(student_ids))
+    return {'students': len(student_ids)}
+
+
+@register_job('timetable_clashes', TermParamsSerializer)
+def timetable_clashes_job(params, progress):
+    """گزارش تداخل‌های زمانی دانشجویان یک ترم"""
+    clashes = term_clash_report(params['term'])
+    return {'term': params['term'], 'count': len(clashes), 'clashes': clashes}
+
+
+@register_job('utilization', TermParamsSerializer)
+def utilization_job(params, progress):
+    """نقشه حرارتی استفاده از اتاق‌های یک ترم (نتیجه در کش هم قرار می‌گیرد)"""
+    return get_utilization(params['term'])
+
+
+@register_job(RANKINGS_JOB)
+def rankings_job(params, progress):
+    """محاسبه دوباره رتبه‌بندی گروه‌های قدیمی (مثلاً پس از ثبت نمرات پایان ترم)"""
+    return refresh_stale(progress)
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from EducationApp.archive import archivable_terms, archive_term, DEFAULT_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = 'انتقال کلاس‌ها، ثبت‌نام‌ها و تخصیص استادهای ترم‌های بسته‌شده به پایگاه داده archive'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--before-year', type=int, help='بایگانی ترم‌های پیش از این سال (پیش‌فرض: سال ترم جاری)')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                            help='تعداد کلاس‌های هر دسته انتقال')
+        parser.add_argument('--dry-run', action='store_true', help='فقط نمایش تعداد سطرهای قابل بایگانی')
+
+    def handle(self, *args, **options):
+        try:
+            terms = list(archivable_terms(options['before_year']))
+        except ValueError as error:
+            raise CommandError(error)
+        if not terms:
+            self.stdout.write('ترمی برای بایگانی وجود ندارد.')
+            return
+        for term in terms:
+            counts = archive_term(term, batch_size=options['batch_size'], dry_run=options['dry_run'])
+            self.stdout.write(
+                f"{term}: {counts['classes']} کلاس، {counts['enrollments']} ثبت‌نام، "
+                f"{counts['assignments']} تخصیص استاد"
+            )
+        if not options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f'{len(terms)} ترم بایگانی شد.'))
@@ -0,0 +1,30 @@
+import csv
+import sys
+from django.core.management.base import BaseCommand
+from EducationApp.audit import run_audit, DEFAULT_CHUNK_SIZE
+from EducationApp.workers import default_workers
+
+
+class Command(BaseCommand):
+    help = 'بررسی موازی همه سطرهای جدول‌ها با اعتبارسنج‌های مدل و گزارش تخلف‌ها به صورت CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help='مسیر فایل گزارش (پیش‌فرض: خروجی استاندارد)')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                            help='تعداد سطرهای هر بخش')
+        parser.add_argument('--workers', type=int, default=default_workers(),
+                            help='تعداد پردازه‌های موازی (1 برای اجرای بدون pool)')
+
+    def handle(self, *args, **options):
+        output = open(options['output'], 'w', newline='', encoding='utf-8') if options['output'] else sys.stdout
+        try:
+            writer = csv.writer(output)
+            writer.writerow(['model', 'object_id', 'field', 'value', 'message'])
+            summary = run_audit(writer.writerows, chunk_size=options['chunk_size'], workers=options['workers'])
+        finally:
+            if options['output']:
+                output.close()
+
+        for name, counts in summary.items():
+            style = self.style.ERROR if counts['violations'] else self.style.SUCCESS
+            self.stderr.write(style(f"{name}: {counts['checked']} سطر بررسی شد، {counts['violations']} تخلف"))
@@ -0,0 +1,38 @@
+import time
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from EducationApp.models import Enrollment, Student
+from EducationApp.renderers import FastJSONRenderer, MessagePackRenderer
+from EducationApp.serializers import EnrollmentSerializer, StudentSerializer
+
+
+class Command(BaseCommand):
+    help = 'مقایسه زمان رندر و حجم پاسخ رندرکننده‌های API روی صفحه‌های بزرگ ثبت‌نام‌ها و دانشجویان'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='تعداد ردیف هر صفحه')
+        parser.add_argument('--repeat', type=int, default=20, help='تعداد تکرار رندر برای هر رندرکننده')
+
+    def handle(self, *args, **options):
+        renderers = [('JSONRenderer (DRF)', JSONRenderer()), ('FastJSONRenderer', FastJSONRenderer())]
+        if MessagePackRenderer.available:
+            renderers.append(('MessagePackRenderer', MessagePackRenderer()))
+        else:
+            self.stdout.write('msgpack نصب نیست؛ MessagePackRenderer اندازه‌گیری نمی‌شود.')
+
+        pages = [
+            ('enrollments', EnrollmentSerializer(Enrollment.objects.order_by('pk')[:options['rows']], many=True).data),
+            ('students', StudentSerializer(Student.objects.order_by('pk')[:options['rows']], many=True).data),
+        ]
+        for page, data in pages:
+            self.stdout.write(self.style.MIGRATE_HEADING(f'{page}: {len(data)} ردیف'))
+            baseline = None
+            for name, renderer in renderers:
+                started = time.perf_counter()
+                for _ in range(options['repeat']):
+                    content = renderer.render(data, renderer.media_type)
+                elapsed = (time.perf_counter() - started) / options['repeat'] * 1000
+                baseline = baseline or elapsed
+                self.stdout.write(
+                    f'  {name:<22} {elapsed:8.2f} ms  {len(content):>10,} بایت  ({baseline / elapsed:.1f}x)'
+                )
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from EducationApp.graduation import evaluate_graduation, DEFAULT_CHUNK_SIZE
+from EducationApp.workers import default_workers
+
+
+class Command(BaseCommand):
+    help = 'ارزیابی دسته‌ای فارغ‌التحصیلی همه دانشجویان بر اساس واحدهای گذرانده‌شده'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                            help='تعداد دانشجویان هر بخش')
+        parser.add_argument('--workers', type=int, default=default_workers(),
+                            help='تعداد پردازه‌های موازی (1 برای اجرای بدون pool)')
+
+    def handle(self, *args, **options):
+        summary = evaluate_graduation(chunk_size=options['chunk_size'], workers=options['workers'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{summary['evaluated']} دانشجو ارزیابی شد: "
+            f"{summary['graduated']} فارغ‌التحصیل جدید، {summary['reverted']} بازگشت به در حال تحصیل"
+        ))
@@ -0,0 +1,13 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from EducationApp.models import Tombstone
+
+
+class Command(BaseCommand):
+    help = 'پاک کردن رکوردهای حذف‌شده قدیمی‌تر از TOMBSTONE_RETENTION_DAYS (برای اجرای دوره‌ای)'
+
+    def handle(self, *args, **options):
+        count = Tombstone.prune()
+        self.stdout.write(self.style.SUCCESS(
+            f'{count} رکورد حذف‌شده قدیمی‌تر از {settings.TOMBSTONE_RETENTION_DAYS} روز پاک شد.'
+        ))
@@ -0,0 +1,83 @@
+import time
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import connections
+from EducationApp.jobs import HEARTBEAT_INTERVAL, claim_jobs, fail_jobs, heartbeat, release_jobs, requeue_stale, run_job
+from EducationApp.models import Job
+from EducationApp.workers import default_workers, process_pool
+
+BROKEN_POOL_ERROR = 'پردازه اجراکننده پیش از پایان کار از کار افتاد.'
+
+
+class Command(BaseCommand):
+    help = 'اجرای کارهای پس‌زمینه صف (Job) در pool پردازه‌ها'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=default_workers(),
+                            help='تعداد پردازه‌های اجراکننده')
+        parser.add_argument('--poll', type=float, default=2,
+                            help='فاصله بررسی صف (ثانیه) وقتی کاری در صف نیست')
+        parser.add_argument('--stale-after', type=int, default=HEARTBEAT_INTERVAL * 6,
+                            help='کارهای در حال اجرایی که این مدت (ثانیه) اعلام حیات نداشته‌اند دوباره در صف قرار می‌گیرند')
+        parser.add_argument('--once', action='store_true',
+                            help='اجرای کارهای فعلی صف و خروج')
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        stale_after = timedelta(seconds=options['stale_after'])
+        self.requeue(stale_after)
+
+        running = {}
+        beat_at = time.monotonic()
+        pool = process_pool(workers)
+        try:
+            while True:
+                broken = False
+                for future in [future for future in running if future.done()]:
+                    job_id = running.pop(future)
+                    if isinstance(future.exception(), BrokenProcessPool):
+                        broken = True
+                        fail_jobs([job_id], BROKEN_POOL_ERROR)
+                        self.stdout.write(self.style.ERROR(f'کار #{job_id} با از کار افتادن پردازه متوقف شد'))
+                        continue
+                    succeeded = future.exception() is None and future.result()
+                    style = self.style.SUCCESS if succeeded else self.style.ERROR
+                    self.stdout.write(style(f"کار #{job_id} {'انجام شد' if succeeded else 'ناموفق بود'}"))
+
+                if time.monotonic() - beat_at >= HEARTBEAT_INTERVAL:
+                    beat_at = time.monotonic()
+                    heartbeat(list(running.values()))
+                    self.requeue(stale_after)
+
+                claimed = claim_jobs(workers - len(running)) if len(running) < workers and not broken else []
+                # اتصال پیش از ایجاد پردازه‌های جدید بسته می‌شود تا به فرزندان به ارث نرسد
+                connections.close_all()
+                for index, job_id in enumerate(claimed):
+                    try:
+                        running[pool.submit(run_job, job_id)] = job_id
+                    except BrokenProcessPool:
+                        broken = True
+                        release_jobs(claimed[index:])
+                        break
+
+                if broken:
+                    # کارهای دیگر همان pool هم متوقف شده‌اند؛ pool تازه برای ادامه صف
+                    fail_jobs(list(running.values()), BROKEN_POOL_ERROR)
+                    running.clear()
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    pool = process_pool(workers)
+                    self.stdout.write(self.style.WARNING('pool پردازه‌ها دوباره ساخته شد'))
+                    continue
+
+                if options['once'] and not running and not Job.objects.filter(status=Job.Status.QUEUED).exists():
+                    break
+                if not claimed:
+                    time.sleep(options['poll'] if not running else 0.2)
+        finally:
+            pool.shutdown()
+
+    def requeue(self, stale_after):
+        requeued = requeue_stale(stale_after)
+        if requeued:
+            self.stdout.write(f'{requeued} کار متوقف‌شده دوباره در صف قرار گرفت')
@@ -0,0 +1,52 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from EducationApp.snapshots import (
+    SNAPSHOT_PROFILES, SnapshotError, build_snapshot, restore_snapshot, snapshot_metadata, is_current,
+)
+
+
+class Command(BaseCommand):
+    help = 'ساخت، بازیابی و فهرست snapshotهای پایگاه داده (پروفایل‌های داده نمونه)'
+
+    def add_arguments(self, parser):
+        subparsers = parser.add_subparsers(dest='action', required=True)
+        build = subparsers.add_parser('build', help='ساخت snapshot پروفایل‌ها')
+        build.add_argument('names', nargs='*', help='نام پروفایل‌ها (پیش‌فرض: همه)')
+        build.add_argument('--force', action='store_true', help='ساخت دوباره حتی اگر snapshot به‌روز باشد')
+        restore = subparsers.add_parser('restore', help='جایگزینی پایگاه داده با یک snapshot')
+        restore.add_argument('name')
+        restore.add_argument('--database', default='default')
+        subparsers.add_parser('list', help='فهرست پروفایل‌ها و وضعیت snapshot آن‌ها')
+
+    def handle(self, *args, **options):
+        try:
+            getattr(self, f"handle_{options['action']}")(options)
+        except SnapshotError as error:
+            raise CommandError(error)
+
+    def handle_build(self, options):
+        for name in options['names'] or SNAPSHOT_PROFILES:
+            if not options['force'] and is_current(name):
+                self.stdout.write(f'{name}: به‌روز است')
+                continue
+            started = time.perf_counter()
+            path = build_snapshot(name)
+            self.stdout.write(self.style.SUCCESS(f'{name}: {path} در {time.perf_counter() - started:.1f} ثانیه ساخته شد'))
+
+    def handle_restore(self, options):
+        started = time.perf_counter()
+        restore_snapshot(options['name'], using=options['database'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{options['name']} در {time.perf_counter() - started:.3f} ثانیه بازیابی شد"
+        ))
+
+    def handle_list(self, options):
+        for name, profile in SNAPSHOT_PROFILES.items():
+            metadata = snapshot_metadata(name)
+            if metadata is None:
+                state = 'ساخته نشده'
+            elif is_current(name):
+                state = f"به‌روز ({metadata['built_at']})"
+            else:
+                state = 'قدیمی (مهاجرت‌ها تغییر کرده‌اند)'
+            self.stdout.write(f"{name}: {profile['students']} دانشجو - {state}")
@@ -0,0 +1,22 @@
+import csv
+from django.core.management.base import BaseCommand, CommandError
+from EducationApp.models import Term
+from EducationApp.timetable import term_clash_report
+
+
+class Command(BaseCommand):
+    help = 'گزارش تداخل‌های زمانی برنامه دانشجویان در یک ترم به صورت CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--term', type=int, help='شناسه ترم (پیش‌فرض: ترم جاری)')
+
+    def handle(self, *args, **options):
+        terms = Term.objects.filter(pk=options['term']) if options['term'] else Term.objects.filter(is_current=True)
+        term = terms.first()
+        if term is None:
+            raise CommandError('ترم مورد نظر یافت نشد.')
+
+        writer = csv.writer(self.stdout)
+        writer.writerow(['student', 'day_of_week', 'class_1', 'class_2'])
+        for clash in term_clash_report(term.pk):
+            writer.writerow([clash['student'], clash['day_of_week'], *clash['classes']])
@@ -0,0 +1,219 @@
+import asyncio
+import math
+import mimetypes
+import re
+import time
+from pathlib import Path
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified, JsonResponse, StreamingHttpResponse
+from django.utils.http import http_date
+from .throttling import get_store
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class AdmissionControlMiddleware:
+    """
+    صف پذیرش محدود برای درخواست‌های نوشتنی API
+    حداکثر limit درخواست نوشتنی همزمان (در همه پردازه‌ها) اجرا می‌شود و تا queue درخواست دیگر
+    حداکثر timeout ثانیه به ترتیب ورود منتظر می‌مانند. درخواست‌های اضافه به جای رقابت بر سر قفل
+    نوشتن SQLite، فوراً با 503 و هدر Retry-After رد می‌شوند.
+    روی سرور ASGI انتظار با asyncio.sleep انجام می‌شود (__acall__) تا درخواست در صف، رشته‌ای را
+    که درخواست‌های دیگر روی آن اجرا می‌شوند مشغول نکند.
+    تنظیمات در ADMISSION_CONTROL: limit، queue، timeout، retry_after و path_prefix
+    """
+    sync_capable = True
+    async_capable = True
+    poll_interval = 0.05
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        config = {
+            'limit': 4, 'queue': 32, 'timeout': 5, 'retry_after': 2, 'path_prefix': '/EducationApp/api/',
+            **getattr(settings, 'ADMISSION_CONTROL', {}),
+        }
+        self.limit = config['limit']
+        self.queue = config['queue']
+        self.timeout = config['timeout']
+        self.retry_after = config['retry_after']
+        self.path_prefix = config['path_prefix']
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def controls(self, request):
+        return request.method not in SAFE_METHODS and request.path.startswith(self.path_prefix)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.controls(request):
+            return self.get_response(request)
+
+        store = get_store()
+        lease = store.request_lease('write', self.limit, self.queue)
+        if lease is None:
+            return self.reject()
+        lease_id, admitted = lease
+        try:
+            deadline = time.monotonic() + self.timeout
+            while not admitted:
+                if time.monotonic() >= deadline:
+                    return self.reject()
+                time.sleep(self.poll_interval)
+                admitted = store.promote_lease(lease_id, 'write', self.limit)
+            return self.get_response(request)
+        finally:
+            store.release_lease(lease_id)
+
+    async def __acall__(self, request):
+        if not self.controls(request):
+            return await self.get_response(request)
+
+        store = get_store()
+        # هر رشته اتصال SQLite خودش را به THROTTLE_DB دارد، پس نیازی به رشته مشترک نیست
+        request_lease, promote_lease, release_lease = (
+            sync_to_async(method, thread_sensitive=False)
+            for method in (store.request_lease, store.promote_lease, store.release_lease)
+        )
+        lease = await request_lease('write', self.limit, self.queue)
+        if lease is None:
+            return self.reject()
+        lease_id, admitted = lease
+        try:
+            deadline = time.monotonic() + self.timeout
+            while not admitted:
+                if time.monotonic() >= deadline:
+                    return self.reject()
+                await asyncio.sleep(self.poll_interval)
+                admitted = await promote_lease(lease_id, 'write', self.limit)
+            return await self.get_response(request)
+        finally:
+            await release_lease(lease_id)
+
+    def reject(self):
+        response = JsonResponse(
+            {'detail': 'سرور در حال حاضر درخواست‌های زیادی دارد؛ لطفاً کمی بعد دوباره تلاش کنید.'}, status=503
+        )
+        response['Retry-After'] = str(math.ceil(self.retry_after))
+        return response
+
+
+class StaticFilesMiddleware:
+    """
+    سرو فایل‌های جمع‌آوری‌شده با collectstatic (STATIC_ROOT) درون پردازه جنگو
+    - فایل‌های با نام hash شده با Cache-Control یک‌ساله و immutable، بقیه با اعتبارسنجی ETag
+    - نسخه br یا gzip از پیش ساخته‌شده بر اساس Accept-Encoding
+    - پاسخ 304 برای If-None-Match و پاسخ 206 برای درخواست Range (یک بازه)
+    در حالت DEBUG غیرفعال است و runserver فایل‌ها را از پوشه‌های منبع سرو می‌کند.
+    """
+    max_age = 60 * 60 * 24 * 365
+    chunk_size = 64 * 1024
+    encodings = (('br', '.br'), ('gzip', '.gz'))
+    range_pattern = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+    def __init__(self, get_response):
+        if settings.DEBUG or not settings.STATIC_ROOT:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.root = Path(settings.STATIC_ROOT).resolve()
+        self.prefix = settings.STATIC_URL if settings.STATIC_URL.startswith('/') else f'/{settings.STATIC_URL}'
+        self.immutable = set(getattr(staticfiles_storage, 'hashed_files', {}).values())
+
+    def __call__(self, request):
+        if request.method not in ('GET', 'HEAD') or not request.path_info.startswith(self.prefix):
+            return self.get_response(request)
+        name = request.path_info[len(self.prefix):]
+        path = (self.root / name).resolve()
+        if not path.is_relative_to(self.root) or not path.is_file():
+            return self.get_response(request)
+        return self.serve(request, name, path)
+
+    def accepted_encodings(self, request):
+        accepted = set()
+        for item in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+            coding, _, params = item.strip().partition(';')
+            if params.strip().replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+                accepted.add(coding.strip().lower())
+        return accepted
+
+    def parse_range(self, header, size):
+        """بازه (شروع، پایان شامل) درخواست Range؛ None برای هدر نامفهوم و False برای بازه خارج از فایل"""
+        match = self.range_pattern.match(header.strip())
+        if not match or match.groups() == ('', ''):
+            return None
+        start, end = match.groups()
+        if start == '':
+            start, end = max(size - int(end), 0), size - 1
+        else:
+            start, end = int(start), min(int(end), size - 1) if end else size - 1
+        if start >= size or start > end:
+            return False
+        return start, end
+
+    def serve(self, request, name, path):
+        body_path, encoding = path, None
+        range_header = request.META.get('HTTP_RANGE')
+        if not range_header:
+            accepted = self.accepted_encodings(request)
+            for coding, suffix in self.encodings:
+                variant = path.with_name(path.name + suffix)
+                if coding in accepted and variant.is_file():
+                    body_path, encoding = variant, coding
+                    break
+
+        stat = body_path.stat()
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}{"-" + encoding if encoding else ""}"'
+        headers = {
+            'ETag': etag,
+            'Last-Modified': http_date(stat.st_mtime),
+            'Accept-Ranges': 'bytes',
+            'Vary': 'Accept-Encoding',
+            'Cache-Control': (
+                f'public, max-age={self.max_age}, immutable' if name in self.immutable else 'public, max-age=0, must-revalidate'
+            ),
+        }
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match and (if_none_match.strip() == '*' or etag in [tag.strip() for tag in if_none_match.split(',')]):
+            return self._with_headers(HttpResponseNotModified(), headers)
+
+        content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        size = stat.st_size
+        if range_header and request.META.get('HTTP_IF_RANGE', etag) == etag:
+            byte_range = self.parse_range(range_header, size)
+            if byte_range is False:
+                response = HttpResponse(status=416)
+                response['Content-Range'] = f'bytes */{size}'
+                return self._with_headers(response, headers)
+            if byte_range is not None:
+                start, end = byte_range
+                response = StreamingHttpResponse(
+                    self._read_range(body_path, start, end - start + 1), status=206, content_type=content_type
+                )
+                response['Content-Range'] = f'bytes {start}-{end}/{size}'
+                response['Content-Length'] = str(end - start + 1)
+                return self._with_headers(response, headers)
+
+        response = FileResponse(body_path.open('rb'), content_type=content_type)
+        if encoding:
+            response['Content-Encoding'] = encoding
+        return self._with_headers(response, headers)
+
+    def _read_range(self, path, start, length):
+        with path.open('rb') as file:
+            file.seek(start)
+            while length > 0:
+                chunk = file.read(min(self.chunk_size, length))
+                if not chunk:
+                    break
+                length -= len(chunk)
+                yield chunk
+
+    @staticmethod
+    def _with_headers(response, headers):
+        for key, value in headers.items():
+            response[key] = value
+        return response
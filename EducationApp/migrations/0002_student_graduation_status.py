@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('EducationApp', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='graduation_status',
+            field=models.CharField(choices=[('S', 'در حال تحصیل'), ('G', 'فارغ\u200cالتحصیل')], db_index=True, default='S', help_text='وضعیت فارغ\u200cالتحصیلی که توسط پردازش دسته\u200cای تعیین می\u200cشود', max_length=1, verbose_name='وضعیت فارغ\u200cالتحصیلی'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:18
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('EducationApp', '0002_student_graduation_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(help_text='نام مدل تغییر یافته', max_length=50, verbose_name='مدل')),
+                ('object_id', models.PositiveBigIntegerField(help_text='شناسه رکورد تغییر یافته', verbose_name='شناسه شیء')),
+                ('action', models.CharField(choices=[('C', 'ایجاد'), ('U', 'ویرایش'), ('D', 'حذف')], help_text='نوع تغییر', max_length=1, verbose_name='عملیات')),
+                ('data', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder, help_text='مقادیر رکورد پس از تغییر (برای حذف، آخرین مقادیر)', verbose_name='داده')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='زمان ثبت')),
+            ],
+            options={
+                'verbose_name': 'رویداد تغییر',
+                'verbose_name_plural': 'رویدادهای تغییر',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['model', 'id'], name='EducationAp_model_dae62e_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('EducationApp', '0003_changeevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='class',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='زمان آخرین ایجاد یا ویرایش رکورد', verbose_name='زمان آخرین تغییر'),
+        ),
+        migrations.AddField(
+            model_name='contactinfo',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='زمان آخرین ایجاد یا ویرایش رکورد', verbose_name='زمان آخرین تغییر'),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='زمان آخرین ایجاد یا ویرایش رکورد', verbose_name='زمان آخرین تغییر'),
+        ),
+        migrations.AddField(
+            model_name='courseassignment',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='زمان آخرین ایجاد یا ویرایش رکورد', verbose_name='زمان آخرین تغییر'),
+        ),
+        migrations.AddField(
+            model_name='enrollment',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='زمان آخرین ایجاد یا ویرایش رکورد', verbose_name='زمان آخرین تغییر'),
+        ),
+        migrations.AddField(
+            model_name='faculty',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='زمان آخرین ایجاد یا ویرایش رکورد', verbose_name='زمان آخرین تغییر'),
+        ),
+        migrations.AddField(
+            model_name='major',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='زمان آخرین ایجاد یا ویرایش رکورد', verbose_name='زمان آخرین تغییر'),
+        ),
+        migrations.AddField(
+            model_name='professor',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='زمان آخرین ایجاد یا ویرایش رکورد', verbose_name='زمان آخرین تغییر'),
+        ),
+        migrations.AddField(
+            model_name='room',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='زمان آخرین ایجاد یا ویرایش رکورد', verbose_name='زمان آخرین تغییر'),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='زمان آخرین ایجاد یا ویرایش رکورد', verbose_name='زمان آخرین تغییر'),
+        ),
+        migrations.AddField(
+            model_name='term',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='زمان آخرین ایجاد یا ویرایش رکورد', verbose_name='زمان آخرین تغییر'),
+        ),
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(help_text='نام مدل رکورد حذف\u200cشده', max_length=50, verbose_name='مدل')),
+                ('object_id', models.PositiveBigIntegerField(help_text='شناسه رکورد حذف\u200cشده', verbose_name='شناسه شیء')),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='زمان حذف')),
+            ],
+            options={
+                'verbose_name': 'رکورد حذف\u200cشده',
+                'verbose_name_plural': 'رکوردهای حذف\u200cشده',
+                'indexes': [models.Index(fields=['model', 'deleted_at'], name='EducationAp_model_1a9225_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('EducationApp', '0004_timestamps_tombstones'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='enrollment',
+            name='status',
+            field=models.CharField(choices=[('R', 'ثبت\u200cنام\u200cشده'), ('P', 'پاس\u200cشده'), ('F', 'مردود')], default='R', help_text='وضعیت ثبت\u200cنام (بر اساس نمره تعیین می\u200cشود)', max_length=1, verbose_name='وضعیت'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:22
+
+import django.core.validators
+from django.db import migrations, models
+
+from EducationApp.jalali import jalali_strings_to_gregorian
+
+
+def fill_birth_dates(apps, schema_editor):
+    """محاسبه برداری تاریخ تولد میلادی و ماه تولد برای رکوردهای موجود"""
+    for model_name in ('Student', 'Professor'):
+        model = apps.get_model('EducationApp', model_name)
+        people = list(model.objects.only('id', 'birth_date'))
+        dates, months = jalali_strings_to_gregorian([person.birth_date for person in people])
+        for person, birth, month in zip(people, dates.tolist(), months.tolist()):
+            person.birth_date_gregorian = birth
+            person.birth_month = month or None
+        model.objects.bulk_update(people, ['birth_date_gregorian', 'birth_month'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('EducationApp', '0005_enrollment_status_help'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='professor',
+            name='birth_date_gregorian',
+            field=models.DateField(blank=True, db_index=True, editable=False, help_text='معادل میلادی تاریخ تولد برای جستجو و مرتب\u200cسازی (از روی birth_date محاسبه می\u200cشود)', null=True, verbose_name='تاریخ تولد (میلادی)'),
+        ),
+        migrations.AddField(
+            model_name='professor',
+            name='birth_month',
+            field=models.PositiveSmallIntegerField(blank=True, db_index=True, editable=False, help_text='ماه تولد شمسی (از روی birth_date محاسبه می\u200cشود)', null=True, verbose_name='ماه تولد (شمسی)'),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='birth_date_gregorian',
+            field=models.DateField(blank=True, db_index=True, editable=False, help_text='معادل میلادی تاریخ تولد برای جستجو و مرتب\u200cسازی (از روی birth_date محاسبه می\u200cشود)', null=True, verbose_name='تاریخ تولد (میلادی)'),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='birth_month',
+            field=models.PositiveSmallIntegerField(blank=True, db_index=True, editable=False, help_text='ماه تولد شمسی (از روی birth_date محاسبه می\u200cشود)', null=True, verbose_name='ماه تولد (شمسی)'),
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='entry_year',
+            field=models.CharField(db_index=True, help_text='سال ورود به دانشگاه (شمسی)', max_length=4, validators=[django.core.validators.RegexValidator(message='سال ورود باید 4 رقم باشد.', regex='^\\d{4}$')], verbose_name='سال ورود (شمسی)'),
+        ),
+        migrations.RunPython(fill_birth_dates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:34
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('EducationApp', '0006_person_birth_date_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=50, verbose_name='نوع کار')),
+                ('params', models.JSONField(blank=True, default=dict, verbose_name='پارامترها')),
+                ('status', models.CharField(choices=[('Q', 'در صف'), ('R', 'در حال اجرا'), ('S', 'موفق'), ('F', 'ناموفق')], db_index=True, default='Q', max_length=1, verbose_name='وضعیت')),
+                ('progress', models.FloatField(default=0, help_text='عددی بین 0 و 1', verbose_name='پیشرفت')),
+                ('result', models.JSONField(blank=True, encoder=django.core.serializers.json.DjangoJSONEncoder, null=True, verbose_name='نتیجه')),
+                ('error', models.TextField(blank=True, verbose_name='خطا')),
+                ('worker', models.CharField(blank=True, help_text='میزبان و شناسه پردازه', max_length=100, verbose_name='اجراکننده')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='زمان ثبت')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='زمان شروع')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='زمان پایان')),
+            ],
+            options={
+                'verbose_name': 'کار پس\u200cزمینه',
+                'verbose_name_plural': 'کارهای پس\u200cزمینه',
+                'ordering': ['-id'],
+                'indexes': [models.Index(fields=['status', 'id'], name='EducationAp_status_4fc59c_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('EducationApp', '0007_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CoursePrerequisite',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True, help_text='زمان آخرین ایجاد یا ویرایش رکورد', verbose_name='زمان آخرین تغییر')),
+            ],
+            options={
+                'verbose_name': 'پیش\u200cنیاز درس',
+                'verbose_name_plural': 'پیش\u200cنیازهای دروس',
+            },
+        ),
+        migrations.CreateModel(
+            name='CoursePrerequisiteClosure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ],
+            options={
+                'verbose_name': 'بستار پیش\u200cنیاز',
+                'verbose_name_plural': 'بستار پیش\u200cنیازها',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['student', 'status'], name='EducationAp_student_df7055_idx'),
+        ),
+        migrations.AddField(
+            model_name='courseprerequisite',
+            name='course',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='prerequisite_links', to='EducationApp.course', verbose_name='درس'),
+        ),
+        migrations.AddField(
+            model_name='courseprerequisite',
+            name='prerequisite',
+            field=models.ForeignKey(help_text='درسی که باید پیش از این درس گذرانده شود', on_delete=django.db.models.deletion.CASCADE, related_name='required_by_links', to='EducationApp.course', verbose_name='پیش\u200cنیاز'),
+        ),
+        migrations.AddField(
+            model_name='courseprerequisiteclosure',
+            name='course',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='EducationApp.course', verbose_name='درس'),
+        ),
+        migrations.AddField(
+            model_name='courseprerequisiteclosure',
+            name='prerequisite',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='EducationApp.course', verbose_name='پیش\u200cنیاز'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='courseprerequisite',
+            unique_together={('course', 'prerequisite')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='courseprerequisiteclosure',
+            unique_together={('course', 'prerequisite')},
+        ),
+    ]
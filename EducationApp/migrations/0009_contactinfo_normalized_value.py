@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 20:05
+
+from django.db import migrations, models
+
+from EducationApp.contacts import normalize_email, normalize_phone
+
+
+def fill_normalized_values(apps, schema_editor):
+    """محاسبه مقدار استاندارد اطلاعات تماس موجود"""
+    ContactInfo = apps.get_model('EducationApp', 'ContactInfo')
+    contacts = list(ContactInfo.objects.only('id', 'contact_type', 'value'))
+    for contact in contacts:
+        contact.normalized_value = (
+            normalize_email(contact.value) if contact.contact_type == 'E' else normalize_phone(contact.value)
+        )
+    ContactInfo.objects.bulk_update(contacts, ['normalized_value'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('EducationApp', '0008_course_prerequisites'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contactinfo',
+            name='normalized_value',
+            field=models.CharField(db_index=True, default='', editable=False, help_text='شماره با قالب E.164 یا ایمیل با حروف کوچک، برای جستجوی صاحب شماره یا ایمیل (contacts.py)', max_length=100, verbose_name='مقدار استاندارد'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_normalized_values, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('EducationApp', '0009_contactinfo_normalized_value'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RankingCohort',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entry_year', models.CharField(max_length=4, verbose_name='سال ورود (شمسی)')),
+                ('is_stale', models.BooleanField(db_index=True, default=True, verbose_name='نیاز به محاسبه دوباره')),
+                ('size', models.PositiveIntegerField(default=0, verbose_name='تعداد دانشجویان رتبه\u200cبندی\u200cشده')),
+                ('refreshed_at', models.DateTimeField(blank=True, null=True, verbose_name='زمان آخرین محاسبه')),
+                ('major', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ranking_cohorts', to='EducationApp.major', verbose_name='رشته')),
+            ],
+            options={
+                'verbose_name': 'گروه رتبه\u200cبندی',
+                'verbose_name_plural': 'گروه\u200cهای رتبه\u200cبندی',
+                'unique_together': {('major', 'entry_year')},
+            },
+        ),
+        migrations.CreateModel(
+            name='StudentRanking',
+            fields=[
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='ranking', serialize=False, to='EducationApp.student', verbose_name='دانشجو')),
+                ('entry_year', models.CharField(max_length=4, verbose_name='سال ورود (شمسی)')),
+                ('gpa', models.FloatField(verbose_name='معدل کل')),
+                ('graded_credits', models.PositiveIntegerField(verbose_name='واحدهای دارای نمره')),
+                ('rank', models.PositiveIntegerField(verbose_name='رتبه')),
+                ('major', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='EducationApp.major', verbose_name='رشته')),
+            ],
+            options={
+                'verbose_name': 'رتبه دانشجو',
+                'verbose_name_plural': 'رتبه\u200cهای دانشجویان',
+                'indexes': [models.Index(fields=['major', 'entry_year', 'rank'], name='EducationAp_major_i_8ebb32_idx')],
+            },
+        ),
+    ]
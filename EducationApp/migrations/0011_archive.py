@@ -0,0 +1,75 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('EducationApp', '0010_student_rankings'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedClass',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('course_id', models.PositiveBigIntegerField(db_index=True, verbose_name='شناسه درس')),
+                ('course_code', models.CharField(max_length=10, verbose_name='کد درس')),
+                ('course_name', models.CharField(max_length=100, verbose_name='نام درس')),
+                ('credits', models.PositiveIntegerField(verbose_name='تعداد واحد')),
+                ('term_id', models.PositiveBigIntegerField(db_index=True, verbose_name='شناسه ترم')),
+                ('term_year', models.CharField(max_length=4, verbose_name='سال ترم')),
+                ('term_season', models.CharField(choices=[('F', 'پاییز'), ('S', 'بهار')], max_length=1, verbose_name='فصل ترم')),
+                ('room_id', models.PositiveBigIntegerField(verbose_name='شناسه اتاق')),
+                ('day_of_week', models.CharField(max_length=10, verbose_name='روز هفته')),
+                ('start_time', models.TimeField(verbose_name='زمان شروع')),
+                ('end_time', models.TimeField(verbose_name='زمان پایان')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='زمان بایگانی')),
+            ],
+            options={
+                'verbose_name': 'کلاس بایگانی\u200cشده',
+                'verbose_name_plural': 'کلاس\u200cهای بایگانی\u200cشده',
+            },
+        ),
+        migrations.CreateModel(
+            name='StudentArchiveSummary',
+            fields=[
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='archive_summary', serialize=False, to='EducationApp.student', verbose_name='دانشجو')),
+                ('graded_credits', models.PositiveIntegerField(default=0, verbose_name='واحدهای دارای نمره')),
+                ('grade_points', models.FloatField(default=0, verbose_name='مجموع نمره × واحد')),
+                ('passed_credits', models.PositiveIntegerField(default=0, verbose_name='واحدهای گذرانده')),
+            ],
+            options={
+                'verbose_name': 'خلاصه بایگانی دانشجو',
+                'verbose_name_plural': 'خلاصه\u200cهای بایگانی دانشجویان',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedCourseAssignment',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('professor_id', models.PositiveBigIntegerField(db_index=True, verbose_name='شناسه استاد')),
+                ('class_instance', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='course_assignments', to='EducationApp.archivedclass', verbose_name='کلاس')),
+            ],
+            options={
+                'verbose_name': 'تخصیص درس بایگانی\u200cشده',
+                'verbose_name_plural': 'تخصیص دروس بایگانی\u200cشده',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedEnrollment',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('student_id', models.PositiveBigIntegerField(db_index=True, verbose_name='شناسه دانشجو')),
+                ('grade', models.FloatField(blank=True, null=True, verbose_name='نمره')),
+                ('status', models.CharField(choices=[('R', 'ثبت\u200cنام\u200cشده'), ('P', 'پاس\u200cشده'), ('F', 'مردود')], max_length=1, verbose_name='وضعیت')),
+                ('class_instance', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='enrollments', to='EducationApp.archivedclass', verbose_name='کلاس')),
+            ],
+            options={
+                'verbose_name': 'ثبت\u200cنام بایگانی\u200cشده',
+                'verbose_name_plural': 'ثبت\u200cنام\u200cهای بایگانی\u200cشده',
+            },
+        ),
+    ]
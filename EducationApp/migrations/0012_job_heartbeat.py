@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 20:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('EducationApp', '0011_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, help_text='اجراکننده این زمان را برای کارهای در حال اجرای خود مرتب به\u200cروز می\u200cکند', null=True, verbose_name='آخرین اعلام حیات'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+from django.db import migrations
+
+# همان مقدار PASSING_GRADE در models.py در زمان نوشتن این مهاجرت
+PASSING_GRADE = 10
+
+
+def fill_statuses(apps, schema_editor):
+    """
+    تعیین وضعیت ثبت‌نام‌های موجود از روی نمره (0005 فقط توضیح فیلد را تغییر داد)
+    مثلاً ثبت‌نام با نمره 0 و وضعیت «ثبت‌نام‌شده» مردود می‌شود.
+    """
+    Enrollment = apps.get_model('EducationApp', 'Enrollment')
+    enrollments = Enrollment.objects.using(schema_editor.connection.alias)
+    enrollments.filter(grade__isnull=True).exclude(status='R').update(status='R')
+    enrollments.filter(grade__gte=PASSING_GRADE).exclude(status='P').update(status='P')
+    enrollments.filter(grade__lt=PASSING_GRADE).exclude(status='F').update(status='F')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('EducationApp', '0012_job_heartbeat'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_statuses, migrations.RunPython.noop),
+    ]
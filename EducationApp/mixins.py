@@ -0,0 +1,239 @@
+from datetime import datetime, time
+from functools import lru_cache
+from django.core.exceptions import FieldDoesNotExist
+from django.http import Http404
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime, parse_date
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from .jalali import MIN_JALALI_YEAR, MAX_JALALI_YEAR
+from .models import Tombstone
+from .renderers import ICalendarRenderer
+from .timetable import get_timetable
+
+
+class ModifiedSinceMixin:
+    """
+    افزودن فیلتر ?modified_since=<زمان ISO> به لیست ViewSet ها
+    فقط رکوردهایی که از آن زمان به بعد ایجاد یا ویرایش شده‌اند برگردانده می‌شوند و
+    شناسه رکوردهای حذف‌شده در کلید deleted می‌آید. مقدار synced_at پاسخ را می‌توان
+    در همگام‌سازی بعدی به عنوان modified_since فرستاد.
+    حداکثر max_deleted حذف (قدیمی‌ترین‌ها) برگردانده می‌شود؛ اگر deleted_has_more برقرار باشد
+    synced_at زمان آخرین حذف برگردانده‌شده است و درخواست بعدی بقیه را برمی‌گرداند.
+    زمان قدیمی‌تر از مدت نگهداری حذف‌ها (TOMBSTONE_RETENTION_DAYS) پذیرفته نمی‌شود.
+    """
+    modified_since_param = 'modified_since'
+    max_deleted = 1000
+
+    def get_modified_since(self):
+        value = self.request.query_params.get(self.modified_since_param)
+        if not value:
+            return None
+        try:
+            parsed = parse_datetime(value)
+            if parsed is None:
+                parsed_date = parse_date(value)
+                parsed = datetime.combine(parsed_date, time.min) if parsed_date else None
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise ValidationError({self.modified_since_param: 'زمان باید با فرمت ISO 8601 باشد.'})
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        if parsed < Tombstone.retention_start():
+            raise ValidationError({
+                self.modified_since_param: 'حذف‌های پیش از این زمان نگهداری نمی‌شوند؛ همه داده را دوباره دریافت کنید.',
+            })
+        return parsed
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            since = self.get_modified_since()
+            if since is not None:
+                queryset = queryset.filter(updated_at__gte=since)
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        synced_at = timezone.now()
+        response = super().list(request, *args, **kwargs)
+        since = self.get_modified_since()
+        if since is not None and isinstance(response.data, dict):
+            tombstones = list(
+                Tombstone.objects
+                .filter(model=self.queryset.model._meta.model_name, deleted_at__gte=since)
+                .order_by('deleted_at', 'id')
+                .values_list('object_id', 'deleted_at')[:self.max_deleted + 1]
+            )
+            has_more = len(tombstones) > self.max_deleted
+            tombstones = tombstones[:self.max_deleted]
+            response.data['deleted'] = list(dict.fromkeys(object_id for object_id, _ in tombstones))
+            response.data['deleted_has_more'] = has_more
+            response.data['synced_at'] = tombstones[-1][1] if has_more else synced_at
+        return response
+
+
+class TimetableMixin:
+    """
+    افزودن /<id>/timetable/ به ViewSet: برنامه هفتگی ترم جاری به تفکیک روز (timetable.py)
+    با ?format=ics خروجی iCalendar از روی همان برنامه کش‌شده ساخته می‌شود.
+    """
+    timetable_kind = None
+
+    @action(detail=True, methods=['get'], renderer_classes=[*api_settings.DEFAULT_RENDERER_CLASSES, ICalendarRenderer])
+    def timetable(self, request, pk=None):
+        try:
+            owner_id = int(pk)
+        except (TypeError, ValueError):
+            raise Http404
+        response = Response(get_timetable(self.timetable_kind, owner_id, self.get_object))
+        if request.accepted_renderer.format == ICalendarRenderer.format:
+            response['Content-Disposition'] = f'attachment; filename="timetable-{self.timetable_kind}-{owner_id}.ics"'
+        return response
+
+
+class PersonFilterMixin:
+    """
+    فیلترهای سن و تاریخ تولد برای ViewSet های افراد که به صورت بازه روی ستون‌های ایندکس‌شده اجرا می‌شوند
+    - ?min_age=20&max_age=25: افراد با سن بین دو مقدار
+    - ?birth_year=1378: متولدین یک سال شمسی
+    - ?birth_month=7: متولدین یک ماه شمسی
+    """
+    max_age = 150
+
+    def _int_filter(self, name, minimum=0, maximum=None):
+        value = self.request.query_params.get(name)
+        if value in (None, ''):
+            return None
+        try:
+            value = int(value)
+        except ValueError:
+            raise ValidationError({name: 'باید یک عدد صحیح باشد.'})
+        if value < minimum or (maximum is not None and value > maximum):
+            raise ValidationError({name: 'مقدار خارج از محدوده مجاز است.'})
+        return value
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action != 'list':
+            return queryset
+        min_age = self._int_filter('min_age', maximum=self.max_age)
+        max_age = self._int_filter('max_age', maximum=self.max_age)
+        if min_age is not None or max_age is not None:
+            queryset = queryset.aged_between(min_age, max_age)
+        birth_year = self._int_filter('birth_year', minimum=MIN_JALALI_YEAR, maximum=MAX_JALALI_YEAR)
+        if birth_year is not None:
+            queryset = queryset.born_in_year(birth_year)
+        birth_month = self._int_filter('birth_month', minimum=1, maximum=12)
+        if birth_month is not None:
+            queryset = queryset.born_in_month(birth_month)
+        return queryset
+
+
+def _relation(model, name):
+    """
+    رابطه name از model: (مدل مرتبط، نام attribute، چندتایی بودن)
+    برای نام نامعتبر یا رابطه بدون سریالایزر ثبت‌شده None
+    """
+    from .serializers import MODEL_SERIALIZERS
+    try:
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+    if not field.is_relation or field.related_model not in MODEL_SERIALIZERS:
+        return None
+    accessor = field.get_accessor_name() if field.auto_created and not field.concrete else field.name
+    return field.related_model, accessor, field.one_to_many or field.many_to_many
+
+
+def _freeze(tree):
+    return tuple(sorted((name, _freeze(subtree)) for name, subtree in tree.items()))
+
+
+@lru_cache(maxsize=256)
+def _expanded_serializer(serializer_class, frozen_tree):
+    """زیرکلاس سریالایزر که روابط درخت expand را به صورت تودرتو (فقط خواندنی) برمی‌گرداند"""
+    from .serializers import MODEL_SERIALIZERS
+    model = serializer_class.Meta.model
+    attrs = {}
+    for name, subtree in frozen_tree:
+        related_model, accessor, many = _relation(model, name)
+        nested_class = _expanded_serializer(MODEL_SERIALIZERS[related_model], subtree)
+        attrs[accessor] = nested_class(many=many, read_only=True)
+    fields = serializer_class.Meta.fields
+    if fields != '__all__':
+        fields = [*fields, *(name for name in attrs if name not in fields)]
+    attrs['Meta'] = type('Meta', (serializer_class.Meta,), {'fields': fields})
+    return type(f'Expanded{serializer_class.__name__}', (serializer_class,), attrs)
+
+
+class ExpandMixin:
+    """
+    باز کردن روابط در پاسخ با ?expand=class_instance.course,class_instance.room,student
+    هر مسیر با نقطه جدا می‌شود و به جای شناسه، شیء کامل (با سریالایزر پیش‌فرض مدل) برمی‌گردد.
+    روابط تک‌مقداری با select_related و روابط چندمقداری (مانند enrollments) با prefetch_related
+    بارگذاری می‌شوند، پس تعداد کوئری‌ها به تعداد ردیف‌های صفحه وابسته نیست.
+    روابط چندمقداری فقط با مسیرهای ثبت‌شده در expandable_many ViewSet باز می‌شوند تا اندازه
+    پاسخ محدود بماند (مثلاً students یک رشته یا classes یک اتاق قابل باز شدن نیستند).
+    فقط در درخواست‌های خواندنی اعمال می‌شود.
+    """
+    expand_param = 'expand'
+    max_expand_depth = 3
+    # مسیرهای مجاز روابط چندمقداری، مثلاً ('enrollments',)
+    expandable_many = ()
+
+    def get_expand_tree(self):
+        if self.request.method not in SAFE_METHODS:
+            return {}
+        value = self.request.query_params.get(self.expand_param)
+        if not value:
+            return {}
+        tree = {}
+        for path in filter(None, (item.strip() for item in value.split(','))):
+            names = path.split('.')
+            if len(names) > self.max_expand_depth:
+                raise ValidationError({self.expand_param: f'حداکثر عمق مجاز {self.max_expand_depth} است: {path}'})
+            model, node = self.queryset.model, tree
+            for depth, name in enumerate(names, 1):
+                relation = _relation(model, name)
+                if relation is None:
+                    raise ValidationError({self.expand_param: f'رابطه {name} در {path} قابل باز شدن نیست.'})
+                if relation[2] and '.'.join(names[:depth]) not in self.expandable_many:
+                    raise ValidationError({self.expand_param: f'رابطه چندمقداری {name} در {path} قابل باز شدن نیست.'})
+                model = relation[0]
+                node = node.setdefault(name, {})
+        return tree
+
+    def plan_expand(self, tree):
+        """تبدیل درخت expand به lookupهای select_related و prefetch_related"""
+        select, prefetch = [], []
+
+        def walk(model, tree, path, through_many):
+            for name, subtree in tree.items():
+                related_model, accessor, many = _relation(model, name)
+                lookup = f'{path}__{accessor}' if path else accessor
+                nested_many = through_many or many
+                (prefetch if nested_many else select).append(lookup)
+                walk(related_model, subtree, lookup, nested_many)
+
+        walk(self.queryset.model, tree, '', False)
+        return select, prefetch
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        tree = self.get_expand_tree()
+        if tree:
+            select, prefetch = self.plan_expand(tree)
+            queryset = queryset.select_related(*select).prefetch_related(*prefetch)
+        return queryset
+
+    def get_serializer_class(self):
+        serializer_class = super().get_serializer_class()
+        tree = self.get_expand_tree()
+        meta = getattr(serializer_class, 'Meta', None)
+        if not tree or getattr(meta, 'model', None) is not self.queryset.model:
+            return serializer_class
+        return _expanded_serializer(serializer_class, _freeze(tree))
@@ -1,9 +1,15 @@
-from django.db import models
+from django.conf import settings
+from django.db import models, router, transaction
+from django.db.models import Sum, F, FloatField
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
 from django.core.validators import RegexValidator, MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.contenttypes.fields import GenericForeignKey
+import calendar
 import datetime
+from .jalali import jalali_strings_to_gregorian, to_gregorian, to_jalali
 
 # تعریف توابع validator
 phone_validator = RegexValidator(
@@ -16,8 +22,95 @@ national_id_validator = RegexValidator(
     message='کد ملی باید دقیقاً 10 رقم باشد.'
 )
 
+# حد نصاب نمره قبولی و تعداد واحد لازم برای فارغ‌التحصیلی
+PASSING_GRADE = 10
+GRADUATION_CREDITS = 140
+
+# کوئری‌ست با به‌روزرسانی خودکار زمان تغییر
+class TimestampedQuerySet(models.QuerySet):
+    """
+    کوئری‌ست که فیلد updated_at را در update و bulk_update هم تنظیم می‌کند،
+    چون auto_now فقط هنگام save اعمال می‌شود
+    """
+    def update(self, **kwargs):
+        kwargs.setdefault('updated_at', timezone.now())
+        return super().update(**kwargs)
+
+    def bulk_update(self, objs, fields, batch_size=None):
+        objs = list(objs)
+        now = timezone.now()
+        for obj in objs:
+            obj.updated_at = now
+        fields = list(fields)
+        if 'updated_at' not in fields:
+            fields.append('updated_at')
+        return super().bulk_update(objs, fields, batch_size=batch_size)
+
+# مدل پایه با زمان آخرین تغییر
+class TimestampedModel(models.Model):
+    """
+    مدل پایه برای نگهداری زمان آخرین تغییر هر رکورد جهت همگام‌سازی تغییرات (modified_since)
+    """
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        db_index=True,
+        verbose_name='زمان آخرین تغییر',
+        help_text='زمان آخرین ایجاد یا ویرایش رکورد'
+    )
+
+    objects = TimestampedQuerySet.as_manager()
+
+    class Meta:
+        abstract = True
+
+# کوئری‌ست افراد با جستجوهای سن و تاریخ تولد روی ستون‌های ایندکس‌شده
+class PersonQuerySet(TimestampedQuerySet):
+    """
+    جستجوی سن، سال و ماه تولد به صورت بازه روی birth_date_gregorian و birth_month
+    """
+    @staticmethod
+    def _years_before(day, years):
+        year = day.year - years
+        if (day.month, day.day) == (2, 29) and not calendar.isleap(year):
+            return day.replace(year=year, day=28)
+        return day.replace(year=year)
+
+    def aged_between(self, min_age=None, max_age=None, today=None):
+        """افرادی که سنشان بین min_age و max_age (شامل هر دو) است"""
+        today = today or timezone.localdate()
+        queryset = self
+        if min_age is not None:
+            queryset = queryset.filter(birth_date_gregorian__lte=self._years_before(today, min_age))
+        if max_age is not None:
+            queryset = queryset.filter(birth_date_gregorian__gt=self._years_before(today, max_age + 1))
+        return queryset
+
+    def born_in_year(self, year):
+        """متولدین یک سال شمسی (بین MIN_JALALI_YEAR و MAX_JALALI_YEAR)"""
+        start = to_gregorian(f'{int(year):04d}/01/01')
+        end = to_gregorian(f'{int(year) + 1:04d}/01/01')
+        return self.filter(birth_date_gregorian__gte=start, birth_date_gregorian__lt=end)
+
+    def born_in_month(self, month):
+        """متولدین یک ماه شمسی (مثلاً برای تولدهای ماه)"""
+        return self.filter(birth_month=month)
+
+# مدل پایه برای مدل‌هایی که تغییراتشان در فید تغییرات ثبت می‌شود
+class ChangeLoggedModel(TimestampedModel):
+    """
+    مدل پایه‌ای که ذخیره آن در یک تراکنش انجام می‌شود تا رویداد فید تغییرات
+    (که در سیگنال post_save ثبت می‌شود) همراه با خود تغییر commit یا rollback شود
+    """
+    def save(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
+    class Meta:
+        abstract = True
+
 # مدل پایه برای اطلاعات مشترک افراد
-class Person(models.Model):
+class Person(TimestampedModel):
     """
     مدل پایه برای ذخیره اطلاعات مشترک افراد (دانشجو، استاد، کارمند)
     """
@@ -36,6 +129,22 @@ class Person(models.Model):
         help_text='تاریخ تولد به فرمت YYYY/MM/DD (شمسی)',
         validators=[RegexValidator(regex=r'^\d{4}/\d{2}/\d{2}$', message='فرمت تاریخ شمسی باید YYYY/MM/DD باشد.')]
     )
+    birth_date_gregorian = models.DateField(
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=True,
+        verbose_name='تاریخ تولد (میلادی)',
+        help_text='معادل میلادی تاریخ تولد برای جستجو و مرتب‌سازی (از روی birth_date محاسبه می‌شود)'
+    )
+    birth_month = models.PositiveSmallIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=True,
+        verbose_name='ماه تولد (شمسی)',
+        help_text='ماه تولد شمسی (از روی birth_date محاسبه می‌شود)'
+    )
     birth_place = models.CharField(max_length=100, verbose_name='محل تولد', help_text='شهر یا محل تولد فرد')
     father_name = models.CharField(max_length=50, verbose_name='نام پدر', help_text='نام پدر فرد')
     id_number = models.CharField(max_length=20, verbose_name='شماره شناسنامه', help_text='شماره شناسنامه فرد')
@@ -63,12 +172,37 @@ class Person(models.Model):
         """نام کامل فرد"""
         return f"{self.first_name} {self.last_name}"
 
+    objects = PersonQuerySet.as_manager()
+
     @property
     def age(self):
-        """محاسبه سن تقریبی بر اساس سال تولد شمسی"""
-        current_year = 1404  # فرض برای سال 1404
-        birth_year = int(self.birth_date.split('/')[0])
-        return current_year - birth_year
+        """محاسبه سن بر اساس تاریخ تولد و تاریخ امروز"""
+        birth = self.birth_date_gregorian or to_gregorian(self.birth_date)
+        today = timezone.localdate()
+        if birth is None:
+            # تاریخی با فرمت درست که در تقویم وجود ندارد (مثلاً 1380/13/40): سن تقریبی از روی سال تولد
+            year = self.birth_date[:4]
+            return to_jalali(today)[0] - int(year) if year.isdigit() else None
+        return today.year - birth.year - ((today.month, today.day) < (birth.month, birth.day))
+
+    @classmethod
+    def fill_birth_fields(cls, people):
+        """
+        محاسبه برداری فیلدهای تاریخ تولد برای لیستی از افراد (مثلاً پیش از bulk_create)
+        """
+        people = list(people)
+        dates, months = jalali_strings_to_gregorian([person.birth_date for person in people])
+        for person, birth, month in zip(people, dates.tolist(), months.tolist()):
+            person.birth_date_gregorian = birth
+            person.birth_month = month or None
+        return people
+
+    def save(self, *args, **kwargs):
+        self.fill_birth_fields([self])
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'birth_date' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'birth_date_gregorian', 'birth_month'}
+        super().save(*args, **kwargs)
 
     class Meta:
         abstract = True
@@ -78,7 +212,7 @@ class Person(models.Model):
         return self.full_name
 
 # مدل اطلاعات تماس
-class ContactInfo(models.Model):
+class ContactInfo(TimestampedModel):
     """
     مدل برای ذخیره شماره‌های تماس و ایمیل‌های افراد
     """
@@ -102,6 +236,21 @@ class ContactInfo(models.Model):
         verbose_name='مقدار',
         help_text='مقدار شماره تماس یا ایمیل'
     )
+    normalized_value = models.CharField(
+        max_length=100,
+        editable=False,
+        db_index=True,
+        verbose_name='مقدار استاندارد',
+        help_text='شماره با قالب E.164 یا ایمیل با حروف کوچک، برای جستجوی صاحب شماره یا ایمیل (contacts.py)'
+    )
+
+    def save(self, *args, **kwargs):
+        from .contacts import normalize_contact
+        self.normalized_value = normalize_contact(self.contact_type, self.value)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'value', 'contact_type'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'normalized_value'}
+        super().save(*args, **kwargs)
 
     def clean(self):
         if self.contact_type == self.ContactType.EMAIL:
@@ -119,7 +268,7 @@ class ContactInfo(models.Model):
         return f"{self.person.full_name if self.person else 'Unknown'} - {self.get_contact_type_display()}: {self.value}"
 
 # مدل دانشکده
-class Faculty(models.Model):
+class Faculty(TimestampedModel):
     """
     مدل برای ذخیره اطلاعات دانشکده‌ها
     """
@@ -135,7 +284,7 @@ class Faculty(models.Model):
         return self.name
 
 # مدل رشته تحصیلی
-class Major(models.Model):
+class Major(TimestampedModel):
     """
     مدل برای ذخیره اطلاعات رشته‌های تحصیلی
     """
@@ -152,7 +301,7 @@ class Major(models.Model):
         return f"{self.name} ({self.faculty.name})"
 
 # مدل دانشجو
-class Student(Person):
+class Student(Person, ChangeLoggedModel):
     """
     مدل برای ذخیره اطلاعات دانشجویان
     """
@@ -160,6 +309,7 @@ class Student(Person):
     major = models.ForeignKey(Major, on_delete=models.PROTECT, related_name='students', verbose_name='رشته')
     entry_year = models.CharField(
         max_length=4,
+        db_index=True,
         verbose_name='سال ورود (شمسی)',
         help_text='سال ورود به دانشگاه (شمسی)',
         validators=[RegexValidator(regex=r'^\d{4}$', message='سال ورود باید 4 رقم باشد.')]
@@ -178,28 +328,57 @@ class Student(Person):
         blank=True
     )
 
+    class GraduationStatus(models.TextChoices):
+        STUDYING = 'S', 'در حال تحصیل'
+        GRADUATED = 'G', 'فارغ‌التحصیل'
+
+    graduation_status = models.CharField(
+        max_length=1,
+        choices=GraduationStatus.choices,
+        default=GraduationStatus.STUDYING,
+        db_index=True,
+        verbose_name='وضعیت فارغ‌التحصیلی',
+        help_text='وضعیت فارغ‌التحصیلی که توسط پردازش دسته‌ای تعیین می‌شود'
+    )
+
     @property
     def total_credits_passed(self):
         """تعداد واحدهای گذرانده‌شده"""
-        enrollments = self.enrollments.filter(grade__gte=10)
-        return sum(enrollment.course.credits for enrollment in enrollments)
+        total = self.enrollments.filter(grade__gte=PASSING_GRADE).aggregate(
+            total=Sum('class_instance__course__credits')
+        )['total']
+        return (total or 0) + self.archived_totals['passed_credits']
 
     @property
     def total_credits_remaining(self):
         """تعداد واحدهای باقیمانده (فرض: 140 واحد برای فارغ‌التحصیلی)"""
-        return 140 - self.total_credits_passed
+        return GRADUATION_CREDITS - self.total_credits_passed
 
     @property
     def gpa(self):
         """محاسبه معدل کل"""
-        enrollments = self.enrollments.filter(grade__isnull=False)
-        if not enrollments:
-            return 0
-        total_credits = sum(enrollment.course.credits for enrollment in enrollments)
-        if total_credits == 0:
+        totals = self.enrollments.filter(grade__isnull=False).aggregate(
+            total_credits=Sum('class_instance__course__credits'),
+            total_grade=Sum(F('grade') * F('class_instance__course__credits'), output_field=FloatField()),
+        )
+        archived = self.archived_totals
+        total_credits = (totals['total_credits'] or 0) + archived['graded_credits']
+        if not total_credits:
             return 0
-        total_grade = sum(enrollment.grade * enrollment.course.credits for enrollment in enrollments)
-        return round(total_grade / total_credits, 2)
+        return round(((totals['total_grade'] or 0) + archived['grade_points']) / total_credits, 2)
+
+    @property
+    def archived_totals(self):
+        """مجموع واحدها و نمرات ترم‌های بایگانی‌شده (StudentArchiveSummary)"""
+        try:
+            summary = self.archive_summary
+        except StudentArchiveSummary.DoesNotExist:
+            return {'graded_credits': 0, 'grade_points': 0, 'passed_credits': 0}
+        return {
+            'graded_credits': summary.graded_credits,
+            'grade_points': summary.grade_points,
+            'passed_credits': summary.passed_credits,
+        }
 
     class Meta:
         verbose_name = 'دانشجو'
@@ -237,7 +416,7 @@ class Professor(Person):
         verbose_name_plural = 'اساتید'
 
 # مدل درس
-class Course(models.Model):
+class Course(TimestampedModel):
     """
     مدل برای ذخیره اطلاعات دروس
     """
@@ -260,7 +439,7 @@ class Course(models.Model):
         return f"{self.name} ({self.code})"
 
 # مدل ترم
-class Term(models.Model):
+class Term(TimestampedModel):
     """
     مدل برای ذخیره اطلاعات ترم‌ها
     """
@@ -288,7 +467,7 @@ class Term(models.Model):
         return f"{self.get_season_display()} {self.year}"
 
 # مدل اتاق
-class Room(models.Model):
+class Room(ChangeLoggedModel):
     """
     مدل برای ذخیره اطلاعات اتاق‌ها
     """
@@ -309,7 +488,7 @@ class Room(models.Model):
         return f"{self.name} ({self.building})"
 
 # مدل کلاس
-class Class(models.Model):
+class Class(ChangeLoggedModel):
     """
     مدل برای ذخیره اطلاعات کلاس‌ها
     """
@@ -343,7 +522,7 @@ class Class(models.Model):
         return f"{self.course.name} - {self.day_of_week} {self.start_time}"
 
 # جدول میانی برای ثبت‌نام دانشجو
-class Enrollment(models.Model):
+class Enrollment(ChangeLoggedModel):
     """
     مدل میانی برای ثبت‌نام دانشجویان در کلاس‌ها
     """
@@ -367,19 +546,48 @@ class Enrollment(models.Model):
         choices=Status.choices,
         default=Status.REGISTERED,
         verbose_name='وضعیت',
-        help_text='وضعیت ثبت‌نام'
+        help_text='وضعیت ثبت‌نام (بر اساس نمره تعیین می‌شود)'
     )
 
+    @classmethod
+    def status_for_grade(cls, grade):
+        """وضعیت ثبت‌نام متناسب با نمره (بدون نمره: ثبت‌نام‌شده)"""
+        if grade is None:
+            return cls.Status.REGISTERED
+        return cls.Status.PASSED if grade >= PASSING_GRADE else cls.Status.FAILED
+
+    def save(self, *args, **kwargs):
+        # وضعیت همیشه از روی نمره تعیین می‌شود
+        self.status = self.status_for_grade(self.grade)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'grade' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'status'}
+        super().save(*args, **kwargs)
+
+    def clean(self):
+        # بررسی تداخل زمانی با کلاس‌های دیگر دانشجو در همان ترم
+        from .timetable import student_clashes
+        if self.student_id and self.class_instance_id:
+            if student_clashes(self.student_id, self.class_instance, exclude_enrollment=self.pk):
+                raise ValidationError('این کلاس با کلاس دیگری از برنامه دانشجو تداخل زمانی دارد.')
+            # بررسی گذراندن همه پیش‌نیازهای درس
+            from .prerequisites import missing_prerequisites
+            missing = missing_prerequisites(self.student_id, self.class_instance.course_id)
+            if missing:
+                raise ValidationError(f'دانشجو پیش‌نیازهای {missing} این درس را نگذرانده است.')
+
     class Meta:
         verbose_name = 'ثبت‌نام'
         verbose_name_plural = 'ثبت‌نام‌ها'
         unique_together = ['student', 'class_instance']
+        # بررسی پیش‌نیازها: ثبت‌نام‌های پاس‌شده یک دانشجو
+        indexes = [models.Index(fields=['student', 'status'])]
 
     def __str__(self):
         return f"{self.student.full_name} - {self.class_instance.course.name}"
 
 # جدول میانی برای تخصیص استاد به کلاس
-class CourseAssignment(models.Model):
+class CourseAssignment(TimestampedModel):
     """
     مدل میانی برای تخصیص اساتید به کلاس‌ها
     """
@@ -392,4 +600,312 @@ class CourseAssignment(models.Model):
         unique_together = ['professor', 'class_instance']
 
     def __str__(self):
-        return f"{self.professor.full_name} - {self.class_instance.course.name}"
\ No newline at end of file
+        return f"{self.professor.full_name} - {self.class_instance.course.name}"
+
+# پیش‌نیازهای دروس
+class CoursePrerequisite(TimestampedModel):
+    """
+    مدل برای ثبت پیش‌نیاز مستقیم یک درس
+    بستار تعدی پیش‌نیازها در CoursePrerequisiteClosure نگهداری می‌شود (prerequisites.py).
+    """
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='prerequisite_links', verbose_name='درس')
+    prerequisite = models.ForeignKey(
+        Course,
+        on_delete=models.CASCADE,
+        related_name='required_by_links',
+        verbose_name='پیش‌نیاز',
+        help_text='درسی که باید پیش از این درس گذرانده شود'
+    )
+
+    def save(self, *args, **kwargs):
+        # بستار در سیگنال post_save به‌روز می‌شود؛ یال و بستار با هم commit یا rollback می‌شوند
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
+    def clean(self):
+        from .prerequisites import creates_cycle
+        if self.course_id and self.prerequisite_id and creates_cycle(self.course_id, self.prerequisite_id):
+            raise ValidationError('این پیش‌نیاز باعث ایجاد حلقه در پیش‌نیازهای درس می‌شود.')
+
+    class Meta:
+        verbose_name = 'پیش‌نیاز درس'
+        verbose_name_plural = 'پیش‌نیازهای دروس'
+        unique_together = ['course', 'prerequisite']
+
+    def __str__(self):
+        return f"{self.prerequisite} ← {self.course}"
+
+# بستار تعدی پیش‌نیازها
+class CoursePrerequisiteClosure(models.Model):
+    """
+    همه پیش‌نیازهای مستقیم و غیرمستقیم هر درس (یک سطر برای هر جفت)
+    این جدول از روی CoursePrerequisite ساخته می‌شود و نباید مستقیماً ویرایش شود.
+    """
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='+', verbose_name='درس')
+    prerequisite = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='+', verbose_name='پیش‌نیاز')
+
+    class Meta:
+        verbose_name = 'بستار پیش‌نیاز'
+        verbose_name_plural = 'بستار پیش‌نیازها'
+        unique_together = ['course', 'prerequisite']
+
+    def __str__(self):
+        return f"{self.prerequisite_id} ← {self.course_id}"
+
+# فید تغییرات (فقط افزودنی)
+class ChangeEvent(models.Model):
+    """
+    مدل برای ثبت رویدادهای ایجاد، ویرایش و حذف دانشجو، کلاس، ثبت‌نام و اتاق
+    شناسه افزایشی هر رویداد، شماره ترتیب آن در فید است.
+    """
+    class Action(models.TextChoices):
+        CREATE = 'C', 'ایجاد'
+        UPDATE = 'U', 'ویرایش'
+        DELETE = 'D', 'حذف'
+
+    model = models.CharField(max_length=50, verbose_name='مدل', help_text='نام مدل تغییر یافته')
+    object_id = models.PositiveBigIntegerField(verbose_name='شناسه شیء', help_text='شناسه رکورد تغییر یافته')
+    action = models.CharField(max_length=1, choices=Action.choices, verbose_name='عملیات', help_text='نوع تغییر')
+    data = models.JSONField(
+        encoder=DjangoJSONEncoder,
+        verbose_name='داده',
+        help_text='مقادیر رکورد پس از تغییر (برای حذف، آخرین مقادیر)'
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='زمان ثبت')
+
+    @staticmethod
+    def snapshot(instance):
+        """مقادیر فیلدهای یک رکورد برای ذخیره در رویداد"""
+        return {field.attname: field.value_from_object(instance) for field in instance._meta.concrete_fields}
+
+    @classmethod
+    def build(cls, instance, action):
+        return cls(
+            model=instance._meta.model_name,
+            object_id=instance.pk,
+            action=action,
+            data=cls.snapshot(instance),
+        )
+
+    @classmethod
+    def record(cls, instance, action, using=None):
+        """ثبت رویداد تغییر یک رکورد"""
+        event = cls.build(instance, action)
+        event.save(using=using)
+        return event
+
+    @classmethod
+    def record_many(cls, instances, action, using=None):
+        """ثبت دسته‌ای رویدادها برای تغییراتی که بدون save انجام می‌شوند (مانند update و bulk_update)"""
+        return cls.objects.using(using).bulk_create([cls.build(instance, action) for instance in instances])
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError('رویدادهای فید تغییرات قابل ویرایش نیستند.')
+        super().save(*args, **kwargs)
+
+    class Meta:
+        verbose_name = 'رویداد تغییر'
+        verbose_name_plural = 'رویدادهای تغییر'
+        ordering = ['id']
+        indexes = [models.Index(fields=['model', 'id'])]
+
+    def __str__(self):
+        return f"#{self.pk} {self.get_action_display()} {self.model} {self.object_id}"
+
+# رکوردهای حذف‌شده
+class Tombstone(models.Model):
+    """
+    مدل برای ثبت حذف رکوردها تا کلاینت‌های همگام‌سازی (modified_since) از حذف‌ها مطلع شوند
+    """
+    model = models.CharField(max_length=50, verbose_name='مدل', help_text='نام مدل رکورد حذف‌شده')
+    object_id = models.PositiveBigIntegerField(verbose_name='شناسه شیء', help_text='شناسه رکورد حذف‌شده')
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='زمان حذف')
+
+    class Meta:
+        verbose_name = 'رکورد حذف‌شده'
+        verbose_name_plural = 'رکوردهای حذف‌شده'
+        indexes = [models.Index(fields=['model', 'deleted_at'])]
+
+    @staticmethod
+    def retention_start():
+        """حذف‌های پیش از این زمان پاک می‌شوند (TOMBSTONE_RETENTION_DAYS)"""
+        return timezone.now() - datetime.timedelta(days=settings.TOMBSTONE_RETENTION_DAYS)
+
+    @classmethod
+    def prune(cls):
+        """پاک کردن رکوردهای قدیمی‌تر از مدت نگهداری؛ خروجی: تعداد رکوردهای پاک‌شده"""
+        return cls.objects.filter(deleted_at__lt=cls.retention_start()).delete()[0]
+
+    def __str__(self):
+        return f"{self.model} {self.object_id}"
+
+# کارهای پس‌زمینه
+class Job(models.Model):
+    """
+    مدل صف کارهای سنگین پس‌زمینه (مانند ارزیابی فارغ‌التحصیلی و گزارش تداخل‌ها)
+    کارها با دستور run_jobs در pool پردازه‌ها اجرا می‌شوند؛ انواع کار در jobs.py ثبت می‌شوند.
+    """
+    class Status(models.TextChoices):
+        QUEUED = 'Q', 'در صف'
+        RUNNING = 'R', 'در حال اجرا'
+        SUCCEEDED = 'S', 'موفق'
+        FAILED = 'F', 'ناموفق'
+
+    kind = models.CharField(max_length=50, verbose_name='نوع کار')
+    params = models.JSONField(default=dict, blank=True, verbose_name='پارامترها')
+    status = models.CharField(
+        max_length=1,
+        choices=Status.choices,
+        default=Status.QUEUED,
+        db_index=True,
+        verbose_name='وضعیت'
+    )
+    progress = models.FloatField(default=0, verbose_name='پیشرفت', help_text='عددی بین 0 و 1')
+    result = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder, verbose_name='نتیجه')
+    error = models.TextField(blank=True, verbose_name='خطا')
+    worker = models.CharField(max_length=100, blank=True, verbose_name='اجراکننده', help_text='میزبان و شناسه پردازه')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='زمان ثبت')
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name='زمان شروع')
+    heartbeat_at = models.DateTimeField(
+        null=True, blank=True, verbose_name='آخرین اعلام حیات',
+        help_text='اجراکننده این زمان را برای کارهای در حال اجرای خود مرتب به‌روز می‌کند'
+    )
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name='زمان پایان')
+
+    class Meta:
+        verbose_name = 'کار پس‌زمینه'
+        verbose_name_plural = 'کارهای پس‌زمینه'
+        ordering = ['-id']
+        indexes = [models.Index(fields=['status', 'id'])]
+
+    def __str__(self):
+        return f"#{self.pk} {self.kind} ({self.get_status_display()})"
+
+# گروه‌های رتبه‌بندی (رشته و سال ورود)
+class RankingCohort(models.Model):
+    """
+    وضعیت رتبه‌بندی معدل هر گروه دانشجویان (یک رشته و یک سال ورود)
+    با تغییر نمره یا ثبت‌نام، گروه دانشجو قدیمی علامت می‌خورد و رتبه‌های آن با کار پس‌زمینه rankings دوباره محاسبه می‌شود (rankings.py).
+    """
+    major = models.ForeignKey(Major, on_delete=models.CASCADE, related_name='ranking_cohorts', verbose_name='رشته')
+    entry_year = models.CharField(max_length=4, verbose_name='سال ورود (شمسی)')
+    is_stale = models.BooleanField(default=True, db_index=True, verbose_name='نیاز به محاسبه دوباره')
+    size = models.PositiveIntegerField(default=0, verbose_name='تعداد دانشجویان رتبه‌بندی‌شده')
+    refreshed_at = models.DateTimeField(null=True, blank=True, verbose_name='زمان آخرین محاسبه')
+
+    class Meta:
+        verbose_name = 'گروه رتبه‌بندی'
+        verbose_name_plural = 'گروه‌های رتبه‌بندی'
+        unique_together = ['major', 'entry_year']
+
+    def __str__(self):
+        return f"{self.major} - {self.entry_year}"
+
+# رتبه معدل دانشجویان
+class StudentRanking(models.Model):
+    """
+    رتبه از پیش محاسبه‌شده معدل هر دانشجو در گروه خود (رشته و سال ورود)
+    فقط دانشجویانی که دست کم یک نمره دارند رتبه می‌گیرند؛ معدل‌های برابر رتبه یکسان دارند.
+    """
+    student = models.OneToOneField(
+        Student, on_delete=models.CASCADE, primary_key=True, related_name='ranking', verbose_name='دانشجو'
+    )
+    major = models.ForeignKey(Major, on_delete=models.CASCADE, related_name='+', verbose_name='رشته')
+    entry_year = models.CharField(max_length=4, verbose_name='سال ورود (شمسی)')
+    gpa = models.FloatField(verbose_name='معدل کل')
+    graded_credits = models.PositiveIntegerField(verbose_name='واحدهای دارای نمره')
+    rank = models.PositiveIntegerField(verbose_name='رتبه')
+
+    class Meta:
+        verbose_name = 'رتبه دانشجو'
+        verbose_name_plural = 'رتبه‌های دانشجویان'
+        indexes = [models.Index(fields=['major', 'entry_year', 'rank'])]
+
+    def __str__(self):
+        return f"{self.student_id}: {self.rank}"
+
+# خلاصه ثبت‌نام‌های بایگانی‌شده هر دانشجو (در پایگاه داده اصلی)
+class StudentArchiveSummary(models.Model):
+    """
+    مجموع واحدها و نمرات ثبت‌نام‌های بایگانی‌شده هر دانشجو
+    معدل، واحدهای گذرانده، رتبه‌بندی و فارغ‌التحصیلی بدون مراجعه به پایگاه داده بایگانی
+    از مجموع این خلاصه و ثبت‌نام‌های جاری محاسبه می‌شوند (archive.py).
+    """
+    student = models.OneToOneField(
+        Student, on_delete=models.CASCADE, primary_key=True, related_name='archive_summary', verbose_name='دانشجو'
+    )
+    graded_credits = models.PositiveIntegerField(default=0, verbose_name='واحدهای دارای نمره')
+    grade_points = models.FloatField(default=0, verbose_name='مجموع نمره × واحد')
+    passed_credits = models.PositiveIntegerField(default=0, verbose_name='واحدهای گذرانده')
+
+    class Meta:
+        verbose_name = 'خلاصه بایگانی دانشجو'
+        verbose_name_plural = 'خلاصه‌های بایگانی دانشجویان'
+
+    def __str__(self):
+        return f"{self.student_id}: {self.passed_credits}"
+
+# مدل‌های بایگانی ترم‌های گذشته (در پایگاه داده archive؛ routers.py)
+class ArchivedClass(models.Model):
+    """
+    کلاس ترم‌های بسته‌شده با همان شناسه کلاس اصلی
+    مشخصات درس و ترم در زمان بایگانی همراه کلاس ذخیره می‌شود، چون بین دو پایگاه داده رابطه‌ای وجود ندارد.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    course_id = models.PositiveBigIntegerField(db_index=True, verbose_name='شناسه درس')
+    course_code = models.CharField(max_length=10, verbose_name='کد درس')
+    course_name = models.CharField(max_length=100, verbose_name='نام درس')
+    credits = models.PositiveIntegerField(verbose_name='تعداد واحد')
+    term_id = models.PositiveBigIntegerField(db_index=True, verbose_name='شناسه ترم')
+    term_year = models.CharField(max_length=4, verbose_name='سال ترم')
+    term_season = models.CharField(max_length=1, choices=Term.Season.choices, verbose_name='فصل ترم')
+    room_id = models.PositiveBigIntegerField(verbose_name='شناسه اتاق')
+    day_of_week = models.CharField(max_length=10, verbose_name='روز هفته')
+    start_time = models.TimeField(verbose_name='زمان شروع')
+    end_time = models.TimeField(verbose_name='زمان پایان')
+    archived_at = models.DateTimeField(auto_now_add=True, verbose_name='زمان بایگانی')
+
+    class Meta:
+        verbose_name = 'کلاس بایگانی‌شده'
+        verbose_name_plural = 'کلاس‌های بایگانی‌شده'
+
+    def __str__(self):
+        return f"{self.course_name} - {self.day_of_week} {self.start_time}"
+
+class ArchivedEnrollment(models.Model):
+    """
+    ثبت‌نام بایگانی‌شده با همان شناسه ثبت‌نام اصلی
+    """
+    id = models.BigIntegerField(primary_key=True)
+    class_instance = models.ForeignKey(
+        ArchivedClass, on_delete=models.CASCADE, related_name='enrollments', verbose_name='کلاس'
+    )
+    student_id = models.PositiveBigIntegerField(db_index=True, verbose_name='شناسه دانشجو')
+    grade = models.FloatField(null=True, blank=True, verbose_name='نمره')
+    status = models.CharField(max_length=1, choices=Enrollment.Status.choices, verbose_name='وضعیت')
+
+    class Meta:
+        verbose_name = 'ثبت‌نام بایگانی‌شده'
+        verbose_name_plural = 'ثبت‌نام‌های بایگانی‌شده'
+
+    def __str__(self):
+        return f"{self.student_id} - {self.class_instance_id}"
+
+class ArchivedCourseAssignment(models.Model):
+    """
+    تخصیص استاد بایگانی‌شده با همان شناسه تخصیص اصلی
+    """
+    id = models.BigIntegerField(primary_key=True)
+    class_instance = models.ForeignKey(
+        ArchivedClass, on_delete=models.CASCADE, related_name='course_assignments', verbose_name='کلاس'
+    )
+    professor_id = models.PositiveBigIntegerField(db_index=True, verbose_name='شناسه استاد')
+
+    class Meta:
+        verbose_name = 'تخصیص درس بایگانی‌شده'
+        verbose_name_plural = 'تخصیص دروس بایگانی‌شده'
+
+    def __str__(self):
+        return f"{self.professor_id} - {self.class_instance_id}"
@@ -0,0 +1,105 @@
+"""
+گراف پیش‌نیاز دروس و بستار تعدی آن
+
+همه پیش‌نیازهای مستقیم و غیرمستقیم هر درس در جدول CoursePrerequisiteClosure نگهداری
+می‌شود تا بررسی پیش‌نیازها هنگام ثبت‌نام فقط یک کوئری روی این جدول و ثبت‌نام‌های
+پاس‌شده دانشجو باشد و نیازی به پیمایش گراف نباشد.
+
+با افزودن یک پیش‌نیاز، جفت‌های جدید به صورت افزایشی اضافه می‌شوند و با ویرایش یا حذف آن
+بستار از روی یال‌ها دوباره ساخته می‌شود (signals.py).
+"""
+from django.db import transaction
+from .archive import archived_passed_courses
+from .models import CoursePrerequisite, CoursePrerequisiteClosure, Enrollment
+
+CLOSURE_BATCH_SIZE = 2000
+
+
+def creates_cycle(course_id, prerequisite_id, using=None):
+    """آیا ثبت prerequisite_id به عنوان پیش‌نیاز course_id حلقه ایجاد می‌کند؟"""
+    if course_id == prerequisite_id:
+        return True
+    return CoursePrerequisiteClosure.objects.using(using).filter(
+        course_id=prerequisite_id, prerequisite_id=course_id,
+    ).exists()
+
+
+def transitive_closure(edges):
+    """جفت‌های (درس، پیش‌نیاز) بستار تعدی گرافی که با لیست یال‌های (درس، پیش‌نیاز مستقیم) داده شده است"""
+    graph = {}
+    for course_id, prerequisite_id in edges:
+        graph.setdefault(course_id, set()).add(prerequisite_id)
+
+    pairs = []
+    for course_id, direct in graph.items():
+        seen = set()
+        stack = list(direct)
+        while stack:
+            node = stack.pop()
+            if node not in seen:
+                seen.add(node)
+                stack.extend(graph.get(node, ()))
+        pairs.extend((course_id, prerequisite_id) for prerequisite_id in seen)
+    return pairs
+
+
+def add_to_closure(course_id, prerequisite_id, using=None):
+    """
+    افزودن جفت‌های حاصل از یک پیش‌نیاز جدید:
+    (درس و همه دروس وابسته به آن) × (پیش‌نیاز و همه پیش‌نیازهای آن)
+    """
+    closure = CoursePrerequisiteClosure.objects.using(using)
+    dependants = [course_id, *closure.filter(prerequisite_id=course_id).values_list('course_id', flat=True)]
+    requirements = [prerequisite_id, *closure.filter(course_id=prerequisite_id).values_list('prerequisite_id', flat=True)]
+    closure.bulk_create(
+        [
+            CoursePrerequisiteClosure(course_id=dependant, prerequisite_id=requirement)
+            for dependant in dependants
+            for requirement in requirements
+        ],
+        batch_size=CLOSURE_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def rebuild_closure(using=None):
+    """ساخت دوباره کل بستار از روی پیش‌نیازهای مستقیم"""
+    with transaction.atomic(using=using):
+        edges = CoursePrerequisite.objects.using(using).values_list('course_id', 'prerequisite_id')
+        closure = CoursePrerequisiteClosure.objects.using(using)
+        closure.all().delete()
+        closure.bulk_create(
+            [
+                CoursePrerequisiteClosure(course_id=course_id, prerequisite_id=prerequisite_id)
+                for course_id, prerequisite_id in transitive_closure(edges)
+            ],
+            batch_size=CLOSURE_BATCH_SIZE,
+        )
+
+
+def all_prerequisites(course_id):
+    """شناسه همه پیش‌نیازهای مستقیم و غیرمستقیم یک درس"""
+    return list(
+        CoursePrerequisiteClosure.objects.filter(course_id=course_id)
+        .order_by('prerequisite_id')
+        .values_list('prerequisite_id', flat=True)
+    )
+
+
+def missing_prerequisites(student_id, course_id):
+    """
+    کد پیش‌نیازهای (مستقیم و غیرمستقیم) درس که دانشجو هنوز پاس نکرده است، با یک کوئری
+    (و یک کوئری روی دروس پاس‌شده ترم‌های بایگانی‌شده)
+    لیست خالی یعنی دانشجو مجاز به ثبت‌نام در کلاس‌های این درس است.
+    """
+    passed = Enrollment.objects.filter(
+        student_id=student_id, status=Enrollment.Status.PASSED,
+    ).values('class_instance__course_id')
+    return list(
+        CoursePrerequisiteClosure.objects
+        .filter(course_id=course_id)
+        .exclude(prerequisite_id__in=passed)
+        .exclude(prerequisite_id__in=archived_passed_courses(student_id))
+        .order_by('prerequisite__code')
+        .values_list('prerequisite__code', flat=True)
+    )
@@ -0,0 +1,177 @@
+"""
+رتبه‌بندی معدل دانشجویان هر رشته و سال ورود
+
+رتبه‌ها با یک کوئری تجمیعی روی ثبت‌نام‌ها و تابع پنجره‌ای RANK در پایگاه داده محاسبه و در
+جدول StudentRanking ذخیره می‌شوند؛ بنابراین لیست برترین‌ها و رتبه یک دانشجو با یک کوئری
+ایندکس‌شده خوانده می‌شود.
+
+تغییر نمره، ثبت‌نام، رشته یا سال ورود دانشجو و واحد دروس، گروه (رشته و سال ورود) مربوط را
+قدیمی علامت می‌زند (signals.py و grading.py) و کار پس‌زمینه rankings را در صف قرار می‌دهد که
+فقط گروه‌های قدیمی را دوباره محاسبه می‌کند. خواندن رتبه‌ها هرگز محاسبه یا نوشتنی انجام نمی‌دهد؛
+آخرین رتبه‌بندی ذخیره‌شده همراه با علامت stale برگردانده می‌شود.
+"""
+from django.db import transaction
+from django.db.models import ExpressionWrapper, F, FloatField, IntegerField, Q, Sum, Window
+from django.db.models.functions import Coalesce, Rank, Round
+from django.utils import timezone
+from .archive import archived_grade_points, archived_graded_credits
+from .models import Job, Student, StudentRanking, RankingCohort
+from .workers import batched
+
+# نوع کار پس‌زمینه محاسبه دوباره گروه‌های قدیمی (jobs.py)
+RANKINGS_JOB = 'rankings'
+RANKING_BATCH_SIZE = 2000
+# سقف تعداد شناسه در هر کوئری IN
+STALE_BATCH_SIZE = 500
+
+
+def ranked_students(students):
+    """
+    معدل و رتبه دانشجویان (در گروه رشته و سال ورود) با یک کوئری تجمیعی و تابع پنجره‌ای
+    نمرات ترم‌های بایگانی‌شده از StudentArchiveSummary به مجموع‌ها اضافه می‌شود.
+    خروجی: (شناسه، رشته، سال ورود، معدل، واحدهای دارای نمره، رتبه)
+    """
+    graded = Q(enrollments__grade__isnull=False)
+    return (
+        students
+        .order_by()
+        .annotate(
+            live_credits=Sum('enrollments__class_instance__course__credits', filter=graded),
+            live_grade=Sum(
+                F('enrollments__grade') * F('enrollments__class_instance__course__credits'),
+                filter=graded,
+                output_field=FloatField(),
+            ),
+        )
+        .annotate(
+            graded_credits=ExpressionWrapper(
+                Coalesce(F('live_credits'), 0) + archived_graded_credits(), output_field=IntegerField(),
+            ),
+            total_grade=ExpressionWrapper(
+                Coalesce(F('live_grade'), 0.0) + archived_grade_points(), output_field=FloatField(),
+            ),
+        )
+        .filter(graded_credits__gt=0)
+        .annotate(gpa=Round(ExpressionWrapper(F('total_grade') / F('graded_credits'), output_field=FloatField()), 2))
+        .annotate(rank=Window(Rank(), partition_by=[F('major_id'), F('entry_year')], order_by=F('gpa').desc()))
+        .values_list('pk', 'major_id', 'entry_year', 'gpa', 'graded_credits', 'rank')
+    )
+
+
+def refresh_cohort(major_id, entry_year):
+    """محاسبه دوباره رتبه‌های یک گروه و جایگزینی رتبه‌های ذخیره‌شده آن"""
+    with transaction.atomic():
+        students = Student.objects.filter(major_id=major_id, entry_year=entry_year)
+        rows = list(ranked_students(students))
+        StudentRanking.objects.filter(
+            Q(major_id=major_id, entry_year=entry_year) | Q(student__in=students)
+        ).delete()
+        StudentRanking.objects.bulk_create(
+            [
+                StudentRanking(
+                    student_id=pk, major_id=major, entry_year=year, gpa=gpa, graded_credits=credits, rank=rank,
+                )
+                for pk, major, year, gpa, credits, rank in rows
+            ],
+            batch_size=RANKING_BATCH_SIZE,
+        )
+        RankingCohort.objects.update_or_create(
+            major_id=major_id, entry_year=entry_year,
+            defaults={'is_stale': False, 'size': len(rows), 'refreshed_at': timezone.now()},
+        )
+    return len(rows)
+
+
+def cohort_status(major_id, entry_year):
+    """
+    وضعیت آخرین رتبه‌بندی ذخیره‌شده گروه (فقط خواندنی)
+    گروهی که هنوز رتبه‌بندی نشده فقط اگر دانشجو داشته باشد قدیمی است؛ کار rankings آن را می‌سازد.
+    """
+    cohort = RankingCohort.objects.filter(major_id=major_id, entry_year=entry_year).first()
+    if cohort is None:
+        stale = Student.objects.filter(major_id=major_id, entry_year=entry_year).exists()
+        return {'size': 0, 'refreshed_at': None, 'stale': stale}
+    return {'size': cohort.size, 'refreshed_at': cohort.refreshed_at, 'stale': cohort.is_stale}
+
+
+def schedule_refresh():
+    """قرار دادن کار rankings در صف، اگر چنین کاری از قبل در صف نباشد"""
+    if not Job.objects.filter(kind=RANKINGS_JOB, status=Job.Status.QUEUED).exists():
+        Job.objects.create(kind=RANKINGS_JOB)
+
+
+def refresh_stale(progress=None):
+    """محاسبه دوباره همه گروه‌های قدیمی و گروه‌هایی که هنوز رتبه‌بندی نشده‌اند"""
+    cohorts = set(Student.objects.order_by().values_list('major_id', 'entry_year').distinct())
+    fresh = set(RankingCohort.objects.filter(is_stale=False).values_list('major_id', 'entry_year'))
+    stale = sorted(cohorts - fresh)
+    for done, (major_id, entry_year) in enumerate(stale, 1):
+        refresh_cohort(major_id, entry_year)
+        if progress is not None:
+            progress(done / len(stale))
+    return {'cohorts': len(stale)}
+
+
+def mark_stale(cohorts):
+    """علامت‌گذاری گروه‌های (رشته، سال ورود) داده‌شده برای محاسبه دوباره توسط کار rankings"""
+    if not cohorts:
+        return
+    for batch in batched(sorted(cohorts), STALE_BATCH_SIZE):
+        condition = Q()
+        for major_id, entry_year in batch:
+            condition |= Q(major_id=major_id, entry_year=entry_year)
+        RankingCohort.objects.filter(condition).update(is_stale=True)
+    schedule_refresh()
+
+
+def mark_students_stale(student_ids):
+    """علامت‌گذاری گروه فعلی و گروه رتبه‌بندی‌شده قبلی دانشجویان برای محاسبه دوباره"""
+    cohorts = set()
+    for batch in batched(sorted(set(student_ids)), STALE_BATCH_SIZE):
+        cohorts.update(Student.objects.filter(pk__in=batch).values_list('major_id', 'entry_year'))
+        cohorts.update(StudentRanking.objects.filter(student_id__in=batch).values_list('major_id', 'entry_year'))
+    mark_stale(cohorts)
+
+
+def mark_all_stale():
+    RankingCohort.objects.update(is_stale=True)
+    schedule_refresh()
+
+
+def top_students(major_id, entry_year, limit):
+    """برترین دانشجویان یک گروه به ترتیب رتبه (آخرین رتبه‌بندی ذخیره‌شده)"""
+    students = list(
+        StudentRanking.objects
+        .filter(major_id=major_id, entry_year=entry_year)
+        .order_by('rank', 'student_id')
+        .values(
+            'rank', 'gpa', 'graded_credits', 'student_id', 'student__student_id',
+            'student__first_name', 'student__last_name',
+        )[:limit]
+    )
+    return {
+        'major': major_id,
+        'entry_year': entry_year,
+        **cohort_status(major_id, entry_year),
+        'students': students,
+    }
+
+
+def student_rank(student):
+    """
+    رتبه یک دانشجو در گروهش (آخرین رتبه‌بندی ذخیره‌شده)؛ برای دانشجوی بدون رتبه rank برابر None است
+    رتبه ذخیره‌شده در گروه قبلی دانشجویی که رشته یا سال ورودش تغییر کرده تا محاسبه دوباره گزارش نمی‌شود.
+    """
+    ranking = (
+        StudentRanking.objects
+        .filter(student_id=student.pk, major_id=student.major_id, entry_year=student.entry_year)
+        .values('rank', 'gpa', 'graded_credits')
+        .first()
+    )
+    return {
+        'student': student.pk,
+        'major': student.major_id,
+        'entry_year': student.entry_year,
+        **cohort_status(student.major_id, student.entry_year),
+        **(ranking or {'rank': None, 'gpa': None, 'graded_credits': 0}),
+    }
@@ -0,0 +1,78 @@
+"""
+رندرکننده‌های سریع پاسخ API
+
+- FastJSONRenderer: JSON با orjson (کتابخانه C) که متن فارسی را مستقیم به صورت UTF-8 می‌نویسد.
+  اگر orjson نصب نباشد همان JSONRenderer پیش‌فرض DRF اجرا می‌شود.
+- MessagePackRenderer: خروجی باینری MessagePack برای Accept: application/msgpack
+  (نیازمند کتابخانه msgpack).
+- ICalendarRenderer: خروجی iCalendar برنامه هفتگی (?format=ics) فقط برای endpoint های timetable.
+
+هر دو کتابخانه اختیاری هستند؛ AvailableContentNegotiation رندرکننده‌هایی را که کتابخانه
+آن‌ها نصب نیست از انتخاب کنار می‌گذارد.
+"""
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# تبدیل انواع غیر استاندارد (Decimal، رشته‌های ترجمه تنبل و ...) مانند JSONRenderer پیش‌فرض
+_encoder = JSONEncoder()
+
+
+class FastJSONRenderer(JSONRenderer):
+    available = True
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        option = orjson.OPT_NON_STR_KEYS
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=_encoder.default, option=option)
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+    available = msgpack is not None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=_encoder.default, use_bin_type=True)
+
+
+class ICalendarRenderer(BaseRenderer):
+    media_type = 'text/calendar'
+    format = 'ics'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        response = (renderer_context or {}).get('response')
+        if response is not None and response.exception:
+            # پاسخ خطا (مثلاً 404) به صورت JSON
+            response['Content-Type'] = 'application/json'
+            return FastJSONRenderer().render(data, accepted_media_type, renderer_context)
+        from .timetable import timetable_ics
+        return timetable_ics(data).encode(self.charset)
+
+
+class AvailableContentNegotiation(DefaultContentNegotiation):
+    """انتخاب رندرکننده بر اساس Accept، فقط از میان رندرکننده‌هایی که کتابخانه آن‌ها نصب است"""
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        renderers = [renderer for renderer in renderers if getattr(renderer, 'available', True)]
+        return super().select_renderer(request, renderers, format_suffix)
@@ -0,0 +1,38 @@
+"""
+مسیریابی پایگاه داده برای داده‌های بایگانی‌شده
+
+مدل‌های Archived* فقط در پایگاه داده archive ساخته، خوانده و نوشته می‌شوند و بقیه مدل‌ها فقط
+در پایگاه داده اصلی؛ بنابراین جدول‌های جاری فقط داده ترم‌های باز را نگه می‌دارند.
+"""
+
+ARCHIVE_DATABASE = 'archive'
+ARCHIVE_MODELS = {'archivedclass', 'archivedenrollment', 'archivedcourseassignment'}
+
+
+def is_archived(app_label, model_name):
+    return app_label == 'EducationApp' and model_name in ARCHIVE_MODELS
+
+
+class ArchiveRouter:
+
+    def _database(self, model):
+        if is_archived(model._meta.app_label, model._meta.model_name):
+            return ARCHIVE_DATABASE
+        return None
+
+    def db_for_read(self, model, **hints):
+        return self._database(model)
+
+    def db_for_write(self, model, **hints):
+        return self._database(model)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # رابطه فقط بین مدل‌های یک پایگاه داده مجاز است
+        return (self._database(type(obj1)) == ARCHIVE_DATABASE) == (self._database(type(obj2)) == ARCHIVE_DATABASE)
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == ARCHIVE_DATABASE:
+            return model_name is not None and is_archived(app_label, model_name)
+        if model_name is not None and is_archived(app_label, model_name):
+            return False
+        return None
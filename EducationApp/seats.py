@@ -0,0 +1,202 @@
+"""
+پخش زنده ظرفیت کلاس‌ها با Server-Sent Events
+
+به جای اینکه هر دانشجو در زمان ثبت‌نام لیست کلاس‌ها را مرتب دوباره بخواند، یک پخش‌کننده در هر
+پردازه سرور (ASGI) فید تغییرات را در هر دوره با یک کوئری می‌خواند، ثبت‌نام‌های ایجاد یا حذف‌شده
+(و ویرایش کلاس‌ها) را برای هر کلاس یکی می‌کند و تعداد ثبت‌نام و ظرفیت کلاس‌های تغییر یافته را با
+یک کوئری دیگر به همه بینندگان آن کلاس‌ها می‌فرستد.
+
+فید تغییرات (ChangeEvent) منبع تغییرات است تا ثبت‌نام‌هایی که در پردازه‌های دیگر یا کارهای
+پس‌زمینه انجام می‌شوند هم دیده شوند؛ ویرایش ظرفیت یک اتاق همه کلاس‌های آن اتاق را تغییر
+یافته علامت می‌زند. برای بیننده کند، به‌روزرسانی‌های پیاپی یک کلاس روی هم نوشته می‌شوند و
+فقط آخرین وضعیت ارسال می‌شود.
+"""
+import asyncio
+import json
+import logging
+from asgiref.sync import sync_to_async
+from django.db import DatabaseError
+from django.db.models import Count, Max
+from .models import Class, ChangeEvent, Term
+
+logger = logging.getLogger(__name__)
+
+# فاصله خواندن فید تغییرات (ثانیه)
+SEAT_POLL_INTERVAL = 1
+# فاصله ارسال پیام نگهداری اتصال وقتی تغییری نیست (ثانیه)
+HEARTBEAT_INTERVAL = 15
+# زمان انتظار مرورگر پیش از اتصال دوباره (میلی‌ثانیه)
+RECONNECT_DELAY = 3000
+# حداکثر تعداد رویداد خوانده‌شده در هر دوره
+EVENT_BATCH_SIZE = 5000
+# رویدادهایی که تعداد ثبت‌نام یا ظرفیت کلاس را تغییر می‌دهند: (مدل، عملیات‌ها، فیلد شناسه کلاس)
+SEAT_EVENTS = (
+    ('enrollment', (ChangeEvent.Action.CREATE, ChangeEvent.Action.DELETE), 'class_instance_id'),
+    ('class', (ChangeEvent.Action.UPDATE,), 'id'),
+)
+# رویدادهایی که ظرفیت همه کلاس‌های یک اتاق را تغییر می‌دهند: (مدل، عملیات‌ها، فیلد شناسه اتاق)
+ROOM_EVENTS = (
+    ('room', (ChangeEvent.Action.UPDATE,), 'id'),
+)
+
+
+def latest_event_id():
+    return ChangeEvent.objects.aggregate(last=Max('id'))['last'] or 0
+
+
+def changed_classes(since, limit=EVENT_BATCH_SIZE):
+    """
+    شناسه کلاس‌هایی که پس از رویداد since ظرفیت یا تعداد ثبت‌نامشان تغییر کرده است
+    خروجی: (مجموعه شناسه کلاس‌ها، شناسه آخرین رویداد خوانده‌شده)
+    """
+    events = list(
+        ChangeEvent.objects
+        .filter(id__gt=since)
+        .order_by('id')
+        .values_list('id', 'model', 'action', 'data')[:limit]
+    )
+    class_fields = {model: (actions, field) for model, actions, field in SEAT_EVENTS}
+    room_fields = {model: (actions, field) for model, actions, field in ROOM_EVENTS}
+    classes, rooms = set(), set()
+    for _, model, action, data in events:
+        if model in class_fields and action in class_fields[model][0]:
+            classes.add(data[class_fields[model][1]])
+        elif model in room_fields and action in room_fields[model][0]:
+            rooms.add(data[room_fields[model][1]])
+    if rooms:
+        classes.update(Class.objects.filter(room_id__in=rooms).values_list('pk', flat=True))
+    return classes, events[-1][0] if events else since
+
+
+def seat_counts(class_ids):
+    """تعداد ثبت‌نام، ظرفیت و صندلی خالی کلاس‌ها با یک کوئری: {شناسه کلاس: وضعیت}"""
+    rows = (
+        Class.objects
+        .filter(pk__in=class_ids)
+        .order_by()
+        .annotate(enrolled=Count('enrollments'))
+        .values_list('id', 'room__capacity', 'enrolled')
+    )
+    return {
+        class_id: {'class': class_id, 'enrolled': enrolled, 'capacity': capacity, 'remaining': capacity - enrolled}
+        for class_id, capacity, enrolled in rows
+    }
+
+
+def term_class_ids(term_id=None):
+    """شناسه کلاس‌های یک ترم (پیش‌فرض: ترم جاری)"""
+    if term_id is None:
+        term_id = Term.objects.filter(is_current=True).values_list('pk', flat=True).first()
+    return set(Class.objects.filter(course__term_id=term_id).values_list('pk', flat=True))
+
+
+class Subscription:
+    """بیننده کلاس‌های مشخص؛ به‌روزرسانی‌های ارسال‌نشده هر کلاس روی هم نوشته می‌شوند"""
+
+    def __init__(self, class_ids):
+        self.class_ids = frozenset(class_ids)
+        self.pending = {}
+        self.cursor = 0
+        self.ready = asyncio.Event()
+
+    def push(self, updates, cursor):
+        for class_id in self.class_ids.intersection(updates):
+            self.pending[class_id] = updates[class_id]
+        self.cursor = cursor
+        if self.pending:
+            self.ready.set()
+
+    async def next(self, timeout):
+        """به‌روزرسانی‌های رسیده (مرتب بر اساس کلاس)، یا لیست خالی پس از timeout ثانیه"""
+        try:
+            await asyncio.wait_for(self.ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        self.ready.clear()
+        updates, self.pending = self.pending, {}
+        return [updates[class_id] for class_id in sorted(updates)]
+
+
+class SeatBroadcaster:
+    """
+    پخش‌کننده درون‌پردازه‌ای: تا وقتی بیننده‌ای هست یک وظیفه asyncio فید تغییرات را می‌خواند و
+    به‌روزرسانی‌ها را بین بینندگان پخش می‌کند؛ هزینه پایگاه داده به تعداد بینندگان بستگی ندارد.
+    """
+
+    def __init__(self, poll_interval=SEAT_POLL_INTERVAL):
+        self.poll_interval = poll_interval
+        self.subscribers = set()
+        self.cursor = 0
+        self.task = None
+
+    async def subscribe(self, class_ids):
+        """
+        ثبت بیننده؛ شروع خواندن فید پیش از بازگشت تضمین می‌کند تغییرات بعد از وضعیت اولیه‌ای
+        که بیننده پس از این فراخوانی می‌خواند از دست نروند.
+        """
+        if self.task is None or self.task.done():
+            cursor = await sync_to_async(latest_event_id)()
+            # ممکن است بیننده دیگری در این فاصله پخش را شروع کرده باشد
+            if self.task is None or self.task.done():
+                self.cursor = cursor
+                self.task = asyncio.get_running_loop().create_task(self.run())
+        subscription = Subscription(class_ids)
+        subscription.cursor = self.cursor
+        self.subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self.subscribers.discard(subscription)
+
+    async def poll(self):
+        classes, cursor = await sync_to_async(changed_classes)(self.cursor)
+        # فقط وضعیت کلاس‌هایی که بیننده دارند خوانده می‌شود
+        watched = classes & set().union(*(subscription.class_ids for subscription in self.subscribers))
+        updates = await sync_to_async(seat_counts)(watched) if watched else {}
+        self.cursor = cursor
+        if updates:
+            for subscription in list(self.subscribers):
+                subscription.push(updates, cursor)
+
+    async def run(self):
+        while self.subscribers:
+            try:
+                await self.poll()
+            except DatabaseError:
+                # مثلاً قفل بودن SQLite؛ همین رویدادها در دوره بعد دوباره خوانده می‌شوند
+                logger.exception('خطا در خواندن فید تغییرات برای پخش ظرفیت کلاس‌ها')
+            await asyncio.sleep(self.poll_interval)
+
+
+broadcaster = SeatBroadcaster()
+
+
+def format_event(data, event=None, event_id=None):
+    """یک پیام با قالب text/event-stream"""
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    if event is not None:
+        lines.append(f'event: {event}')
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return '\n'.join(lines) + '\n\n'
+
+
+async def seat_events(class_ids, heartbeat=HEARTBEAT_INTERVAL):
+    """
+    جریان رویدادهای ظرفیت: ابتدا وضعیت فعلی همه کلاس‌ها (snapshot) و سپس فقط کلاس‌های تغییر یافته (seats)
+    با قطع اتصال، بیننده از پخش‌کننده حذف می‌شود.
+    """
+    subscription = await broadcaster.subscribe(class_ids)
+    try:
+        counts = await sync_to_async(seat_counts)(subscription.class_ids)
+        yield f'retry: {RECONNECT_DELAY}\n\n'
+        yield format_event([counts[class_id] for class_id in sorted(counts)], 'snapshot', subscription.cursor)
+        while True:
+            updates = await subscription.next(heartbeat)
+            if updates:
+                yield format_event(updates, 'seats', subscription.cursor)
+            else:
+                yield ': keepalive\n\n'
+    finally:
+        broadcaster.unsubscribe(subscription)
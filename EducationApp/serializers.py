@@ -1,5 +1,14 @@
+from collections import Counter
 from rest_framework import serializers
-from .models import Faculty, Major, Student, Professor, Course, Term, Room, Class, Enrollment, CourseAssignment, ContactInfo
+from .grading import apply_grades
+from .batch import max_requests
+from .jobs import JOB_TYPES
+from .timetable import student_clashes
+from .prerequisites import creates_cycle, missing_prerequisites
+from .models import (
+    Faculty, Major, Student, Professor, Course, Term, Room, Class, Enrollment, CourseAssignment, ContactInfo, ChangeEvent, Job,
+    CoursePrerequisite,
+)
 
 class FacultySerializer(serializers.ModelSerializer):
     class Meta:
@@ -15,6 +24,7 @@ class StudentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Student
         fields = '__all__'
+        read_only_fields = ['graduation_status']
 
 class ProfessorSerializer(serializers.ModelSerializer):
     class Meta:
@@ -45,13 +55,133 @@ class EnrollmentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Enrollment
         fields = '__all__'
+        read_only_fields = ['status']
+
+    def validate(self, attrs):
+        # تداخل زمانی فقط هنگام تغییر دانشجو یا کلاس بررسی می‌شود
+        if 'student' in attrs or 'class_instance' in attrs:
+            student = attrs.get('student') or self.instance.student
+            class_instance = attrs.get('class_instance') or self.instance.class_instance
+            clashes = student_clashes(student.pk, class_instance, exclude_enrollment=getattr(self.instance, 'pk', None))
+            if clashes:
+                raise serializers.ValidationError(
+                    {'class_instance': f'این کلاس با کلاس‌های {clashes} از برنامه دانشجو تداخل زمانی دارد.'}
+                )
+            missing = missing_prerequisites(student.pk, class_instance.course_id)
+            if missing:
+                raise serializers.ValidationError(
+                    {'class_instance': f'دانشجو پیش‌نیازهای {missing} این درس را نگذرانده است.'}
+                )
+        return attrs
+
+class GradeEntrySerializer(serializers.Serializer):
+    student = serializers.IntegerField()
+    grade = serializers.FloatField(allow_null=True, validators=Enrollment._meta.get_field('grade').validators)
+
+class GradeSheetSerializer(serializers.Serializer):
+    """
+    برگه نمرات یک کلاس؛ کلاس در context با کلید class_instance داده می‌شود
+    """
+    grades = GradeEntrySerializer(many=True, allow_empty=False)
+
+    def validate_grades(self, grades):
+        student_ids = [entry['student'] for entry in grades]
+        duplicates = sorted(student for student, count in Counter(student_ids).items() if count > 1)
+        if duplicates:
+            raise serializers.ValidationError(f'نمره دانشجویان {duplicates} بیش از یک بار ارسال شده است.')
+
+        self.enrollments = {
+            enrollment.student_id: enrollment
+            for enrollment in Enrollment.objects.filter(class_instance=self.context['class_instance'])
+        }
+        missing = sorted(set(student_ids) - set(self.enrollments))
+        if missing:
+            raise serializers.ValidationError(f'دانشجویان {missing} در این کلاس ثبت‌نام نکرده‌اند.')
+        return grades
+
+    def create(self, validated_data):
+        return apply_grades([
+            (self.enrollments[entry['student']], entry['grade'])
+            for entry in validated_data['grades']
+        ])
 
 class CourseAssignmentSerializer(serializers.ModelSerializer):
     class Meta:
         model = CourseAssignment
         fields = '__all__'
 
+class CoursePrerequisiteSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CoursePrerequisite
+        fields = '__all__'
+
+    def validate(self, attrs):
+        course = attrs.get('course') or self.instance.course
+        prerequisite = attrs.get('prerequisite') or self.instance.prerequisite
+        if creates_cycle(course.pk, prerequisite.pk):
+            raise serializers.ValidationError(
+                {'prerequisite': 'این پیش‌نیاز باعث ایجاد حلقه در پیش‌نیازهای درس می‌شود.'}
+            )
+        return attrs
+
 class ContactInfoSerializer(serializers.ModelSerializer):
     class Meta:
         model = ContactInfo
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+
+class ChangeEventSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ChangeEvent
+        fields = '__all__'
+
+class JobSerializer(serializers.ModelSerializer):
+    """
+    ثبت و نمایش وضعیت کار پس‌زمینه؛ نتیجه کار در endpoint جداگانه result برگردانده می‌شود
+    """
+    kind = serializers.ChoiceField(choices=sorted(JOB_TYPES))
+
+    class Meta:
+        model = Job
+        exclude = ['result']
+        read_only_fields = ['status', 'progress', 'error', 'worker', 'created_at', 'started_at', 'finished_at']
+
+    def validate(self, attrs):
+        _, params_serializer = JOB_TYPES[attrs['kind']]
+        params = attrs.get('params') or {}
+        if params_serializer is None:
+            attrs['params'] = {}
+            return attrs
+        serializer = params_serializer(data=params)
+        if not serializer.is_valid():
+            raise serializers.ValidationError({'params': serializer.errors})
+        attrs['params'] = serializer.validated_data
+        return attrs
+
+# سریالایزر پیش‌فرض هر مدل برای نمایش تودرتوی روابط (?expand=)
+MODEL_SERIALIZERS = {
+    serializer.Meta.model: serializer
+    for serializer in (
+        FacultySerializer, MajorSerializer, StudentSerializer, ProfessorSerializer,
+        CourseSerializer, TermSerializer, RoomSerializer, ClassSerializer,
+        EnrollmentSerializer, CourseAssignmentSerializer, ContactInfoSerializer, CoursePrerequisiteSerializer,
+    )
+}
+
+class BatchItemSerializer(serializers.Serializer):
+    id = serializers.CharField(required=False)
+    method = serializers.ChoiceField(choices=['GET', 'HEAD', 'OPTIONS', 'POST', 'PUT', 'PATCH', 'DELETE'], default='GET')
+    path = serializers.CharField()
+    body = serializers.JSONField(required=False, allow_null=True)
+
+class BatchSerializer(serializers.Serializer):
+    """
+    درخواست دسته‌ای؛ مسیر هر زیردرخواست نسبت به ریشه API (مثلاً students/5/) یا مطلق است
+    """
+    requests = BatchItemSerializer(many=True, allow_empty=False)
+    parallel = serializers.BooleanField(default=False)
+
+    def validate_requests(self, requests):
+        limit = max_requests()
+        if len(requests) > limit:
+            raise serializers.ValidationError(f'حداکثر {limit} زیردرخواست در هر درخواست دسته‌ای مجاز است.')
+        return requests
@@ -0,0 +1,171 @@
+from functools import partial
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import (
+    Faculty, Major, Student, Professor, Term, Course, Room, Class, Enrollment,
+    ChangeEvent, TimestampedModel, Tombstone, CoursePrerequisite, CourseAssignment,
+)
+from .archive import delete_student_archive
+from .caching import bump_cache_version
+from .prerequisites import add_to_closure, rebuild_closure
+from .rankings import mark_all_stale, mark_stale, mark_students_stale
+from .transcript import invalidate_transcript
+
+
+def after_commit(using, function, *args):
+    """
+    اجرای باطل‌سازی کش پس از commit تراکنش ذخیره یا حذف (بدون تراکنش، فوراً)
+    اگر نسخه کش پیش از commit افزایش یابد، خواننده همزمان ممکن است داده قبلی را با کلید
+    نسخه جدید در کش بگذارد و آن داده تا پایان TIMEOUT کش بماند.
+    """
+    transaction.on_commit(partial(function, *args), using=using)
+
+
+@receiver([post_save, post_delete], sender=Enrollment)
+def enrollment_changed(sender, instance, using, **kwargs):
+    """باطل کردن کارنامه کش‌شده دانشجو پس از تغییر ثبت‌نام"""
+    after_commit(using, invalidate_transcript, instance.student_id)
+
+
+@receiver(post_save, sender=Student)
+def student_transcript_changed(sender, instance, created, using, **kwargs):
+    """نام و شماره دانشجویی در کارنامه کش‌شده هم آمده است"""
+    if not created:
+        after_commit(using, invalidate_transcript, instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Class)
+def class_changed(sender, instance, using, **kwargs):
+    """افزایش نسخه کش ترم و نسخه کلاس‌های ترم کلاس تغییر یافته"""
+    term_id = Course.objects.filter(pk=instance.course_id).values_list('term_id', flat=True).first()
+    if term_id is not None:
+        after_commit(using, bump_cache_version, 'term', term_id)
+        after_commit(using, bump_cache_version, 'classes', term_id)
+
+
+@receiver([post_save, post_delete], sender=Enrollment)
+def enrollment_term_changed(sender, instance, using, **kwargs):
+    """افزایش نسخه کش ترمی که ثبت‌نام در آن تغییر کرده است"""
+    term_id = Class.objects.filter(pk=instance.class_instance_id).values_list('course__term_id', flat=True).first()
+    if term_id is not None:
+        after_commit(using, bump_cache_version, 'term', term_id)
+
+
+@receiver([post_save, post_delete], sender=Room)
+@receiver([post_save, post_delete], sender=Course)
+def schedule_changed(sender, using, **kwargs):
+    """تغییر اتاق یا درس روی کش همه ترم‌ها اثر دارد"""
+    after_commit(using, bump_cache_version, 'schedule')
+
+@receiver(post_save, sender=CoursePrerequisite)
+def prerequisite_saved(sender, instance, created, using, **kwargs):
+    """به‌روزرسانی بستار پیش‌نیازها: افزودن به صورت افزایشی و ویرایش با ساخت دوباره"""
+    if created:
+        add_to_closure(instance.course_id, instance.prerequisite_id, using=using)
+    else:
+        rebuild_closure(using=using)
+    after_commit(using, bump_cache_version, 'schedule')
+
+
+@receiver(post_delete, sender=CoursePrerequisite)
+def prerequisite_deleted(sender, using, **kwargs):
+    """
+    ساخت دوباره بستار پس از پایان تراکنش حذف
+    حذف یک درس چند پیش‌نیاز را با هم حذف می‌کند و جفت‌های حذف‌شده باید از روی یال‌های باقی‌مانده پیدا شوند.
+    """
+    def rebuild():
+        rebuild_closure(using=using)
+        bump_cache_version('schedule')
+    transaction.on_commit(rebuild, using=using)
+
+@receiver([post_save, post_delete], sender=Enrollment)
+def enrollment_timetable_changed(sender, instance, using, **kwargs):
+    """باطل کردن برنامه هفتگی کش‌شده دانشجو"""
+    after_commit(using, bump_cache_version, 'timetable', f'student:{instance.student_id}')
+
+
+@receiver([post_save, post_delete], sender=Class)
+@receiver([post_save, post_delete], sender=CourseAssignment)
+@receiver([post_save, post_delete], sender=Term)
+@receiver([post_save, post_delete], sender=Professor)
+def timetable_changed(sender, using, **kwargs):
+    """تغییر کلاس‌ها، اساتید کلاس‌ها یا ترم جاری روی برنامه هفتگی همه دانشجویان، اساتید و اتاق‌ها اثر دارد"""
+    after_commit(using, bump_cache_version, 'timetable')
+
+@receiver([post_save, post_delete], sender=Faculty)
+@receiver([post_save, post_delete], sender=Major)
+@receiver([post_save, post_delete], sender=Student)
+@receiver([post_save, post_delete], sender=Professor)
+@receiver([post_save, post_delete], sender=Term)
+@receiver([post_save, post_delete], sender=Course)
+@receiver([post_save, post_delete], sender=Class)
+@receiver([post_save, post_delete], sender=Enrollment)
+def stats_changed(sender, using, **kwargs):
+    """باطل کردن آمار کش‌شده داشبورد"""
+    after_commit(using, bump_cache_version, 'stats')
+
+@receiver([post_save, post_delete], sender=Enrollment)
+def enrollment_ranking_changed(sender, instance, signal, created=False, **kwargs):
+    """قدیمی شدن رتبه‌بندی گروه دانشجو؛ ایجاد یا حذف ثبت‌نام بدون نمره روی معدل اثری ندارد"""
+    if instance.grade is not None or (signal is post_save and not created):
+        mark_students_stale([instance.student_id])
+
+
+@receiver(post_save, sender=Student)
+def student_ranking_changed(sender, instance, created, **kwargs):
+    """تغییر رشته یا سال ورود، دانشجو را به گروه دیگری منتقل می‌کند"""
+    if not created:
+        mark_students_stale([instance.pk])
+
+
+@receiver(post_delete, sender=Student)
+def student_ranking_deleted(sender, instance, **kwargs):
+    mark_stale({(instance.major_id, instance.entry_year)})
+
+
+@receiver(post_save, sender=Course)
+def course_ranking_changed(sender, created, **kwargs):
+    """تغییر تعداد واحد درس روی معدل همه دانشجویان آن اثر دارد"""
+    if not created:
+        mark_all_stale()
+
+
+@receiver(post_delete, sender=Student)
+def student_deleted(sender, instance, using, **kwargs):
+    """حذف کارنامه کش‌شده و ثبت‌نام‌های بایگانی‌شده دانشجوی حذف‌شده"""
+    after_commit(using, invalidate_transcript, instance.pk)
+    # پایگاه داده archive در تراکنش حذف شرکت ندارد؛ با rollback حذف، بایگانی باید بماند
+    after_commit(using, delete_student_archive, instance.pk)
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_save, sender=Class)
+@receiver(post_save, sender=Enrollment)
+@receiver(post_save, sender=Room)
+def record_save_event(sender, instance, created, raw, using, **kwargs):
+    """ثبت رویداد ایجاد یا ویرایش در فید تغییرات، در همان تراکنش ذخیره"""
+    if raw:
+        return
+    action = ChangeEvent.Action.CREATE if created else ChangeEvent.Action.UPDATE
+    ChangeEvent.record(instance, action, using=using)
+
+
+@receiver(post_delete, sender=Student)
+@receiver(post_delete, sender=Class)
+@receiver(post_delete, sender=Enrollment)
+@receiver(post_delete, sender=Room)
+def record_delete_event(sender, instance, using, **kwargs):
+    """ثبت رویداد حذف در فید تغییرات، در همان تراکنش حذف"""
+    ChangeEvent.record(instance, ChangeEvent.Action.DELETE, using=using)
+
+
+def record_tombstone(sender, instance, using, **kwargs):
+    """ثبت رکورد حذف‌شده برای گزارش در همگام‌سازی modified_since"""
+    Tombstone.objects.using(using).create(model=sender._meta.model_name, object_id=instance.pk)
+
+
+for model in apps.get_app_config('EducationApp').get_models():
+    if issubclass(model, TimestampedModel):
+        post_delete.connect(record_tombstone, sender=model, dispatch_uid=f'tombstone-{model._meta.label_lower}')
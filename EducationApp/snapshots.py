@@ -0,0 +1,211 @@
+"""
+نسخه‌های آماده (snapshot) پایگاه داده برای تست و بنچمارک
+
+هر snapshot یک فایل SQLite از یک پروفایل داده قطعی (با seed ثابت) است که یک بار ساخته
+می‌شود و به جای اجرای دوباره generate_sample_data با کپی فایل یا API پشتیبان‌گیری SQLite
+بازیابی می‌شود. کنار هر فایل، یک فایل JSON وضعیت مهاجرت‌ها را نگه می‌دارد تا snapshot
+قدیمی پس از تغییر مدل‌ها استفاده نشود. در تست‌ها هر TestCase با ارث‌بری از SnapshotTestCase
+و تعیین snapshot = 'small' داده خود را از snapshot می‌گیرد.
+"""
+import json
+import os
+import shutil
+import sqlite3
+from pathlib import Path
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections, DEFAULT_DB_ALIAS
+from django.db.migrations.loader import MigrationLoader
+from django.test import TestCase, override_settings
+from django.test.runner import DiscoverRunner
+from django.utils import timezone
+
+# پروفایل‌های داده؛ هر پروفایل آرگومان‌های generate_sample_data است
+SNAPSHOT_PROFILES = {
+    'small': {'seed': 1, 'students': 200, 'professors': 30, 'courses': 40, 'classes': 60, 'rooms': 10},
+    'medium': {'seed': 2, 'students': 1000, 'professors': 100, 'courses': 70, 'classes': 80, 'rooms': 20},
+    'university': {'seed': 3, 'students': 30000, 'professors': 1500, 'courses': 1200, 'classes': 3000, 'rooms': 200},
+}
+
+
+class SnapshotError(Exception):
+    """snapshot درخواستی وجود ندارد یا با وضعیت فعلی مهاجرت‌ها سازگار نیست"""
+
+
+def snapshot_dir():
+    return Path(getattr(settings, 'SNAPSHOT_DIR', settings.BASE_DIR / 'snapshots'))
+
+
+def snapshot_path(name):
+    return snapshot_dir() / f'{name}.sqlite3'
+
+
+def _metadata_path(name):
+    return snapshot_dir() / f'{name}.json'
+
+
+def migration_state():
+    """آخرین مهاجرت هر اپ در کد فعلی؛ معیار سازگاری snapshot"""
+    loader = MigrationLoader(None, ignore_no_migrations=True)
+    return sorted(list(node) for node in loader.graph.leaf_nodes())
+
+
+def snapshot_metadata(name):
+    """اطلاعات ثبت‌شده هنگام ساخت snapshot یا None اگر ساخته نشده باشد"""
+    path = _metadata_path(name)
+    if not path.exists() or not snapshot_path(name).exists():
+        return None
+    return json.loads(path.read_text(encoding='utf-8'))
+
+
+def is_current(name):
+    metadata = snapshot_metadata(name)
+    return metadata is not None and metadata['migrations'] == migration_state()
+
+
+def build_snapshot(name, using=DEFAULT_DB_ALIAS):
+    """
+    ساخت snapshot یک پروفایل در فایل جدا
+    اتصال پایگاه داده using موقتاً با یک اتصال جدید به فایل در حال ساخت جایگزین می‌شود، مهاجرت‌ها و
+    تولید داده روی آن اجرا می‌شود و فایل کامل‌شده جایگزین نسخه قبلی می‌شود. اتصال اصلی (مثلاً
+    پایگاه داده تست) دست نمی‌خورد.
+    """
+    from .generate_data import generate_sample_data
+
+    if name not in SNAPSHOT_PROFILES:
+        raise SnapshotError(f'پروفایل {name} تعریف نشده است.')
+    profile = SNAPSHOT_PROFILES[name]
+    path = snapshot_path(name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    building = path.with_suffix('.building')
+    building.unlink(missing_ok=True)
+
+    original = connections[using]
+    connection = type(original)({**original.settings_dict, 'NAME': str(building)}, using)
+    connections[using] = connection
+    try:
+        call_command('migrate', database=using, interactive=False, verbosity=0)
+        generate_sample_data(**profile)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+            cursor.execute('VACUUM')
+    finally:
+        connection.close()
+        connections[using] = original
+        # شناسه نوع مدل‌ها در فایل ساخته‌شده ممکن است با پایگاه داده اصلی یکی نباشد
+        ContentType.objects.clear_cache()
+
+    os.replace(building, path)
+    _metadata_path(name).write_text(json.dumps({
+        'name': name,
+        'profile': profile,
+        'migrations': migration_state(),
+        'built_at': timezone.now().isoformat(),
+    }, ensure_ascii=False, indent=2), encoding='utf-8')
+    return path
+
+
+def restore_snapshot(name, using=DEFAULT_DB_ALIAS):
+    """
+    جایگزینی پایگاه داده با snapshot
+    پایگاه داده فایلی با کپی فایل و پایگاه داده درون حافظه (تست) با API پشتیبان‌گیری SQLite
+    بازیابی می‌شود. کش‌ها پاک می‌شوند چون به داده قبلی تعلق دارند.
+    """
+    metadata = snapshot_metadata(name)
+    if metadata is None:
+        raise SnapshotError(f'snapshot {name} ساخته نشده است؛ ابتدا دستور snapshot build را اجرا کنید.')
+    if metadata['migrations'] != migration_state():
+        raise SnapshotError(f'snapshot {name} با مهاجرت‌های فعلی سازگار نیست؛ دوباره ساخته شود.')
+
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        raise SnapshotError('بازیابی snapshot فقط برای SQLite پشتیبانی می‌شود.')
+
+    path = snapshot_path(name)
+    if connection.is_in_memory_db():
+        connection.ensure_connection()
+        source = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+        try:
+            source.backup(connection.connection)
+        finally:
+            source.close()
+    else:
+        target = Path(connection.settings_dict['NAME'])
+        connection.close()
+        copying = target.with_suffix('.restoring')
+        shutil.copyfile(path, copying)
+        for journal in ('-wal', '-shm', '-journal'):
+            Path(f'{target}{journal}').unlink(missing_ok=True)
+        os.replace(copying, target)
+    cache.clear()
+    ContentType.objects.clear_cache()
+
+
+class SnapshotTestCase(TestCase):
+    """
+    TestCase که داده کلاس آن از snapshot خوانده می‌شود (مثلاً snapshot = 'small')
+    پیش از شروع تراکنش کلاس، محتوای پایگاه داده تست در حافظه نگه داشته و با snapshot جایگزین
+    می‌شود و پس از پایان کلاس برمی‌گردد، پس TestCase های دیگر داده snapshot را نمی‌بینند.
+    snapshot ساخته‌نشده یا قدیمی پیش از اولین استفاده ساخته می‌شود.
+    """
+    snapshot = None
+    snapshot_database = DEFAULT_DB_ALIAS
+
+    @classmethod
+    def setUpClass(cls):
+        cls._saved_database = None
+        if cls.snapshot:
+            if not is_current(cls.snapshot):
+                build_snapshot(cls.snapshot, using=cls.snapshot_database)
+            connection = connections[cls.snapshot_database]
+            connection.ensure_connection()
+            cls._saved_database = sqlite3.connect(':memory:')
+            connection.connection.backup(cls._saved_database)
+            restore_snapshot(cls.snapshot, using=cls.snapshot_database)
+        try:
+            super().setUpClass()
+        except Exception:
+            cls._restore_saved_database()
+            raise
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls._restore_saved_database()
+
+    @classmethod
+    def _restore_saved_database(cls):
+        if cls._saved_database is None:
+            return
+        connection = connections[cls.snapshot_database]
+        connection.ensure_connection()
+        cls._saved_database.backup(connection.connection)
+        cls._saved_database.close()
+        cls._saved_database = None
+        cache.clear()
+        ContentType.objects.clear_cache()
+
+
+class SnapshotTestRunner(DiscoverRunner):
+    """
+    اجراکننده تست پروژه؛ داده snapshot با SnapshotTestCase و برای هر TestCase جداگانه بارگذاری می‌شود
+    """
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # ریشه مخزن هم __init__.py دارد؛ بدون top_level ماژول‌های تست با نام package.EducationApp وارد می‌شوند
+        self.top_level = self.top_level or str(settings.BASE_DIR)
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        # فایل‌های استاتیک بدون manifest (تست‌ها بدون اجرای collectstatic قالب‌ها را رندر می‌کنند)
+        self._static_storage = override_settings(STORAGES={
+            **settings.STORAGES,
+            'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+        })
+        self._static_storage.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._static_storage.disable()
+        super().teardown_test_environment(**kwargs)
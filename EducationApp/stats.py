@@ -0,0 +1,66 @@
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils import timezone
+from .caching import cache_version
+from .models import Faculty, Major, Professor, Term, Class, Enrollment
+
+# آمار تا تغییر مدل‌های مرتبط در کش می‌ماند (signals.py)؛ این زمان فقط سقف اطمینان است
+STATS_CACHE_TIMEOUT = 60 * 60
+
+
+def stats_cache_key():
+    return f"stats:{cache_version('stats')}"
+
+
+def _grouped(queryset, field, choices):
+    """شمارش گروه‌بندی‌شده بر اساس یک فیلد choices، همراه با عنوان فارسی هر مقدار"""
+    counts = dict(queryset.order_by().values_list(field).annotate(count=Count('pk')))
+    return [
+        {field: value, 'label': label, 'count': counts.get(value, 0)}
+        for value, label in choices
+    ]
+
+
+def compute_stats():
+    """
+    آمار داشبورد با چند کوئری گروه‌بندی‌شده:
+    دانشجویان هر دانشکده و رشته، کلاس‌های ترم جاری، ثبت‌نام‌ها بر اساس وضعیت و اساتید بر اساس نوع قرارداد
+    """
+    majors = [
+        {'id': major_id, 'name': name, 'faculty_id': faculty_id, 'students': count}
+        for major_id, name, faculty_id, count in (
+            Major.objects
+            .order_by('faculty__name', 'name')
+            .annotate(student_count=Count('students'))
+            .values_list('id', 'name', 'faculty_id', 'student_count')
+        )
+    ]
+    faculty_students = {}
+    for major in majors:
+        faculty_students[major['faculty_id']] = faculty_students.get(major['faculty_id'], 0) + major['students']
+    faculties = [
+        {'id': faculty_id, 'name': name, 'students': faculty_students.get(faculty_id, 0)}
+        for faculty_id, name in Faculty.objects.order_by('name').values_list('id', 'name')
+    ]
+
+    current_term = Term.objects.filter(is_current=True).first()
+    return {
+        'students': sum(faculty_students.values()),
+        'faculties': faculties,
+        'majors': majors,
+        'current_term': {'id': current_term.pk, 'name': str(current_term)} if current_term else None,
+        'active_classes': Class.objects.filter(course__term=current_term).count() if current_term else 0,
+        'enrollments_by_status': _grouped(Enrollment.objects.all(), 'status', Enrollment.Status.choices),
+        'professors_by_contract': _grouped(Professor.objects.all(), 'contract_type', Professor.ContractType.choices),
+        'generated_at': timezone.now(),
+    }
+
+
+def get_stats():
+    """آمار کش‌شده داشبورد؛ با هر تغییر در مدل‌های مرتبط نسخه کش عوض می‌شود"""
+    key = stats_cache_key()
+    data = cache.get(key)
+    if data is None:
+        data = compute_stats()
+        cache.set(key, data, STATS_CACHE_TIMEOUT)
+    return data
@@ -0,0 +1,45 @@
+"""
+ذخیره‌ساز فایل‌های استاتیک با نام‌های hash شده و نسخه‌های فشرده از پیش ساخته‌شده
+
+collectstatic نام هر فایل را با hash محتوای آن می‌سازد (ManifestStaticFilesStorage) و برای
+فایل‌های متنی نسخه gzip و در صورت نصب بودن کتابخانه brotli نسخه br را کنار آن می‌نویسد.
+این فایل‌ها توسط StaticFilesMiddleware با هدرهای cache طولانی‌مدت سرو می‌شوند.
+"""
+import gzip
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# پسوند فایل‌هایی که فشرده‌سازی آن‌ها ارزش دارد (تصاویر و فونت‌ها از قبل فشرده‌اند)
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.json', '.map', '.svg', '.txt', '.html', '.xml')
+# نسخه فشرده فقط اگر دست کم این نسبت کوچک‌تر باشد نوشته می‌شود
+MIN_COMPRESSION_RATIO = 0.95
+
+
+def compress(content):
+    """نسخه‌های فشرده محتوا: لیست (پسوند، محتوای فشرده)"""
+    variants = [('.gz', gzip.compress(content, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append(('.br', brotli.compress(content)))
+    return [(suffix, data) for suffix, data in variants if len(data) < len(content) * MIN_COMPRESSION_RATIO]
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in set(self.hashed_files.values()):
+            if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            with self.open(name) as original:
+                content = original.read()
+            for suffix, data in compress(content):
+                if self.exists(name + suffix):
+                    self.delete(name + suffix)
+                self._save(name + suffix, ContentFile(data))
@@ -1,3 +1,1363 @@
-from django.test import TestCase
+import asyncio
+import csv
+import importlib
+import os
+import sqlite3
+import tempfile
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from io import StringIO
+from datetime import date, time, timedelta
+from unittest import mock, skipIf, skipUnless
+from asgiref.sync import async_to_sync, sync_to_async
+from django.apps import apps
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ValidationError
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.http import HttpResponse
+from django.test import AsyncClient, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from . import eligibility
+from .admin import EstimatedCountPaginator
+from .archive import archivable_terms, archive_term
+from .audit import run_audit
+from .contacts import find_owners, normalize_phone, split_duplicate_contacts
+from .eligibility import eligible_classes
+from .generate_data import generate_sample_data
+from .graduation import evaluate_graduation
+from .jobs import JOB_TYPES, claim_jobs, heartbeat, register_job, requeue_stale, run_job, submit_job
+from .middleware import AdmissionControlMiddleware
+from .mixins import ModifiedSinceMixin
+from .renderers import msgpack, orjson
+from .models import (
+    Faculty, Major, Student, Professor, Term, Course, Room, Class, Enrollment, Tombstone, CoursePrerequisite,
+    ContactInfo, CourseAssignment,
+    Job, RankingCohort, ChangeEvent, ArchivedEnrollment, ArchivedClass, StudentArchiveSummary,
+)
+from .prerequisites import all_prerequisites, missing_prerequisites
+from .rankings import RANKINGS_JOB, refresh_stale
+from .seats import SeatBroadcaster, Subscription, changed_classes, latest_event_id
+from .snapshots import (
+    SNAPSHOT_PROFILES, SnapshotError, SnapshotTestCase, build_snapshot, is_current, restore_snapshot, snapshot_path,
+)
+from .throttling import get_store
+from .transcript import build_transcript, get_transcript
 
-# Create your tests here.
+API = '/EducationApp/api'
+
+# کش درون حافظه و فایل جدای سطل‌های توکن تا تست‌ها روی کش و محدودسازی سرور اثری نگذارند
+TEST_SETTINGS = {
+    'CACHES': {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    'THROTTLE_DB': os.path.join(tempfile.mkdtemp(), 'throttle.sqlite3'),
+}
+
+
+@override_settings(**TEST_SETTINGS)
+class EducationTestCase(TestCase):
+    """پایه تست‌ها با داده نمونه کوچک: یک رشته، دو ترم، دو درس، یک اتاق و یک دانشجو"""
+    databases = {'default', 'archive'}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.faculty = Faculty.objects.create(name='فنی و مهندسی', code='ENG')
+        cls.major = Major.objects.create(name='مهندسی کامپیوتر', faculty=cls.faculty, code='CE')
+        cls.old_term = Term.objects.create(year='1402', season=Term.Season.FALL)
+        cls.term = Term.objects.create(year='1403', season=Term.Season.FALL, is_current=True)
+        cls.room = Room.objects.create(name='101', building='A', capacity=2)
+        cls.student = cls.make_student('1000000001', '40001')
+        cls.professor = Professor.objects.create(
+            professor_id='P1', faculty=cls.faculty, contract_type=Professor.ContractType.FULL_TIME,
+            **cls.person_fields('2000000001'),
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    @staticmethod
+    def person_fields(national_id, birth_date='1380/05/10'):
+        return {
+            'first_name': 'علی', 'last_name': 'احمدی', 'national_id': national_id, 'birth_date': birth_date,
+            'birth_place': 'تهران', 'father_name': 'حسن', 'id_number': national_id[:6],
+            'gender': Student.Gender.MALE, 'marital_status': Student.MaritalStatus.SINGLE, 'address': 'تهران',
+        }
+
+    @classmethod
+    def make_student(cls, national_id, student_id, entry_year='1400', **fields):
+        return Student.objects.create(
+            student_id=student_id, major=cls.major, entry_year=entry_year,
+            **{**cls.person_fields(national_id), **fields},
+        )
+
+    @classmethod
+    def make_class(cls, code, term=None, credits=3, day='شنبه', start=8, end=10, room=None):
+        course = Course.objects.create(
+            name=f'درس {code}', code=code, credits=credits, major=cls.major, term=term or cls.term,
+        )
+        return Class.objects.create(
+            course=course, room=room or cls.room, day_of_week=day, start_time=time(start), end_time=time(end),
+        )
+
+
+class TranscriptTests(EducationTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.class_instance = self.make_class('C1')
+        Enrollment.objects.create(student=self.student, class_instance=self.class_instance, grade=15)
+
+    def transcript(self):
+        return get_transcript(self.student.pk, lambda: Student.objects.get(pk=self.student.pk))
+
+    def test_cached_until_enrollment_changes(self):
+        self.assertEqual(self.transcript()['gpa'], 15)
+        with self.assertNumQueries(0):
+            self.transcript()
+        with self.captureOnCommitCallbacks(execute=True):
+            Enrollment.objects.filter(student=self.student).get().delete()
+        self.assertEqual(self.transcript()['terms'], [])
+
+    def test_invalidated_only_after_commit(self):
+        self.transcript()
+        with self.captureOnCommitCallbacks() as callbacks:
+            Enrollment.objects.filter(student=self.student).get().delete()
+            # پیش از commit کارنامه قبلی (با نسخه قبلی کش) هنوز خوانده می‌شود
+            self.assertEqual(self.transcript()['gpa'], 15)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.transcript()['terms'], [])
+
+    def test_course_edit_invalidates(self):
+        self.assertEqual(self.transcript()['total_credits'], 3)
+        course = self.class_instance.course
+        course.credits = 2
+        course.name = 'درس ویرایش‌شده'
+        with self.captureOnCommitCallbacks(execute=True):
+            course.save()
+        transcript = self.transcript()
+        self.assertEqual(transcript['total_credits'], 2)
+        self.assertEqual(transcript['terms'][0]['courses'][0]['name'], 'درس ویرایش‌شده')
+
+    def test_student_edit_invalidates(self):
+        self.transcript()
+        self.student.first_name = 'رضا'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.student.save()
+        self.assertEqual(self.transcript()['full_name'], 'رضا احمدی')
+
+    def test_endpoint(self):
+        response = self.client.get(f'{API}/students/{self.student.pk}/transcript/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['total_credits_passed'], 3)
+        self.assertEqual(self.client.get(f'{API}/students/999999/transcript/').status_code, 404)
+
+
+class ModifiedSinceTests(EducationTestCase):
+
+    def sync(self, since):
+        return self.client.get(f'{API}/rooms/', {'modified_since': since.isoformat()})
+
+    def test_changes_and_deletions(self):
+        since = timezone.now()
+        room = Room.objects.create(name='102', building='A', capacity=30)
+        Room.objects.create(name='103', building='A', capacity=30).delete()
+        data = self.sync(since).json()
+        self.assertEqual([row['id'] for row in data['results']], [room.pk])
+        self.assertEqual(len(data['deleted']), 1)
+        self.assertFalse(data['deleted_has_more'])
+
+    def test_deleted_is_capped(self):
+        since = timezone.now()
+        ids = []
+        for number in range(5):
+            room = Room.objects.create(name=f'2{number:02d}', building='B', capacity=10)
+            ids.append(room.pk)
+            room.delete()
+        with mock.patch.object(ModifiedSinceMixin, 'max_deleted', 3):
+            data = self.sync(since).json()
+            self.assertEqual(data['deleted'], ids[:3])
+            self.assertTrue(data['deleted_has_more'])
+            rest = self.client.get(f'{API}/rooms/', {'modified_since': data['synced_at']}).json()
+        # حذف مرز (با زمان برابر synced_at) دوباره برگردانده می‌شود ولی چیزی از دست نمی‌رود
+        self.assertEqual(rest['deleted'], ids[2:])
+        self.assertFalse(rest['deleted_has_more'])
+
+    def test_older_than_retention_is_rejected(self):
+        with self.settings(TOMBSTONE_RETENTION_DAYS=30):
+            self.assertEqual(self.sync(timezone.now() - timedelta(days=31)).status_code, 400)
+            self.assertEqual(self.sync(timezone.now() - timedelta(days=29)).status_code, 200)
+
+    def test_prune(self):
+        Room.objects.create(name='104', building='A', capacity=30).delete()
+        Tombstone.objects.update(deleted_at=timezone.now() - timedelta(days=100))
+        Room.objects.create(name='105', building='A', capacity=30).delete()
+        with self.settings(TOMBSTONE_RETENTION_DAYS=90):
+            call_command('prune_tombstones', stdout=StringIO())
+        self.assertEqual(Tombstone.objects.count(), 1)
+
+
+class PersonFilterTests(EducationTestCase):
+
+    def ids(self, **params):
+        response = self.client.get(f'{API}/students/', params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return [row['id'] for row in response.json()['results']]
+
+    def test_birth_year(self):
+        self.assertEqual(self.ids(birth_year=1380), [self.student.pk])
+        self.assertEqual(self.ids(birth_year=1381), [])
+
+    def test_out_of_range_values_are_rejected(self):
+        for params in ({'birth_year': 9999}, {'birth_year': 1243}, {'birth_year': 'x'}, {'max_age': 5000},
+                       {'min_age': 3000}, {'min_age': -1}, {'birth_month': 13}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(f'{API}/students/', params).status_code, 400)
+
+    def test_age_range(self):
+        age = self.student.age
+        self.assertEqual(self.ids(min_age=age, max_age=age), [self.student.pk])
+        self.assertEqual(self.ids(min_age=age + 1), [])
+        self.assertEqual(self.ids(max_age=150), [self.student.pk])
+
+    def test_leap_day(self):
+        # 29 فوریه 2024 منهای یک سال به 28 فوریه 2023 می‌رسد
+        today = date(2024, 2, 29)
+        self.student.birth_date = '1380/12/09'  # 28 فوریه 2002
+        self.student.save()
+        self.assertTrue(Student.objects.aged_between(22, 22, today=today).filter(pk=self.student.pk).exists())
+
+    def test_age_of_nonexistent_date(self):
+        student = self.make_student('1000000002', '40002', birth_date='1380/13/40')
+        self.assertIsNone(student.birth_date_gregorian)
+        self.assertGreater(student.age, 20)
+
+
+class ExpandTests(EducationTestCase):
+
+    def test_allowed_many_relation(self):
+        Enrollment.objects.create(student=self.student, class_instance=self.make_class('C1'))
+        response = self.client.get(f'{API}/students/{self.student.pk}/', {'expand': 'enrollments.class_instance.course'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['enrollments'][0]['class_instance']['course']['code'], 'C1')
+
+    def test_unlisted_many_relation_is_rejected(self):
+        for url, expand in ((f'{API}/majors/', 'students'),
+                            (f'{API}/majors/', 'students.enrollments.class_instance'),
+                            (f'{API}/rooms/', 'classes'),
+                            (f'{API}/students/', 'enrollments.class_instance.enrollments')):
+            with self.subTest(url=url, expand=expand):
+                self.assertEqual(self.client.get(url, {'expand': expand}).status_code, 400)
+
+    def test_single_relations_and_depth(self):
+        self.assertEqual(self.client.get(f'{API}/students/', {'expand': 'major.faculty'}).status_code, 200)
+        self.assertEqual(self.client.get(f'{API}/students/', {'expand': 'nope'}).status_code, 400)
+        response = self.client.get(f'{API}/enrollments/', {'expand': 'class_instance.course.term.x'})
+        self.assertEqual(response.status_code, 400)
+
+
+class RendererTests(EducationTestCase):
+
+    def test_json_by_default(self):
+        response = self.client.get(f'{API}/majors/')
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(response.json()['results'][0]['name'], 'مهندسی کامپیوتر')
+
+    @skipUnless(orjson, 'orjson نصب نیست')
+    def test_orjson_writes_utf8(self):
+        response = self.client.get(f'{API}/majors/')
+        self.assertIn('مهندسی کامپیوتر'.encode(), response.content)
+
+    @skipUnless(msgpack, 'msgpack نصب نیست')
+    def test_msgpack(self):
+        response = self.client.get(f'{API}/majors/', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertEqual(msgpack.unpackb(response.content)['results'][0]['code'], 'CE')
+
+    @skipIf(msgpack, 'msgpack نصب است')
+    def test_msgpack_falls_back_to_json(self):
+        response = self.client.get(f'{API}/majors/', HTTP_ACCEPT='application/msgpack, application/json;q=0.5')
+        self.assertEqual(response['Content-Type'], 'application/json')
+
+
+class JobTests(EducationTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(JOB_TYPES.pop, 'failing', None)
+
+        @register_job('failing')
+        def failing(params, progress):
+            raise RuntimeError('ورودی نامعتبر')
+
+    def test_failure_stores_message_and_logs_traceback(self):
+        job = submit_job('failing')
+        with self.assertLogs('EducationApp.jobs', 'ERROR') as logs:
+            self.assertFalse(run_job(job.pk))
+        self.assertIn('Traceback', logs.output[0])
+        job.refresh_from_db()
+        self.assertEqual(job.error, 'ورودی نامعتبر')
+        body = self.client.get(f'{API}/jobs/{job.pk}/').json()
+        self.assertEqual(body['error'], 'ورودی نامعتبر')
+        self.assertEqual(self.client.get(f'{API}/jobs/{job.pk}/result/').status_code, 409)
+
+    def test_success(self):
+        job = submit_job('rankings')
+        self.assertTrue(run_job(job.pk))
+        self.assertEqual(self.client.get(f'{API}/jobs/{job.pk}/result/').json()['result'], {'cohorts': 1})
+
+    def test_requeue_only_on_missed_heartbeat(self):
+        now = timezone.now()
+        long_running, dead, legacy = (submit_job('rankings') for _ in range(3))
+        claim_jobs(3)
+        Job.objects.filter(pk=long_running.pk).update(started_at=now - timedelta(hours=5))
+        Job.objects.filter(pk=dead.pk).update(heartbeat_at=now - timedelta(minutes=5))
+        Job.objects.filter(pk=legacy.pk).update(started_at=now - timedelta(hours=5), heartbeat_at=None)
+        self.assertEqual(requeue_stale(timedelta(minutes=1)), 2)
+        statuses = dict(Job.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses[long_running.pk], Job.Status.RUNNING)
+        self.assertEqual((statuses[dead.pk], statuses[legacy.pk]), (Job.Status.QUEUED, Job.Status.QUEUED))
+
+        Job.objects.filter(pk=long_running.pk).update(heartbeat_at=now - timedelta(minutes=5))
+        self.assertEqual(heartbeat([long_running.pk]), 1)
+        self.assertEqual(requeue_stale(timedelta(minutes=1)), 0)
+
+    def run_jobs_with_pools(self, *pools):
+        with mock.patch('EducationApp.management.commands.run_jobs.process_pool', side_effect=pools):
+            call_command('run_jobs', workers=2, once=True, stdout=StringIO())
+
+    def test_broken_pool_fails_in_flight_jobs(self):
+        jobs = [submit_job('rankings') for _ in range(2)]
+        self.run_jobs_with_pools(FakePool(broken=True), FakePool())
+        for job in jobs:
+            job.refresh_from_db()
+            self.assertEqual(job.status, Job.Status.FAILED)
+            self.assertTrue(job.error)
+
+    def test_broken_pool_on_submit_requeues_and_recreates_pool(self):
+        jobs = [submit_job('rankings') for _ in range(2)]
+        self.run_jobs_with_pools(FakePool(broken_on_submit=True), FakePool())
+        self.assertEqual({job.status for job in Job.objects.filter(pk__in=[job.pk for job in jobs])}, {Job.Status.SUCCEEDED})
+
+
+class FakePool:
+    """جایگزین ProcessPoolExecutor که کار را در همین پردازه اجرا یا از کار افتادن pool را شبیه‌سازی می‌کند"""
+
+    def __init__(self, broken=False, broken_on_submit=False):
+        self.broken = broken
+        self.broken_on_submit = broken_on_submit
+
+    def submit(self, func, *args):
+        if self.broken_on_submit:
+            raise BrokenProcessPool
+        future = Future()
+        if self.broken:
+            future.set_exception(BrokenProcessPool())
+        else:
+            future.set_result(func(*args))
+        return future
+
+    def shutdown(self, **kwargs):
+        pass
+
+
+class PageTests(EducationTestCase):
+
+    def test_pages_render_without_collectstatic(self):
+        for url in ('/EducationApp/', '/EducationApp/api/docs/'):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, '/static/EducationApp/css/education_app.css')
+
+
+class PrerequisiteClosureTests(EducationTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.basic, self.middle, self.advanced = (self.make_class(code).course for code in ('P1', 'P2', 'P3'))
+        CoursePrerequisite.objects.create(course=self.middle, prerequisite=self.basic)
+        self.edge = CoursePrerequisite.objects.create(course=self.advanced, prerequisite=self.middle)
+
+    def test_added_edges_are_transitive(self):
+        self.assertEqual(all_prerequisites(self.advanced.pk), sorted([self.basic.pk, self.middle.pk]))
+        self.assertEqual(missing_prerequisites(self.student.pk, self.advanced.pk), ['P1', 'P2'])
+
+    def test_update_and_delete_rebuild(self):
+        self.edge.prerequisite = self.basic
+        self.edge.save()
+        self.assertEqual(all_prerequisites(self.advanced.pk), [self.basic.pk])
+        with self.captureOnCommitCallbacks(execute=True):
+            CoursePrerequisite.objects.filter(course=self.middle).delete()
+        self.assertEqual(all_prerequisites(self.middle.pk), [])
+        self.assertEqual(all_prerequisites(self.advanced.pk), [self.basic.pk])
+
+    def test_failed_closure_update_rolls_back_edge(self):
+        extra = self.make_class('P4').course
+        with mock.patch('EducationApp.signals.add_to_closure', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                CoursePrerequisite.objects.create(course=extra, prerequisite=self.advanced)
+        self.assertFalse(CoursePrerequisite.objects.filter(course=extra).exists())
+
+    def test_cycle_is_rejected(self):
+        self.client.force_authenticate(User.objects.create_user('staff'))
+        response = self.client.post(
+            f'{API}/course-prerequisites/', {'course': self.basic.pk, 'prerequisite': self.advanced.pk},
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(CoursePrerequisite.objects.filter(course=self.basic).exists())
+
+
+class EligibilityTests(EducationTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.first = self.make_class('E1')
+        self.second = self.make_class('E2', day='یکشنبه')
+        self.others = [self.make_student(f'10000001{number:02d}', f'401{number:02d}') for number in range(2)]
+
+    def eligible(self):
+        result = eligible_classes(self.student, self.term.pk)
+        return {row['id']: row['remaining_seats'] for row in result['classes']}, result['rejected']
+
+    def test_enrollments_update_seats_without_rebuilding_index(self):
+        with mock.patch.object(eligibility, 'build_class_index', wraps=eligibility.build_class_index) as build:
+            self.assertEqual(self.eligible()[0], {self.first.pk: 2, self.second.pk: 2})
+            Enrollment.objects.create(student=self.others[0], class_instance=self.first)
+            self.assertEqual(self.eligible()[0], {self.first.pk: 1, self.second.pk: 2})
+            Enrollment.objects.create(student=self.others[1], class_instance=self.first)
+            classes, rejected = self.eligible()
+            self.assertEqual(build.call_count, 1)
+        self.assertEqual(classes, {self.second.pk: 2})
+        self.assertEqual(rejected['seats'], 1)
+
+    def test_class_and_prerequisite_changes_rebuild_index(self):
+        self.eligible()
+        with self.captureOnCommitCallbacks(execute=True):
+            third = self.make_class('E3', day='دوشنبه')
+        self.assertIn(third.pk, self.eligible()[0])
+        with self.captureOnCommitCallbacks(execute=True):
+            CoursePrerequisite.objects.create(course=third.course, prerequisite=self.first.course)
+        classes, rejected = self.eligible()
+        self.assertNotIn(third.pk, classes)
+        self.assertEqual(rejected['prerequisites'], 1)
+
+    def test_clash_and_enrolled(self):
+        clashing = self.make_class('E4', start=9, end=11, room=Room.objects.create(name='201', building='B', capacity=5))
+        Enrollment.objects.create(student=self.student, class_instance=self.first)
+        classes, rejected = self.eligible()
+        self.assertEqual(set(classes), {self.second.pk})
+        self.assertEqual(rejected['clash'], 2)
+        self.assertNotIn(clashing.pk, classes)
+
+    def test_endpoint_validates_term(self):
+        url = f'{API}/students/{self.student.pk}/eligible-classes/'
+        self.assertEqual(self.client.get(url).json()['count'], 2)
+        self.assertEqual(self.client.get(url, {'term': 'x'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'term': 99999}).status_code, 400)
+
+
+class RankingTests(EducationTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.other = self.make_student('1000000003', '40003')
+        class_instance = self.make_class('R1')
+        self.enrollment = Enrollment.objects.create(student=self.student, class_instance=class_instance, grade=12)
+        Enrollment.objects.create(student=self.other, class_instance=class_instance, grade=18)
+
+    def rankings(self, entry_year='1400'):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'{API}/rankings/', {'major': self.major.pk, 'entry_year': entry_year})
+        self.assertEqual(response.status_code, 200)
+        writes = [query['sql'] for query in queries if not query['sql'].lstrip().upper().startswith('SELECT')]
+        self.assertEqual(writes, [])
+        return response.json()
+
+    def test_reads_serve_last_ranking_with_stale_flag(self):
+        self.assertTrue(Job.objects.filter(kind=RANKINGS_JOB, status=Job.Status.QUEUED).exists())
+        data = self.rankings()
+        self.assertEqual((data['stale'], data['students']), (True, []))
+
+        refresh_stale()
+        data = self.rankings()
+        self.assertFalse(data['stale'])
+        self.assertEqual([row['student_id'] for row in data['students']], [self.other.pk, self.student.pk])
+
+        self.enrollment.grade = 20
+        self.enrollment.save()
+        data = self.rankings()
+        self.assertTrue(data['stale'])
+        self.assertEqual(data['students'][0]['student_id'], self.other.pk)
+        self.assertEqual(Job.objects.filter(kind=RANKINGS_JOB, status=Job.Status.QUEUED).count(), 1)
+
+        refresh_stale()
+        self.assertEqual(self.rankings()['students'][0]['student_id'], self.student.pk)
+
+    def test_unknown_cohort_is_not_created(self):
+        data = self.rankings(entry_year='1200')
+        self.assertEqual((data['stale'], data['size'], data['students']), (False, 0, []))
+        self.assertFalse(RankingCohort.objects.exists())
+
+    def test_student_rank(self):
+        refresh_stale()
+        data = self.client.get(f'{API}/students/{self.student.pk}/ranking/').json()
+        self.assertEqual((data['rank'], data['size'], data['stale']), (2, 2, False))
+
+    def test_student_rank_after_cohort_change(self):
+        refresh_stale()
+        url = f'{API}/students/{self.student.pk}/ranking/'
+        self.student.entry_year = '1401'
+        self.student.save()
+        data = self.client.get(url).json()
+        self.assertEqual((data['entry_year'], data['rank'], data['gpa'], data['stale']), ('1401', None, None, True))
+
+        refresh_stale()
+        data = self.client.get(url).json()
+        self.assertEqual((data['entry_year'], data['rank'], data['size'], data['stale']), ('1401', 1, 1, False))
+
+    def test_invalid_parameters(self):
+        for params in ({'major': 99999, 'entry_year': '1400'}, {'major': self.major.pk, 'entry_year': '14'},
+                       {'major': self.major.pk, 'entry_year': '1400', 'limit': 0}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(f'{API}/rankings/', params).status_code, 400)
+
+
+class ArchiveTests(EducationTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.old_class = self.make_class('A1', term=self.old_term, credits=3)
+        self.failed_class = self.make_class('A2', term=self.old_term, credits=2, day='یکشنبه')
+        self.current_class = self.make_class('A3', credits=2, day='دوشنبه')
+        CoursePrerequisite.objects.create(course=self.current_class.course, prerequisite=self.old_class.course)
+        self.archived = Enrollment.objects.create(student=self.student, class_instance=self.old_class, grade=16)
+        Enrollment.objects.create(student=self.student, class_instance=self.failed_class, grade=8)
+        Enrollment.objects.create(student=self.student, class_instance=self.current_class, grade=12)
+
+    def reload(self):
+        return Student.objects.get(pk=self.student.pk)
+
+    def test_round_trip_keeps_totals(self):
+        before = self.reload()
+        gpa, passed, transcript = before.gpa, before.total_credits_passed, build_transcript(before)
+        self.assertEqual(list(archivable_terms()), [self.old_term])
+
+        counts = archive_term(self.old_term)
+
+        self.assertEqual(counts, {'classes': 2, 'enrollments': 2, 'assignments': 0})
+        self.assertFalse(Enrollment.objects.filter(class_instance__course__term=self.old_term).exists())
+        self.assertFalse(Class.objects.filter(pk=self.old_class.pk).exists())
+        self.assertEqual(ArchivedEnrollment.objects.get(pk=self.archived.pk).grade, 16)
+        self.assertEqual(ArchivedClass.objects.get(pk=self.old_class.pk).course_code, 'A1')
+        summary = StudentArchiveSummary.objects.get(student=self.student)
+        self.assertEqual((summary.graded_credits, summary.passed_credits), (5, 3))
+
+        after = self.reload()
+        self.assertEqual((after.gpa, after.total_credits_passed), (gpa, passed))
+        self.assertEqual(build_transcript(after), transcript)
+        # پیش‌نیاز پاس‌شده در ترم بایگانی‌شده هنوز شمرده می‌شود
+        self.assertEqual(missing_prerequisites(self.student.pk, self.current_class.course_id), [])
+
+    def test_deletions_are_published(self):
+        archive_term(self.old_term)
+        self.assertTrue(ChangeEvent.objects.filter(
+            model='enrollment', object_id=self.archived.pk, action=ChangeEvent.Action.DELETE,
+        ).exists())
+        self.assertTrue(Tombstone.objects.filter(model='class', object_id=self.old_class.pk).exists())
+
+    def test_rerun_and_dry_run(self):
+        self.assertEqual(archive_term(self.old_term, dry_run=True)['enrollments'], 2)
+        self.assertTrue(Enrollment.objects.filter(pk=self.archived.pk).exists())
+        archive_term(self.old_term)
+        self.assertEqual(archive_term(self.old_term), {'classes': 0, 'enrollments': 0, 'assignments': 0})
+        self.assertEqual(ArchivedEnrollment.objects.count(), 2)
+
+    def test_student_delete_removes_archive(self):
+        archive_term(self.old_term)
+        student = self.make_student('1000000004', '40004')
+        ArchivedEnrollment.objects.create(id=999, class_instance_id=self.old_class.pk, student_id=student.pk, grade=10,
+                                          status=Enrollment.Status.PASSED)
+        with self.captureOnCommitCallbacks(execute=True):
+            student.delete()
+        self.assertEqual(list(ArchivedEnrollment.objects.values_list('student_id', flat=True)), [self.student.pk] * 2)
+
+    def test_rolled_back_student_delete_keeps_archive(self):
+        archive_term(self.old_term)
+        student_id = self.student.pk
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                self.student.delete()
+                raise RuntimeError
+        self.assertEqual(ArchivedEnrollment.objects.filter(student_id=student_id).count(), 2)
+
+    def test_before_year_after_current_is_rejected(self):
+        spring = Term.objects.create(year='1403', season=Term.Season.SPRING)
+        self.assertEqual(list(archivable_terms(1403)), [self.old_term])
+        with self.assertRaises(ValueError):
+            archivable_terms(1404)
+        with self.assertRaises(CommandError):
+            call_command('archive_terms', before_year=1404, stdout=StringIO())
+        self.assertTrue(Term.objects.filter(pk=spring.pk).exists())
+        self.assertFalse(ArchivedClass.objects.exists())
+
+
+class SeatStreamTests(EducationTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.seat_class = self.make_class('SEAT1')
+        self.cursor = latest_event_id()
+
+    def test_wsgi_request_is_rejected(self):
+        response = self.client.get(f'{API}/seats/stream/')
+        self.assertEqual(response.status_code, 501)
+
+    def test_invalid_classes_on_asgi(self):
+        response = async_to_sync(AsyncClient().get)(f'{API}/seats/stream/', {'classes': 'x'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_enrollment_marks_class_changed(self):
+        Enrollment.objects.create(student=self.student, class_instance=self.seat_class)
+        classes, cursor = changed_classes(self.cursor)
+        self.assertEqual(classes, {self.seat_class.pk})
+        self.assertEqual(cursor, latest_event_id())
+
+    def test_room_capacity_edit_marks_its_classes_changed(self):
+        other_room = Room.objects.create(name='102', building='A', capacity=5)
+        self.make_class('SEAT2', room=other_room)
+        self.cursor = latest_event_id()
+        self.room.capacity = 30
+        self.room.save()
+        classes, _ = changed_classes(self.cursor)
+        self.assertEqual(classes, set(Class.objects.filter(room=self.room).values_list('pk', flat=True)))
+
+    def test_room_capacity_edit_is_pushed(self):
+        broadcaster = SeatBroadcaster()
+        subscription = Subscription({self.seat_class.pk})
+        broadcaster.subscribers.add(subscription)
+        broadcaster.cursor = self.cursor
+        self.room.capacity = 30
+        self.room.save()
+        async_to_sync(broadcaster.poll)()
+        self.assertEqual(subscription.pending[self.seat_class.pk]['capacity'], 30)
+        self.assertEqual(subscription.pending[self.seat_class.pk]['remaining'], 30)
+
+
+class AuditTests(EducationTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.bad_id = self.make_student('12345', '40002')
+        self.bad_date = self.make_student('1000000003', '40003', birth_date='1402/12/30')
+        contact_type = ContentType.objects.get_for_model(Student)
+        self.bad_email = ContactInfo.objects.create(
+            content_type=contact_type, object_id=self.student.pk, contact_type=ContactInfo.ContactType.EMAIL,
+            value='ali-at-example',
+        )
+        ContactInfo.objects.create(
+            content_type=contact_type, object_id=self.student.pk, contact_type=ContactInfo.ContactType.MOBILE,
+            value='+989121234567',
+        )
+        first = self.make_class('AUD1', start=8, end=10)
+        self.bad_grade = Enrollment.objects.create(student=self.student, class_instance=first, grade=25)
+        self.overlap = self.make_class('AUD2', start=9, end=11)
+        # همان ساعت در ترم دیگر تداخل نیست
+        self.make_class('AUD3', term=self.old_term, start=8, end=10)
+
+    def expected(self):
+        return {
+            ('student', self.bad_id.pk, 'national_id'),
+            ('student', self.bad_date.pk, 'birth_date'),
+            ('contactinfo', self.bad_email.pk, 'value'),
+            ('enrollment', self.bad_grade.pk, 'grade'),
+            ('class', self.overlap.pk, 'start_time'),
+        }
+
+    def audit(self, **options):
+        violations = []
+        summary = run_audit(violations.extend, workers=1, **options)
+        return summary, violations
+
+    def test_detects_each_violation(self):
+        summary, violations = self.audit()
+        self.assertEqual({violation[:3] for violation in violations}, self.expected())
+        self.assertEqual(summary['student'], {'checked': 3, 'violations': 2})
+        self.assertEqual(summary['professor'], {'checked': 1, 'violations': 0})
+        self.assertEqual(summary['class'], {'checked': 3, 'violations': 1})
+
+    def test_chunking_does_not_change_result(self):
+        _, whole = self.audit()
+        summary, chunked = self.audit(chunk_size=1)
+        self.assertEqual(sorted(chunked), sorted(whole))
+        self.assertEqual(summary['contactinfo']['checked'], 2)
+
+    def test_command_writes_csv(self):
+        path = os.path.join(tempfile.mkdtemp(), 'audit.csv')
+        call_command('audit_integrity', output=path, workers=1, stderr=StringIO())
+        with open(path, encoding='utf-8') as report:
+            header, *rows = csv.reader(report)
+        self.assertEqual(header, ['model', 'object_id', 'field', 'value', 'message'])
+        self.assertEqual({(model, int(object_id), field) for model, object_id, field, *_ in rows}, self.expected())
+
+
+class TimetableTests(EducationTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.monday = self.make_class('TT1', day='دوشنبه', start=10, end=12)
+        self.saturday = self.make_class('TT2', day='شنبه', start=8, end=10)
+        # کلاس ترم گذشته در برنامه ترم جاری نمی‌آید
+        self.make_class('TT3', term=self.old_term)
+        for class_instance in (self.monday, self.saturday):
+            Enrollment.objects.create(student=self.student, class_instance=class_instance)
+        CourseAssignment.objects.create(professor=self.professor, class_instance=self.monday)
+
+    def timetable(self, kind, pk, **params):
+        return self.client.get(f'{API}/{kind}s/{pk}/timetable/', params)
+
+    def class_ids(self, data):
+        return [item['class'] for day in data['days'] for item in day['classes']]
+
+    def test_owners(self):
+        data = self.timetable('student', self.student.pk).json()
+        self.assertEqual([day['day'] for day in data['days']], ['شنبه', 'دوشنبه'])
+        self.assertEqual(self.class_ids(data), [self.saturday.pk, self.monday.pk])
+        self.assertEqual(data['term']['id'], self.term.pk)
+
+        data = self.timetable('professor', self.professor.pk).json()
+        self.assertEqual(self.class_ids(data), [self.monday.pk])
+        self.assertEqual(data['days'][0]['classes'][0]['professors'], [self.professor.full_name])
+
+        data = self.timetable('room', self.room.pk).json()
+        self.assertEqual(self.class_ids(data), [self.saturday.pk, self.monday.pk])
+
+    def test_unknown_owner(self):
+        self.assertEqual(self.timetable('student', 999999).status_code, 404)
+        self.assertEqual(self.timetable('room', 999999, format='ics').status_code, 404)
+        self.assertEqual(self.timetable('professor', 'abc').status_code, 404)
+
+    def test_cache_hit_runs_no_queries(self):
+        first = self.timetable('student', self.student.pk).json()
+        with CaptureQueriesContext(connection) as queries:
+            second = self.timetable('student', self.student.pk).json()
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(second, first)
+
+    def test_enrollment_invalidates_student(self):
+        self.timetable('student', self.student.pk)
+        extra = self.make_class('TT4', day='سه‌شنبه')
+        with self.captureOnCommitCallbacks(execute=True):
+            Enrollment.objects.create(student=self.student, class_instance=extra)
+        self.assertIn(extra.pk, self.class_ids(self.timetable('student', self.student.pk).json()))
+
+    def test_class_change_invalidates_all(self):
+        for kind, pk in (('student', self.student.pk), ('professor', self.professor.pk), ('room', self.room.pk)):
+            self.timetable(kind, pk)
+        self.monday.start_time = time(9)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.monday.save()
+        for kind, pk in (('student', self.student.pk), ('professor', self.professor.pk), ('room', self.room.pk)):
+            data = self.timetable(kind, pk).json()
+            starts = [item['start_time'] for day in data['days'] for item in day['classes'] if item['class'] == self.monday.pk]
+            self.assertEqual(starts, ['09:00'], kind)
+
+    def test_ics(self):
+        response = self.timetable('student', self.student.pk, format='ics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/calendar'))
+        self.assertEqual(
+            response['Content-Disposition'], f'attachment; filename="timetable-student-{self.student.pk}.ics"',
+        )
+        body = response.content.decode('utf-8')
+        self.assertTrue(body.startswith('BEGIN:VCALENDAR\r\n'))
+        self.assertEqual(body.count('BEGIN:VEVENT'), 2)
+        self.assertEqual(body.count('RRULE:FREQ=WEEKLY;COUNT=16'), 2)
+        self.assertIn(f'UID:class-{self.monday.pk}-student-{self.student.pk}@educationapp', body)
+        self.assertTrue(all(len(line.encode('utf-8')) <= 75 for line in body.split('\r\n')))
+
+
+class BatchTests(EducationTestCase):
+
+    def batch(self, *requests, **options):
+        response = self.client.post(f'{API}/batch/', {'requests': list(requests), **options}, format='json')
+        self.assertEqual(response.status_code, 200)
+        return {item['id']: item for item in response.json()['responses']}
+
+    def test_runs_in_order_with_parent_user(self):
+        self.client.force_authenticate(User.objects.create_user('staff'))
+        responses = self.batch(
+            {'id': 'create', 'method': 'POST', 'path': 'rooms/', 'body': {'name': '201', 'building': 'B', 'capacity': 30}},
+            {'id': 'list', 'path': f'{API}/rooms/?search=201'},
+        )
+        self.assertEqual(responses['create']['status'], 201)
+        self.assertEqual(responses['list']['status'], 200)
+        self.assertTrue(Room.objects.filter(name='201', building='B').exists())
+
+    def test_permissions_apply_per_item(self):
+        responses = self.batch(
+            {'id': 'read', 'path': f'students/{self.student.pk}/'},
+            {'id': 'write', 'method': 'DELETE', 'path': f'students/{self.student.pk}/'},
+        )
+        self.assertEqual(responses['read']['body']['student_id'], self.student.student_id)
+        self.assertEqual(responses['write']['status'], 403)
+        self.assertTrue(Student.objects.filter(pk=self.student.pk).exists())
+
+    def test_unsupported_routes(self):
+        responses = self.batch(
+            {'id': 'stream', 'path': 'seats/stream/'},
+            {'id': 'docs', 'path': 'docs/'},
+            {'id': 'nested', 'method': 'POST', 'path': 'batch/'},
+            {'id': 'missing', 'path': 'nothing/'},
+            {'id': 'outside', 'path': '/admin/'},
+        )
+        self.assertEqual({key: item['status'] for key, item in responses.items()}, {
+            'stream': 400, 'docs': 400, 'nested': 400, 'missing': 404, 'outside': 404,
+        })
+
+    def test_item_error_does_not_fail_batch(self):
+        with mock.patch('EducationApp.views.StudentViewSet.retrieve', side_effect=RuntimeError):
+            responses = self.batch(
+                {'id': 'broken', 'path': f'students/{self.student.pk}/'},
+                {'id': 'ok', 'path': f'majors/{self.major.pk}/'},
+            )
+        self.assertEqual(responses['broken']['status'], 500)
+        self.assertEqual(responses['ok']['status'], 200)
+
+    @override_settings(BATCH_MAX_REQUESTS=2)
+    def test_request_limit(self):
+        response = self.client.post(f'{API}/batch/', {'requests': [{'path': 'rooms/'}] * 3}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class SnapshotTests(SnapshotTestCase):
+    """بارگذاری یک snapshot کوچک در این TestCase بدون اثر روی داده EducationTestCase ها"""
+    databases = {'default', 'archive'}
+    snapshot = 'test'
+    profile = {'seed': 7, 'students': 12, 'professors': 4, 'courses': 6, 'classes': 6, 'rooms': 3}
+
+    @classmethod
+    def setUpClass(cls):
+        # تنظیمات پیش از ساخت و بازیابی snapshot در SnapshotTestCase.setUpClass لازم‌اند
+        overridden = override_settings(**TEST_SETTINGS, SNAPSHOT_DIR=tempfile.mkdtemp())
+        overridden.enable()
+        cls.addClassCleanup(overridden.disable)
+        profiles = mock.patch.dict(SNAPSHOT_PROFILES, {cls.snapshot: cls.profile})
+        profiles.start()
+        cls.addClassCleanup(profiles.stop)
+        super().setUpClass()
+
+    def test_loaded_for_this_case(self):
+        self.assertTrue(is_current(self.snapshot))
+        self.assertEqual(Student.objects.count(), self.profile['students'])
+        self.assertEqual(Room.objects.count(), self.profile['rooms'])
+
+    def test_stale_after_migration_change(self):
+        with mock.patch('EducationApp.snapshots.migration_state', return_value=[['EducationApp', '9999_future']]):
+            self.assertFalse(is_current(self.snapshot))
+            with self.assertRaises(SnapshotError):
+                restore_snapshot(self.snapshot)
+
+    def test_missing_snapshot(self):
+        self.assertFalse(is_current('missing'))
+        with self.assertRaises(SnapshotError):
+            restore_snapshot('missing')
+        with self.assertRaises(SnapshotError):
+            build_snapshot('missing')
+
+    def test_build_is_deterministic(self):
+        first = snapshot_path(self.snapshot)
+        with sqlite3.connect(first) as connection:
+            before = connection.execute('SELECT national_id FROM EducationApp_student ORDER BY id').fetchall()
+        build_snapshot(self.snapshot)
+        with sqlite3.connect(snapshot_path(self.snapshot)) as connection:
+            after = connection.execute('SELECT national_id FROM EducationApp_student ORDER BY id').fetchall()
+        self.assertEqual(after, before)
+        # ساخت دوباره روی پایگاه داده تست اثری ندارد
+        self.assertEqual(Student.objects.count(), self.profile['students'])
+
+
+class SnapshotIsolationTests(EducationTestCase):
+
+    def test_other_cases_keep_their_fixtures(self):
+        self.assertEqual(list(Student.objects.all()), [self.student])
+
+
+class ThrottleTests(EducationTestCase):
+
+    def setUp(self):
+        super().setUp()
+        # سطل‌ها و مجوزهای هر تست در فایل جدا
+        overridden = override_settings(THROTTLE_DB=os.path.join(tempfile.mkdtemp(), 'throttle.sqlite3'))
+        overridden.enable()
+        self.addCleanup(overridden.disable)
+        self.store = get_store()
+
+    def test_bucket_refills(self):
+        self.assertEqual(self.store.consume('key', rate=1, capacity=2, now=0), (True, 0))
+        self.assertEqual(self.store.consume('key', rate=1, capacity=2, now=0), (True, 0))
+        self.assertEqual(self.store.consume('key', rate=1, capacity=2, now=0.5), (False, 0.5))
+        self.assertEqual(self.store.consume('key', rate=1, capacity=2, now=1)[0], True)
+        # سطل بیش از ظرفیت پر نمی‌شود
+        self.assertTrue(self.store.consume('key', rate=1, capacity=2, now=100)[0])
+        self.assertTrue(self.store.consume('key', rate=1, capacity=2, now=100)[0])
+        self.assertFalse(self.store.consume('key', rate=1, capacity=2, now=100)[0])
+
+    @override_settings(REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {'default': '2/min', 'default.write': '1/min'},
+    })
+    def test_429_with_retry_after(self):
+        url = f'{API}/majors/'
+        self.assertEqual([self.client.get(url).status_code for _ in range(2)], [200, 200])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '30')
+        # نوشتن سطل جدای خودش را دارد
+        self.assertNotEqual(self.client.post(url, {}).status_code, 429)
+
+    def middleware(self, get_response=lambda request: HttpResponse('ok')):
+        return AdmissionControlMiddleware(get_response)
+
+    def write_request(self):
+        return RequestFactory().post(f'{API}/rooms/')
+
+    @override_settings(ADMISSION_CONTROL={'limit': 1, 'queue': 0, 'timeout': 1, 'retry_after': 2.5})
+    def test_503_when_queue_full(self):
+        lease_id, admitted = self.store.request_lease('write', 1, 0)
+        self.assertTrue(admitted)
+        response = self.middleware()(self.write_request())
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '3')
+        # خواندن‌ها کنترل نمی‌شوند
+        self.assertEqual(self.middleware()(RequestFactory().get(f'{API}/rooms/')).status_code, 200)
+        self.store.release_lease(lease_id)
+        self.assertEqual(self.middleware()(self.write_request()).status_code, 200)
+
+    @override_settings(ADMISSION_CONTROL={'limit': 1, 'queue': 1, 'timeout': 0.2})
+    def test_queued_request_times_out(self):
+        lease_id, _ = self.store.request_lease('write', 1, 1)
+        self.assertEqual(self.middleware()(self.write_request()).status_code, 503)
+        self.store.release_lease(lease_id)
+
+    @override_settings(ADMISSION_CONTROL={'limit': 1, 'queue': 1, 'timeout': 1})
+    def test_async_wait_does_not_block(self):
+        async def get_response(request):
+            return HttpResponse('ok')
+
+        middleware = self.middleware(get_response)
+        lease_id, _ = self.store.request_lease('write', 1, 1)
+
+        async def scenario():
+            waiting = asyncio.ensure_future(middleware(self.write_request()))
+            await asyncio.sleep(0.1)
+            self.assertFalse(waiting.done())
+            await sync_to_async(self.store.release_lease, thread_sensitive=False)(lease_id)
+            return await waiting
+
+        with mock.patch('EducationApp.middleware.time.sleep', side_effect=AssertionError('blocking sleep')):
+            response = async_to_sync(scenario)()
+        self.assertEqual(response.status_code, 200)
+
+
+class GradeSheetTests(EducationTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(User.objects.create_user('staff'))
+        self.class_instance = self.make_class('G1')
+        self.other = self.make_student('1000000002', '40002')
+        self.third = self.make_student('1000000003', '40003')
+        for student in (self.student, self.other, self.third):
+            Enrollment.objects.create(student=student, class_instance=self.class_instance)
+        self.url = f'{API}/classes/{self.class_instance.pk}/grade-sheet/'
+
+    def post(self, *grades):
+        return self.client.post(
+            self.url, {'grades': [{'student': student.pk, 'grade': grade} for student, grade in grades]}, format='json',
+        )
+
+    def statuses(self):
+        return dict(Enrollment.objects.filter(class_instance=self.class_instance).values_list('student_id', 'status'))
+
+    def test_status_follows_grade(self):
+        response = self.post((self.student, 15), (self.other, 0), (self.third, None))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['updated'], 2)
+        self.assertEqual(self.statuses(), {
+            self.student.pk: Enrollment.Status.PASSED, self.other.pk: Enrollment.Status.FAILED,
+            self.third.pk: Enrollment.Status.REGISTERED,
+        })
+        self.assertEqual(ChangeEvent.objects.filter(model='enrollment', action=ChangeEvent.Action.UPDATE).count(), 2)
+
+    def test_rejects_whole_sheet(self):
+        outsider = self.make_student('1000000004', '40004')
+        for grades in (((self.student, 15), (self.other, 25)),
+                       ((self.student, 15), (outsider, 12)),
+                       ((self.student, 15), (self.student, 12))):
+            with self.subTest(grades=grades):
+                self.assertEqual(self.post(*grades).status_code, 400)
+        self.assertEqual(set(self.statuses().values()), {Enrollment.Status.REGISTERED})
+
+    def gpa(self):
+        return get_transcript(self.student.pk, lambda: self.student)['gpa']
+
+    def test_caches_invalidated_after_commit(self):
+        self.assertEqual(self.gpa(), 0)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.post((self.student, 18))
+        # تا commit کارنامه کش‌شده قبلی برگردانده می‌شود
+        self.assertEqual(self.gpa(), 0)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.gpa(), 18)
+
+    def test_migration_backfills_status(self):
+        migration = importlib.import_module('EducationApp.migrations.0013_enrollment_status_backfill')
+        Enrollment.objects.filter(student=self.student).update(grade=0)
+        Enrollment.objects.filter(student=self.other).update(grade=12)
+        Enrollment.objects.filter(student=self.third).update(status=Enrollment.Status.PASSED)
+        migration.fill_statuses(apps, mock.Mock(connection=connection))
+        self.assertEqual(self.statuses(), {
+            self.student.pk: Enrollment.Status.FAILED, self.other.pk: Enrollment.Status.PASSED,
+            self.third.pk: Enrollment.Status.REGISTERED,
+        })
+
+
+class ChangeFeedTests(EducationTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.since = ChangeEvent.objects.order_by('id').values_list('id', flat=True).last() or 0
+        self.class_instance = self.make_class('F1')
+        self.enrollment = Enrollment.objects.create(student=self.student, class_instance=self.class_instance)
+        self.student.first_name = 'رضا'
+        self.student.save()
+
+    def changes(self, **params):
+        response = self.client.get(f'{API}/changes/', {'since': self.since, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def summary(self, events):
+        return [(event['model'], event['action'], event['object_id']) for event in events]
+
+    def test_events_in_order(self):
+        data = self.changes()
+        self.assertEqual(self.summary(data['events']), [
+            ('class', ChangeEvent.Action.CREATE, self.class_instance.pk),
+            ('enrollment', ChangeEvent.Action.CREATE, self.enrollment.pk),
+            ('student', ChangeEvent.Action.UPDATE, self.student.pk),
+        ])
+        self.assertEqual(data['events'][2]['data']['first_name'], 'رضا')
+        self.assertEqual((data['has_more'], data['next_since']), (False, data['events'][-1]['id']))
+
+    def test_paging_with_cursor(self):
+        first = self.changes(limit=2)
+        self.assertEqual((len(first['events']), first['has_more']), (2, True))
+        self.since = first['next_since']
+        rest = self.changes(limit=2)
+        self.assertEqual(self.summary(rest['events']), [('student', ChangeEvent.Action.UPDATE, self.student.pk)])
+        self.assertFalse(rest['has_more'])
+        # بدون رویداد جدید، cursor تغییر نمی‌کند
+        self.since = rest['next_since']
+        self.assertEqual(self.changes(), {'events': [], 'next_since': self.since, 'has_more': False})
+
+    def test_delete_event_keeps_last_values(self):
+        enrollment_id = self.enrollment.pk
+        self.enrollment.delete()
+        events = self.changes(model='enrollment')['events']
+        self.assertEqual(self.summary(events), [
+            ('enrollment', ChangeEvent.Action.CREATE, enrollment_id),
+            ('enrollment', ChangeEvent.Action.DELETE, enrollment_id),
+        ])
+        self.assertEqual(events[1]['data']['class_instance_id'], self.class_instance.pk)
+
+    def test_rolled_back_write_has_no_event(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            self.student.save()
+            raise RuntimeError
+        self.assertEqual(len(self.changes()['events']), 3)
+
+    def test_invalid_parameters(self):
+        for params in ({'since': 'x'}, {'since': -1}, {'limit': 'all'}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(f'{API}/changes/', params).status_code, 400)
+
+
+class GraduationTests(EducationTestCase):
+
+    def setUp(self):
+        super().setUp()
+        class_instance = self.make_class('GR1', credits=3)
+        self.failed = self.make_student('1000000002', '40002')
+        self.reverted = self.make_student(
+            '1000000003', '40003', graduation_status=Student.GraduationStatus.GRADUATED,
+        )
+        # 137 واحد گذرانده در ترم‌های بایگانی‌شده به علاوه درس 3 واحدی
+        for student, grade in ((self.student, 15), (self.failed, 8), (self.reverted, None)):
+            StudentArchiveSummary.objects.create(student=student, graded_credits=137, passed_credits=137)
+            Enrollment.objects.create(student=student, class_instance=class_instance, grade=grade)
+
+    def statuses(self):
+        return dict(Student.objects.values_list('pk', 'graduation_status'))
+
+    def test_status_from_passed_credits(self):
+        summary = evaluate_graduation(chunk_size=1, workers=1)
+        self.assertEqual(summary, {'evaluated': 3, 'graduated': 1, 'reverted': 1})
+        self.assertEqual(self.statuses(), {
+            self.student.pk: Student.GraduationStatus.GRADUATED,
+            self.failed.pk: Student.GraduationStatus.STUDYING,
+            self.reverted.pk: Student.GraduationStatus.STUDYING,
+        })
+        self.assertEqual(
+            set(ChangeEvent.objects.filter(model='student', action=ChangeEvent.Action.UPDATE).values_list('object_id', flat=True)),
+            {self.student.pk, self.reverted.pk},
+        )
+        # اجرای دوباره تغییری ندارد
+        self.assertEqual(evaluate_graduation(workers=1), {'evaluated': 3, 'graduated': 0, 'reverted': 0})
+
+
+class ClashTests(EducationTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(User.objects.create_user('staff'))
+        other_room = Room.objects.create(name='201', building='B', capacity=30)
+        self.morning = self.make_class('CL1', start=8, end=10)
+        self.overlapping = self.make_class('CL2', start=9, end=11, room=other_room)
+        self.adjacent = self.make_class('CL3', start=10, end=12)
+        self.other_day = self.make_class('CL4', day='یک‌شنبه', start=8, end=10, room=other_room)
+        self.old = self.make_class('CL5', term=self.old_term, start=9, end=11, room=other_room)
+        Enrollment.objects.create(student=self.student, class_instance=self.morning)
+
+    def enroll(self, class_instance):
+        return self.client.post(
+            f'{API}/enrollments/', {'student': self.student.pk, 'class_instance': class_instance.pk}, format='json',
+        )
+
+    def test_enrollment_clash_is_rejected(self):
+        response = self.enroll(self.overlapping)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(str(self.morning.pk), response.json()['class_instance'][0])
+        for class_instance in (self.adjacent, self.other_day, self.old):
+            with self.subTest(code=class_instance.course.code):
+                self.assertEqual(self.enroll(class_instance).status_code, 201)
+
+    def test_model_clean(self):
+        with self.assertRaises(ValidationError):
+            Enrollment(student=self.student, class_instance=self.overlapping).full_clean()
+        # ویرایش همان ثبت‌نام با خودش تداخل ندارد
+        Enrollment.objects.get(class_instance=self.morning).full_clean()
+
+    def test_term_report(self):
+        other = self.make_student('1000000002', '40002')
+        # داده قدیمی که بدون اعتبارسنجی ثبت شده است
+        for student in (self.student, other):
+            Enrollment.objects.create(student=student, class_instance=self.overlapping)
+        Enrollment.objects.create(student=other, class_instance=self.morning)
+        Enrollment.objects.create(student=other, class_instance=self.adjacent)
+
+        url = f'{API}/terms/{self.term.pk}/clashes/'
+        data = self.client.get(url, {'page_size': 1}).json()
+        self.assertEqual((data['term'], data['count'], len(data['results'])), (self.term.pk, 3, 1))
+        self.assertIsNotNone(data['next'])
+        results = self.client.get(url).json()['results']
+        self.assertEqual(
+            sorted((clash['student'], *clash['classes']) for clash in results),
+            sorted([(self.student.pk, self.morning.pk, self.overlapping.pk),
+                    (other.pk, self.morning.pk, self.overlapping.pk),
+                    (other.pk, self.overlapping.pk, self.adjacent.pk)]),
+        )
+        self.assertEqual(self.client.get(f'{API}/terms/{self.old_term.pk}/clashes/').json()['count'], 0)
+
+
+class UtilizationTests(EducationTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(User.objects.create_user('staff'))
+        Room.objects.create(name='102', building='A', capacity=2)
+        self.class_instance = self.make_class('UT1', start=8, end=10)
+        self.class_instance.start_time = time(8, 30)
+        self.class_instance.save()
+        self.make_class('UT2', term=self.old_term, start=12, end=14)
+        Enrollment.objects.create(student=self.student, class_instance=self.class_instance)
+        self.url = f'{API}/terms/{self.term.pk}/utilization/'
+
+    def test_heatmap(self):
+        data = self.client.get(self.url).json()
+        self.assertEqual((data['term'], data['hours'][0], data['buildings']), (self.term.pk, 7, ['A']))
+        self.assertEqual([room['name'] for room in data['rooms']], ['101', '102'])
+        # شنبه، ساعت‌های 7 تا 10: نیم ساعت اول ساعت 8 خالی است
+        self.assertEqual(data['room_occupancy'][0][0][:4], [0, 0.5, 1, 0])
+        self.assertEqual(data['room_seat_fill'][0][0][:4], [0, 0.25, 0.5, 0])
+        self.assertEqual(data['room_occupancy'][1][0], [0] * 14)
+        # ساختمان: میانگین اشغال اتاق‌ها و نسبت دانشجویان به مجموع ظرفیت
+        self.assertEqual(data['building_occupancy'][0][0][:4], [0, 0.25, 0.5, 0])
+        self.assertEqual(data['building_seat_fill'][0][0][:4], [0, 0.125, 0.25, 0])
+        # کلاس ترم دیگر در نقشه این ترم نیست
+        self.assertFalse(any(any(day) for day in data['room_occupancy'][0][1:]))
+        self.assertEqual(sum(map(sum, data['room_occupancy'][0])), 1.5)
+
+    def test_invalidated_after_enrollment(self):
+        self.client.get(self.url)
+        other = self.make_student('1000000002', '40002')
+        with self.captureOnCommitCallbacks(execute=True):
+            Enrollment.objects.create(student=other, class_instance=self.class_instance)
+            # تا پایان تراکنش نسخه کش تغییر نمی‌کند
+            self.assertEqual(self.client.get(self.url).json()['room_seat_fill'][0][0][2], 0.5)
+        self.assertEqual(self.client.get(self.url).json()['room_seat_fill'][0][0][2], 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.class_instance.day_of_week = 'یک‌شنبه'
+            self.class_instance.save()
+        data = self.client.get(self.url).json()
+        self.assertEqual((data['room_occupancy'][0][0][2], data['room_occupancy'][0][1][2]), (0, 1))
+
+
+class StatsTests(EducationTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.make_class('ST1')
+        self.make_class('ST2', term=self.old_term)
+        Enrollment.objects.create(student=self.student, class_instance=Class.objects.get(course__code='ST1'))
+
+    def test_stats(self):
+        data = self.client.get(f'{API}/stats/').json()
+        self.assertEqual((data['students'], data['active_classes']), (1, 1))
+        self.assertEqual(data['current_term']['id'], self.term.pk)
+        self.assertEqual(data['faculties'], [{'id': self.faculty.pk, 'name': self.faculty.name, 'students': 1}])
+        statuses = {row['status']: row['count'] for row in data['enrollments_by_status']}
+        self.assertEqual(statuses[Enrollment.Status.REGISTERED], 1)
+        self.assertEqual(sum(statuses.values()), 1)
+        contracts = {row['contract_type']: row['count'] for row in data['professors_by_contract']}
+        self.assertEqual(contracts[Professor.ContractType.FULL_TIME], 1)
+
+    def test_cached_until_commit(self):
+        first = self.client.get(f'{API}/stats/').json()
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(f'{API}/stats/').json(), first)
+        self.assertEqual(len(queries), 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.make_student('1000000002', '40002')
+            self.assertEqual(self.client.get(f'{API}/stats/').json()['students'], 1)
+        data = self.client.get(f'{API}/stats/').json()
+        self.assertEqual(data['students'], 2)
+        self.assertNotEqual(data['generated_at'], first['generated_at'])
+
+
+class ContactTests(EducationTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.add_contact(self.student, ContactInfo.ContactType.MOBILE, '0912-123 4567')
+        self.add_contact(self.professor, ContactInfo.ContactType.EMAIL, 'Ali.Ahmadi@Example.com')
+        self.add_contact(self.student, ContactInfo.ContactType.HOME, '021 8888 0000')
+        self.add_contact(self.professor, ContactInfo.ContactType.HOME, '02188880000')
+
+    @staticmethod
+    def add_contact(person, contact_type, value):
+        return ContactInfo.objects.create(person=person, contact_type=contact_type, value=value)
+
+    def test_normalize_phone(self):
+        for value in ('09121234567', '9121234567', '989121234567', '+98 912 123 4567', '0098 (912) 123-4567',
+                      '۰۹۱۲۱۲۳۴۵۶۷'):
+            with self.subTest(value=value):
+                self.assertEqual(normalize_phone(value), '+989121234567')
+        self.assertEqual(normalize_phone('+1 202 555 0100'), '+12025550100')
+
+    def test_find_owners(self):
+        results = find_owners(['912 123 4567', 'ali.ahmadi@example.COM', '+982188880000', '09350000000'])
+        self.assertEqual(
+            [(owner['model'], owner['id']) for owner in results['912 123 4567']['owners']],
+            [('student', self.student.pk)],
+        )
+        self.assertEqual(results['912 123 4567']['normalized'], '+989121234567')
+        self.assertEqual(results['ali.ahmadi@example.COM']['owners'][0]['id'], self.professor.pk)
+        self.assertEqual(
+            sorted(owner['model'] for owner in results['+982188880000']['owners']), ['professor', 'student'],
+        )
+        self.assertEqual(results['09350000000']['owners'], [])
+
+    def test_lookup_endpoint(self):
+        response = self.client.get(f'{API}/contact-infos/lookup/', {'value': ['989121234567']})
+        owner = response.json()['results']['989121234567']['owners'][0]
+        self.assertEqual((owner['id'], owner['contact_type']), (self.student.pk, ContactInfo.ContactType.MOBILE))
+        self.assertEqual(self.client.get(f'{API}/contact-infos/lookup/').status_code, 400)
+
+    def test_split_duplicates(self):
+        content_type = ContentType.objects.get_for_model(Student)
+        contacts = [
+            ContactInfo(content_type=content_type, object_id=self.student.pk, contact_type=contact_type, value=value)
+            for contact_type, value in [
+                (ContactInfo.ContactType.MOBILE, '+98 912 123 4567'),
+                (ContactInfo.ContactType.MOBILE, '09350000000'),
+                (ContactInfo.ContactType.MOBILE, '9350000000'),
+                (ContactInfo.ContactType.HOME, '02188880000'),
+            ]
+        ]
+        unique, duplicates = split_duplicate_contacts(contacts)
+        self.assertEqual([contact.value for contact in unique], ['09350000000', '02188880000'])
+        self.assertEqual([contact.value for contact in duplicates], ['+98 912 123 4567', '9350000000'])
+
+
+class AdminTests(EducationTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(User.objects.create_superuser('admin', password='x'))
+        self.classes = [self.make_class(f'AD{index}', start=8 + index, end=9 + index) for index in range(3)]
+
+    def test_changelists(self):
+        for model in apps.get_app_config('EducationApp').get_models():
+            if not admin.site.is_registered(model):
+                continue
+            url = reverse(f'admin:EducationApp_{model._meta.model_name}_changelist')
+            with self.subTest(model=model.__name__):
+                self.assertEqual(self.client.get(url).status_code, 200)
+                self.assertEqual(self.client.get(url, {'q': '1'}).status_code, 200)
+
+    def test_queries_do_not_grow_with_rows(self):
+        url = reverse('admin:EducationApp_enrollment_changelist')
+        Enrollment.objects.create(student=self.student, class_instance=self.classes[0])
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(url)
+        for index, class_instance in enumerate(self.classes[1:]):
+            student = self.make_student(f'100000001{index}', f'4001{index}')
+            Enrollment.objects.create(student=student, class_instance=class_instance)
+        with CaptureQueriesContext(connection) as many:
+            self.client.get(url)
+        self.assertEqual(len(many), len(few))
+
+    def test_estimated_count(self):
+        with mock.patch('EducationApp.admin.estimated_count', return_value=250_000) as estimate:
+            self.assertEqual(EstimatedCountPaginator(Class.objects.order_by('pk'), 50).count, 250_000)
+            # با فیلتر تعداد دقیق شمرده می‌شود
+            self.assertEqual(EstimatedCountPaginator(Class.objects.filter(room=self.room).order_by('pk'), 50).count, 3)
+            estimate.assert_called_once()
+        # جدول کوچک یا بدون آمار: تعداد دقیق
+        for value in (10, None):
+            with mock.patch('EducationApp.admin.estimated_count', return_value=value):
+                self.assertEqual(EstimatedCountPaginator(Class.objects.order_by('pk'), 50).count, 3)
+
+
+class GenerateDataTests(EducationTestCase):
+
+    def test_invalidates_cached_timetables(self):
+        class_instance = self.make_class('GD1')
+        url = f'{API}/students/{self.student.pk}/timetable/'
+        self.assertEqual(self.class_ids(url), [])
+        # همه کلاس‌ها و اتاق‌ها از پیش موجودند؛ فقط ثبت‌نام‌ها به صورت دسته‌ای ایجاد می‌شوند
+        generate_sample_data(students=1, professors=1, courses=1, classes=1, rooms=1, seed=1)
+        self.assertTrue(Enrollment.objects.filter(student=self.student, class_instance=class_instance).exists())
+        self.assertEqual(self.class_ids(url), [class_instance.pk])
+
+    def class_ids(self, url):
+        return [item['class'] for day in self.client.get(url).json()['days'] for item in day['classes']]
@@ -0,0 +1,161 @@
+"""
+محدودسازی نرخ درخواست (token bucket) و کنترل پذیرش درخواست‌های نوشتنی
+
+وضعیت سطل‌ها و مجوزهای پذیرش در یک فایل SQLite جدا (THROTTLE_DB) نگهداری می‌شود تا بین
+همه پردازه‌های سرور مشترک باشد و روی قفل نوشتن پایگاه داده اصلی اثری نگذارد. هر عملیات
+در یک تراکنش BEGIN IMMEDIATE انجام می‌شود، پس خواندن و به‌روزرسانی سطل اتمی است.
+"""
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+# مجوز پذیرش پردازه‌ای که بدون آزاد کردن آن از کار افتاده، پس از این مدت (ثانیه) باطل می‌شود
+LEASE_TTL = 60
+
+
+class ThrottleStore:
+    """ذخیره‌گاه مشترک سطل‌های توکن و مجوزهای پذیرش در یک فایل SQLite"""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._local = threading.local()
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS bucket (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)'
+            )
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS lease (id INTEGER PRIMARY KEY AUTOINCREMENT, scope TEXT NOT NULL, '
+                'admitted INTEGER NOT NULL, expires REAL NOT NULL)'
+            )
+            self._local.connection = connection
+        return connection
+
+    def _transaction(self, operation, *args):
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            result = operation(connection, *args)
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+        return result
+
+    def consume(self, key, rate, capacity, now=None):
+        """
+        برداشتن یک توکن از سطل key که با نرخ rate توکن در ثانیه تا capacity پر می‌شود
+        خروجی: (مجاز بودن، ثانیه‌های لازم تا توکن بعدی)
+        """
+        now = time.time() if now is None else now
+
+        def operation(connection):
+            row = connection.execute('SELECT tokens, updated FROM bucket WHERE key = ?', (key,)).fetchone()
+            tokens = capacity if row is None else min(capacity, row[0] + (now - row[1]) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            connection.execute(
+                'INSERT INTO bucket (key, tokens, updated) VALUES (?, ?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated',
+                (key, tokens, now),
+            )
+            return allowed, 0 if allowed else (1 - tokens) / rate
+
+        return self._transaction(operation)
+
+    def request_lease(self, scope, limit, queue_size):
+        """
+        درخواست مجوز پذیرش: (شناسه مجوز، پذیرفته شدن) یا None اگر صف انتظار پر باشد
+        تا وقتی کسی در صف است، درخواست جدید هم پشت صف قرار می‌گیرد.
+        """
+        now = time.time()
+
+        def operation(connection):
+            connection.execute('DELETE FROM lease WHERE expires < ?', (now,))
+            (active,), = connection.execute('SELECT COUNT(*) FROM lease WHERE scope = ? AND admitted = 1', (scope,))
+            (waiting,), = connection.execute('SELECT COUNT(*) FROM lease WHERE scope = ? AND admitted = 0', (scope,))
+            admitted = active < limit and waiting == 0
+            if not admitted and waiting >= queue_size:
+                return None
+            cursor = connection.execute(
+                'INSERT INTO lease (scope, admitted, expires) VALUES (?, ?, ?)', (scope, int(admitted), now + LEASE_TTL)
+            )
+            return cursor.lastrowid, admitted
+
+        return self._transaction(operation)
+
+    def promote_lease(self, lease_id, scope, limit):
+        """پذیرش مجوز در حال انتظار اگر نوبت آن رسیده و ظرفیت خالی باشد"""
+        now = time.time()
+
+        def operation(connection):
+            connection.execute('DELETE FROM lease WHERE expires < ?', (now,))
+            (active,), = connection.execute('SELECT COUNT(*) FROM lease WHERE scope = ? AND admitted = 1', (scope,))
+            first = connection.execute(
+                'SELECT MIN(id) FROM lease WHERE scope = ? AND admitted = 0', (scope,)
+            ).fetchone()[0]
+            admitted = active < limit and first == lease_id
+            connection.execute(
+                'UPDATE lease SET admitted = ?, expires = ? WHERE id = ?', (int(admitted), now + LEASE_TTL, lease_id)
+            )
+            return admitted
+
+        return self._transaction(operation)
+
+    def release_lease(self, lease_id):
+        self._transaction(lambda connection: connection.execute('DELETE FROM lease WHERE id = ?', (lease_id,)))
+
+
+def parse_rate(rate):
+    """تبدیل نرخ با قالب DRF (مثلاً 60/min) به (تعداد، طول دوره به ثانیه)"""
+    count, period = rate.split('/')
+    return int(count), {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}[period[0]]
+
+
+@lru_cache(maxsize=None)
+def _store(path):
+    return ThrottleStore(path)
+
+
+def get_store():
+    return _store(str(getattr(settings, 'THROTTLE_DB', settings.BASE_DIR / 'throttle.sqlite3')))
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    محدودسازی token bucket به ازای هر کاربر (یا IP برای کاربر ناشناس) و دسته endpoint
+    دسته endpoint از throttle_scope ویو (پیش‌فرض default) است و برای درخواست‌های نوشتنی
+    پسوند .write می‌گیرد. نرخ هر دسته در DEFAULT_THROTTLE_RATES با قالب DRF (مثلاً 60/min)
+    تعریف می‌شود: ظرفیت سطل برابر تعداد و نرخ پر شدن برابر تعداد تقسیم بر دوره است.
+    دسته‌ای که نرخ نداشته باشد محدود نمی‌شود.
+    """
+    default_scope = 'default'
+
+    def get_scope(self, request, view):
+        scope = getattr(view, 'throttle_scope', None) or self.default_scope
+        return scope if request.method in SAFE_METHODS else f'{scope}.write'
+
+    def allow_request(self, request, view):
+        scope = self.get_scope(request, view)
+        rate = (api_settings.DEFAULT_THROTTLE_RATES or {}).get(scope)
+        if rate is None:
+            return True
+        capacity, period = parse_rate(rate)
+        user = request.user
+        ident = f'user:{user.pk}' if user and user.is_authenticated else f'ip:{self.get_ident(request)}'
+        allowed, self._wait = get_store().consume(f'{scope}:{ident}', capacity / period, capacity)
+        return allowed
+
+    def wait(self):
+        return self._wait
@@ -0,0 +1,243 @@
+import datetime
+from bisect import bisect_left, insort
+from zoneinfo import ZoneInfo
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.utils import timezone
+from .caching import cache_version
+from .jalali import format_jalali, to_gregorian
+from .models import Course, Class, Enrollment, CourseAssignment, Term
+
+# روزهای هفته به ترتیب هفته شمسی
+WEEK_DAYS = ['شنبه', 'یک‌شنبه', 'دوشنبه', 'سه‌شنبه', 'چهارشنبه', 'پنج‌شنبه', 'جمعه']
+
+# برنامه هفتگی تا تغییر ثبت‌نام‌های صاحب آن یا تغییر کلاس‌ها در کش می‌ماند؛ این زمان فقط سقف اطمینان است
+TIMETABLE_CACHE_TIMEOUT = 60 * 60 * 24
+# شروع کلاس‌های هر نیم‌سال (ماه و روز شمسی در سال ترم) و تعداد هفته‌ها در خروجی iCalendar
+TERM_START = {Term.Season.FALL: (7, 1), Term.Season.SPRING: (11, 15)}
+TERM_WEEKS = 16
+
+
+class IntervalIndex:
+    """
+    ایندکس بازه‌های زمانی به تفکیک روز هفته
+    بازه‌های هر روز بر اساس زمان شروع مرتب نگهداری می‌شوند و تداخل با جستجوی دودویی پیدا می‌شود.
+    """
+    def __init__(self, intervals=()):
+        self._days = {}
+        for day, start, end, key in intervals:
+            self.add(day, start, end, key)
+
+    def add(self, day, start, end, key):
+        insort(self._days.setdefault(day, []), (start, end, key), key=lambda item: item[0])
+
+    def overlapping(self, day, start, end):
+        """کلید بازه‌هایی از روز day که با [start, end) تداخل دارند"""
+        items = self._days.get(day, [])
+        # فقط بازه‌هایی که پیش از پایان بازه جدید شروع شده‌اند می‌توانند تداخل داشته باشند
+        stop = bisect_left(items, end, key=lambda item: item[0])
+        return [key for item_start, item_end, key in items[:stop] if item_end > start]
+
+
+def student_interval_index(student_id, term_id, exclude_enrollment=None):
+    """ایندکس بازه‌های کلاس‌های یک دانشجو در یک ترم، با یک کوئری"""
+    enrollments = Enrollment.objects.filter(student_id=student_id, class_instance__course__term_id=term_id)
+    if exclude_enrollment is not None:
+        enrollments = enrollments.exclude(pk=exclude_enrollment)
+    return IntervalIndex(enrollments.values_list(
+        'class_instance__day_of_week', 'class_instance__start_time',
+        'class_instance__end_time', 'class_instance_id',
+    ))
+
+
+def student_clashes(student_id, class_instance, exclude_enrollment=None):
+    """شناسه کلاس‌هایی از همان ترم که دانشجو در آن‌ها ثبت‌نام کرده و با class_instance تداخل زمانی دارند"""
+    term_id = Course.objects.filter(pk=class_instance.course_id).values('term_id')[:1]
+    index = student_interval_index(student_id, term_id, exclude_enrollment)
+    return [
+        class_id
+        for class_id in index.overlapping(class_instance.day_of_week, class_instance.start_time, class_instance.end_time)
+        if class_id != class_instance.pk
+    ]
+
+
+def sweep_overlaps(rows):
+    """
+    پیدا کردن همه جفت‌های متداخل با یک پیمایش (sort-and-sweep)
+    rows باید بر اساس (گروه، شروع) مرتب باشد و هر ردیف به شکل (گروه، شروع، پایان، کلید) باشد.
+    خروجی: (گروه، کلید اول، کلید دوم) برای هر جفت بازه متداخل در یک گروه
+    """
+    current_group = object()
+    active = []
+    for group, start, end, key in rows:
+        if group != current_group:
+            current_group = group
+            active = []
+        active = [item for item in active if item[0] > start]
+        for _, other in active:
+            yield group, other, key
+        active.append((end, key))
+
+
+def term_clash_report(term_id):
+    """
+    گزارش همه تداخل‌های زمانی دانشجویان در یک ترم
+    ثبت‌نام‌ها مرتب بر اساس دانشجو، روز و زمان شروع خوانده و با یک پیمایش بررسی می‌شوند.
+    """
+    rows = (
+        Enrollment.objects
+        .filter(class_instance__course__term_id=term_id)
+        .order_by('student_id', 'class_instance__day_of_week', 'class_instance__start_time')
+        .values_list(
+            'student_id', 'class_instance__day_of_week', 'class_instance__start_time',
+            'class_instance__end_time', 'class_instance_id',
+        )
+        .iterator(chunk_size=5000)
+    )
+    grouped = (((student_id, day), start, end, class_id) for student_id, day, start, end, class_id in rows)
+    return [
+        {'student': student_id, 'day_of_week': day, 'classes': [first, second]}
+        for (student_id, day), first, second in sweep_overlaps(grouped)
+    ]
+
+
+# کلاس‌های صاحب هر نوع برنامه هفتگی
+TIMETABLE_OWNERS = {
+    'student': lambda pk: Q(pk__in=Enrollment.objects.filter(student_id=pk).values('class_instance_id')),
+    'professor': lambda pk: Q(pk__in=CourseAssignment.objects.filter(professor_id=pk).values('class_instance_id')),
+    'room': lambda pk: Q(room_id=pk),
+}
+
+
+def timetable_cache_key(kind, pk):
+    """
+    کلید کش برنامه هفتگی؛ ثبت‌نام‌ها فقط نسخه برنامه همان دانشجو را تغییر می‌دهند و تغییر کلاس‌ها،
+    تخصیص استادها، ترم‌ها و اساتید (نسخه timetable) یا دروس و اتاق‌ها (نسخه schedule) همه برنامه‌ها را
+    """
+    return (
+        f"timetable:{kind}:{int(pk)}:{cache_version('timetable', f'{kind}:{int(pk)}')}"
+        f":{cache_version('timetable')}:{cache_version('schedule')}"
+    )
+
+
+def build_timetable(kind, pk):
+    """
+    برنامه هفتگی ترم جاری با یک کوئری join روی کلاس، درس، ترم، اتاق و اساتید
+    کلاس‌ها به ترتیب روزهای هفته و زمان شروع مرتب می‌شوند.
+    """
+    day_order = Case(
+        *[When(day_of_week=day, then=Value(index)) for index, day in enumerate(WEEK_DAYS)],
+        default=Value(len(WEEK_DAYS)),
+        output_field=IntegerField(),
+    )
+    rows = (
+        Class.objects
+        .filter(TIMETABLE_OWNERS[kind](pk), course__term__is_current=True)
+        .annotate(day_order=day_order)
+        .order_by('day_order', 'start_time', 'id')
+        .values_list(
+            'id', 'day_of_week', 'start_time', 'end_time',
+            'course_id', 'course__code', 'course__name', 'course__credits',
+            'course__term_id', 'course__term__year', 'course__term__season',
+            'room_id', 'room__name', 'room__building',
+            'course_assignments__professor__first_name', 'course_assignments__professor__last_name',
+        )
+    )
+
+    term = None
+    days = []
+    previous = None
+    for (class_id, day, start, end, course_id, code, name, credits, term_id, year, season,
+         room_id, room_name, building, first_name, last_name) in rows:
+        if term is None:
+            term = {'id': term_id, 'year': year, 'season': season, 'title': f'{Term.Season(season).label} {year}'}
+        # هر استاد کلاس یک ردیف جداگانه دارد
+        if class_id != previous:
+            previous = class_id
+            if not days or days[-1]['day'] != day:
+                days.append({'day': day, 'classes': []})
+            days[-1]['classes'].append({
+                'class': class_id, 'course': course_id, 'code': code, 'name': name, 'credits': credits,
+                'room': room_id, 'room_name': room_name, 'building': building,
+                'start_time': start.strftime('%H:%M'), 'end_time': end.strftime('%H:%M'),
+                'professors': [],
+            })
+        if first_name is not None:
+            days[-1]['classes'][-1]['professors'].append(f'{first_name} {last_name}')
+
+    return {'kind': kind, 'id': pk, 'term': term, 'days': days}
+
+
+def get_timetable(kind, pk, get_owner):
+    """
+    برنامه هفتگی کش‌شده؛ در صورت نبود در کش، وجود صاحب برنامه با get_owner بررسی و برنامه ساخته می‌شود
+    """
+    key = timetable_cache_key(kind, pk)
+    data = cache.get(key)
+    if data is None:
+        get_owner()
+        data = build_timetable(kind, pk)
+        cache.set(key, data, TIMETABLE_CACHE_TIMEOUT)
+    return data
+
+
+def _ics_text(value):
+    return str(value).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n')
+
+
+def _ics_fold(line):
+    """شکستن سطرهای طولانی‌تر از 75 بایت بدون جدا کردن بایت‌های یک نویسه UTF-8"""
+    parts = []
+    current, size = '', 0
+    for char in line:
+        width = len(char.encode('utf-8'))
+        if size + width > 75:
+            parts.append(current)
+            current, size = ' ', 1
+        current += char
+        size += width
+    parts.append(current)
+    return '\r\n'.join(parts)
+
+
+def timetable_ics(timetable):
+    """
+    خروجی iCalendar برنامه هفتگی (از روی همان داده کش‌شده) با یک رویداد تکرارشونده برای هر کلاس
+    تاریخ شروع کلاس‌ها از TERM_START و تعداد جلسات از TERM_WEEKS گرفته می‌شود.
+    """
+    lines = ['BEGIN:VCALENDAR', 'VERSION:2.0', 'PRODID:-//EducationApp//Timetable//FA', 'CALSCALE:GREGORIAN']
+    term = timetable['term']
+    if term is not None:
+        month, day = TERM_START[term['season']]
+        term_start = to_gregorian(format_jalali(int(term['year']), month, day))
+        zone = ZoneInfo(settings.TIME_ZONE)
+        offset = datetime.datetime.combine(term_start, datetime.time(12), zone).strftime('%z')
+        stamp = timezone.now().astimezone(datetime.timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+        lines += [
+            'BEGIN:VTIMEZONE', f'TZID:{settings.TIME_ZONE}', 'BEGIN:STANDARD', 'DTSTART:19700101T000000',
+            f'TZOFFSETFROM:{offset}', f'TZOFFSETTO:{offset}', 'END:STANDARD', 'END:VTIMEZONE',
+        ]
+        for week_day in timetable['days']:
+            if week_day['day'] not in WEEK_DAYS:
+                continue
+            # شنبه در تقویم پایتون روز 5 است
+            weekday = (5 + WEEK_DAYS.index(week_day['day'])) % 7
+            first = term_start + datetime.timedelta(days=(weekday - term_start.weekday()) % 7)
+            for item in week_day['classes']:
+                summary = f"{item['name']} ({item['code']})"
+                lines += [
+                    'BEGIN:VEVENT',
+                    f"UID:class-{item['class']}-{timetable['kind']}-{timetable['id']}@educationapp",
+                    f'DTSTAMP:{stamp}',
+                    f"DTSTART;TZID={settings.TIME_ZONE}:{first:%Y%m%d}T{item['start_time'].replace(':', '')}00",
+                    f"DTEND;TZID={settings.TIME_ZONE}:{first:%Y%m%d}T{item['end_time'].replace(':', '')}00",
+                    f'RRULE:FREQ=WEEKLY;COUNT={TERM_WEEKS}',
+                    f'SUMMARY:{_ics_text(summary)}',
+                    f"LOCATION:{_ics_text(item['room_name'] + ' - ' + item['building'])}",
+                ]
+                if item['professors']:
+                    lines.append(f"DESCRIPTION:{_ics_text('، '.join(item['professors']))}")
+                lines.append('END:VEVENT')
+    lines.append('END:VCALENDAR')
+    return ''.join(_ics_fold(line) + '\r\n' for line in lines)
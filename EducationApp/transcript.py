@@ -0,0 +1,122 @@
+from itertools import groupby
+from django.core.cache import cache
+from .archive import archived_transcript_rows
+from .caching import cache_version
+from .models import Term, Enrollment, PASSING_GRADE
+
+# کارنامه تا زمان تغییر دانشجو، ثبت‌نام‌هایش یا دروس در کش می‌ماند؛ این زمان فقط سقف اطمینان است
+TRANSCRIPT_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def transcript_cache_key(student_id):
+    """کلید کش کارنامه یک دانشجو، وابسته به نسخه دروس و اتاق‌ها (نام و تعداد واحد دروس در کارنامه هست)"""
+    return f"transcript:{int(student_id)}:{cache_version('schedule')}"
+
+
+def invalidate_transcript(student_id):
+    """حذف کارنامه کش‌شده دانشجو"""
+    cache.delete(transcript_cache_key(student_id))
+
+
+def _average(total_grade, total_credits):
+    if not total_credits:
+        return 0
+    return round(total_grade / total_credits, 2)
+
+
+def build_transcript(student):
+    """
+    ساخت کارنامه دانشجو به تفکیک ترم با یک کوئری join روی ثبت‌نام، کلاس، درس و ترم
+    و یک کوئری روی ثبت‌نام‌های بایگانی‌شده (archive.py)
+    """
+    live = list(
+        Enrollment.objects
+        .filter(student=student)
+        .order_by()
+        .values(
+            'id', 'grade', 'status', 'class_instance_id',
+            'class_instance__course_id', 'class_instance__course__code',
+            'class_instance__course__name', 'class_instance__course__credits',
+            'class_instance__course__term_id', 'class_instance__course__term__year',
+            'class_instance__course__term__season',
+        )
+    )
+    # ثبت‌نامی که هنوز در پایگاه داده اصلی هست (بایگانی نیمه‌کاره) دو بار شمرده نمی‌شود
+    live_ids = {row['id'] for row in live}
+    rows = sorted(
+        live + [row for row in archived_transcript_rows(student.pk) if row['id'] not in live_ids],
+        key=lambda row: (
+            row['class_instance__course__term__year'],
+            row['class_instance__course__term__season'],
+            row['class_instance__course__code'],
+            row['id'],
+        ),
+    )
+
+    terms = []
+    total_credits = total_passed = 0
+    cumulative_credits = cumulative_grade = 0
+    for term_id, term_rows in groupby(rows, key=lambda row: row['class_instance__course__term_id']):
+        term_rows = list(term_rows)
+        year = term_rows[0]['class_instance__course__term__year']
+        season = term_rows[0]['class_instance__course__term__season']
+
+        courses = []
+        term_credits = term_passed = graded_credits = graded_total = 0
+        for row in term_rows:
+            credits = row['class_instance__course__credits']
+            grade = row['grade']
+            courses.append({
+                'enrollment': row['id'],
+                'class_instance': row['class_instance_id'],
+                'course': row['class_instance__course_id'],
+                'code': row['class_instance__course__code'],
+                'name': row['class_instance__course__name'],
+                'credits': credits,
+                'grade': grade,
+                'status': row['status'],
+            })
+            term_credits += credits
+            if grade is not None:
+                graded_credits += credits
+                graded_total += grade * credits
+                if grade >= PASSING_GRADE:
+                    term_passed += credits
+
+        total_credits += term_credits
+        total_passed += term_passed
+        cumulative_credits += graded_credits
+        cumulative_grade += graded_total
+        terms.append({
+            'term': term_id,
+            'title': f'{Term.Season(season).label} {year}',
+            'year': year,
+            'season': season,
+            'courses': courses,
+            'credits': term_credits,
+            'credits_passed': term_passed,
+            'term_gpa': _average(graded_total, graded_credits),
+            'cumulative_gpa': _average(cumulative_grade, cumulative_credits),
+        })
+
+    return {
+        'student': student.pk,
+        'student_id': student.student_id,
+        'full_name': student.full_name,
+        'terms': terms,
+        'total_credits': total_credits,
+        'total_credits_passed': total_passed,
+        'gpa': _average(cumulative_grade, cumulative_credits),
+    }
+
+
+def get_transcript(student_id, get_student):
+    """
+    کارنامه کش‌شده دانشجو؛ در صورت نبود در کش، دانشجو با get_student بارگذاری و کارنامه ساخته می‌شود
+    """
+    key = transcript_cache_key(student_id)
+    data = cache.get(key)
+    if data is None:
+        data = build_transcript(get_student())
+        cache.set(key, data, TRANSCRIPT_CACHE_TIMEOUT)
+    return data
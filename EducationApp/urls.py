@@ -3,8 +3,8 @@ from rest_framework.routers import DefaultRouter
 from .views import (
     FacultyViewSet, MajorViewSet, StudentViewSet, ProfessorViewSet,
     CourseViewSet, TermViewSet, RoomViewSet, ClassViewSet,
-    EnrollmentViewSet, CourseAssignmentViewSet, ContactInfoViewSet,
-    api_docs,welcome
+    EnrollmentViewSet, CourseAssignmentViewSet, CoursePrerequisiteViewSet, ContactInfoViewSet, ChangeEventViewSet, JobViewSet, BatchView, StatsView, RankingView,
+    seat_stream, api_docs,welcome
 )
 
 router = DefaultRouter()
@@ -18,13 +18,20 @@ router.register(r'rooms', RoomViewSet)
 router.register(r'classes', ClassViewSet)
 router.register(r'enrollments', EnrollmentViewSet)
 router.register(r'course-assignments', CourseAssignmentViewSet)
+router.register(r'course-prerequisites', CoursePrerequisiteViewSet)
 router.register(r'contact-infos', ContactInfoViewSet)
+router.register(r'changes', ChangeEventViewSet)
+router.register(r'jobs', JobViewSet)
 
 
 app_name = 'EducationApp'
 
 urlpatterns = [
     path('', welcome, name='welcome'),
+    path('api/batch/', BatchView.as_view(), name='batch'),
+    path('api/stats/', StatsView.as_view(), name='stats'),
+    path('api/rankings/', RankingView.as_view(), name='rankings'),
+    path('api/seats/stream/', seat_stream, name='seat_stream'),
     path('api/', include(router.urls)),
     path('api/docs/', api_docs, name='api_docs'),
 ]
\ No newline at end of file
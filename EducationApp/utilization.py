@@ -0,0 +1,100 @@
+import numpy as np
+from django.core.cache import cache
+from django.db.models import Count
+from .caching import cache_version
+from .models import Room, Class
+from .timetable import WEEK_DAYS
+
+# بازه ساعات نقشه حرارتی: از 7 تا 21 (هر ستون یک ساعت)
+FIRST_HOUR = 7
+LAST_HOUR = 21
+UTILIZATION_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def utilization_cache_key(term_id):
+    """کلید کش وابسته به نسخه ترم و نسخه اتاق‌ها و دروس"""
+    return f"utilization:{term_id}:{cache_version('term', term_id)}:{cache_version('schedule')}"
+
+
+def _minutes(value):
+    return value.hour * 60 + value.minute
+
+
+def compute_utilization(term_id):
+    """
+    محاسبه اشغال اتاق‌ها و درصد پر شدن صندلی‌ها به تفکیک ساختمان، اتاق، روز و ساعت
+    کلاس‌های ترم با یک کوئری گروه‌بندی‌شده خوانده و با NumPy در ماتریس‌ها تجمیع می‌شوند.
+    occupancy: کسری از ساعت که اتاق اشغال است؛ seat_fill: نسبت دانشجویان حاضر به ظرفیت
+    """
+    rooms = list(Room.objects.order_by('building', 'name').values('id', 'name', 'building', 'capacity'))
+    classes = list(
+        Class.objects
+        .filter(course__term_id=term_id)
+        .order_by()
+        .values('id', 'room_id', 'day_of_week', 'start_time', 'end_time')
+        .annotate(enrolled=Count('enrollments'))
+    )
+
+    hours = np.arange(FIRST_HOUR, LAST_HOUR)
+    buildings = sorted({room['building'] for room in rooms})
+    room_index = {room['id']: index for index, room in enumerate(rooms)}
+    day_index = {day: index for index, day in enumerate(WEEK_DAYS)}
+    classes = [row for row in classes if row['day_of_week'] in day_index and row['room_id'] in room_index]
+
+    shape = (len(rooms), len(WEEK_DAYS), len(hours))
+    occupancy = np.zeros(shape)
+    seats = np.zeros(shape)
+    capacity = np.array([room['capacity'] for room in rooms], dtype=float)
+
+    if classes:
+        room_ids = np.array([room_index[row['room_id']] for row in classes])
+        day_ids = np.array([day_index[row['day_of_week']] for row in classes])
+        starts = np.array([_minutes(row['start_time']) for row in classes])
+        ends = np.array([_minutes(row['end_time']) for row in classes])
+        enrolled = np.array([row['enrolled'] for row in classes], dtype=float)
+
+        # کسری از هر ساعت که هر کلاس آن را پوشش می‌دهد (کلاس × ساعت)
+        bin_starts = hours * 60
+        covered = np.minimum(ends[:, None], bin_starts + 60) - np.maximum(starts[:, None], bin_starts)
+        covered = np.clip(covered, 0, 60) / 60
+        np.add.at(occupancy, (room_ids, day_ids), covered)
+        np.add.at(seats, (room_ids, day_ids), covered * enrolled[:, None])
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        room_fill = np.nan_to_num(seats / capacity[:, None, None])
+
+    building_ids = np.array([buildings.index(room['building']) for room in rooms], dtype=int)
+    building_shape = (len(buildings), len(WEEK_DAYS), len(hours))
+    building_occupancy = np.zeros(building_shape)
+    building_seats = np.zeros(building_shape)
+    building_capacity = np.zeros(len(buildings))
+    if rooms:
+        np.add.at(building_occupancy, building_ids, occupancy)
+        np.add.at(building_seats, building_ids, seats)
+        np.add.at(building_capacity, building_ids, capacity)
+        room_counts = np.bincount(building_ids, minlength=len(buildings))
+        building_occupancy /= room_counts[:, None, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        building_fill = np.nan_to_num(building_seats / building_capacity[:, None, None])
+
+    return {
+        'term': term_id,
+        'days': WEEK_DAYS,
+        'hours': hours.tolist(),
+        'rooms': rooms,
+        'room_occupancy': np.round(occupancy, 3).tolist(),
+        'room_seat_fill': np.round(room_fill, 3).tolist(),
+        'buildings': buildings,
+        'building_occupancy': np.round(building_occupancy, 3).tolist(),
+        'building_seat_fill': np.round(building_fill, 3).tolist(),
+    }
+
+
+def get_utilization(term_id):
+    """نقشه حرارتی کش‌شده یک ترم؛ با تغییر کلاس‌ها یا ثبت‌نام‌های ترم نسخه عوض می‌شود"""
+    key = utilization_cache_key(term_id)
+    data = cache.get(key)
+    if data is None:
+        data = compute_utilization(term_id)
+        cache.set(key, data, UTILIZATION_CACHE_TIMEOUT)
+    return data
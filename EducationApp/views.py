@@ -1,13 +1,36 @@
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
 from django.shortcuts import render
-from rest_framework import viewsets
-from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from django.http import Http404, HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
+from rest_framework import viewsets, mixins, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticatedOrReadOnly, AllowAny
+from rest_framework.views import APIView
 from rest_framework.pagination import PageNumberPagination
-from .models import Faculty, Major, Student, Professor, Course, Term, Room, Class, Enrollment, CourseAssignment, ContactInfo
+from .models import (
+    Faculty, Major, Student, Professor, Course, Term, Room, Class, Enrollment, CourseAssignment, ContactInfo, ChangeEvent, Job,
+    CoursePrerequisite,
+)
 from .serializers import (
     FacultySerializer, MajorSerializer, StudentSerializer, ProfessorSerializer,
     CourseSerializer, TermSerializer, RoomSerializer, ClassSerializer,
-    EnrollmentSerializer, CourseAssignmentSerializer, ContactInfoSerializer
+    EnrollmentSerializer, CourseAssignmentSerializer, ContactInfoSerializer,
+    ChangeEventSerializer, GradeSheetSerializer, BatchSerializer, JobSerializer, CoursePrerequisiteSerializer
 )
+from .transcript import get_transcript
+from .grading import grade_sheet
+from .timetable import term_clash_report
+from .utilization import get_utilization
+from .batch import run_batch
+from .stats import get_stats
+from .prerequisites import all_prerequisites
+from .eligibility import eligible_classes
+from .contacts import find_owners
+from .rankings import student_rank, top_students
+from .seats import seat_events, term_class_ids
+from .mixins import ModifiedSinceMixin, PersonFilterMixin, ExpandMixin, TimetableMixin
 from django.shortcuts import render
 
 class StandardPagination(PageNumberPagination):
@@ -15,7 +38,7 @@ class StandardPagination(PageNumberPagination):
     page_size_query_param = 'page_size'
     max_page_size = 100
 
-class FacultyViewSet(viewsets.ModelViewSet):
+class FacultyViewSet(ModifiedSinceMixin, ExpandMixin, viewsets.ModelViewSet):
     """
     API برای مدیریت دانشکده‌ها
     - GET /api/faculties/: لیست تمام دانشکده‌ها یا اطلاعات یک دانشکده با ID
@@ -32,8 +55,9 @@ class FacultyViewSet(viewsets.ModelViewSet):
     serializer_class = FacultySerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     pagination_class = StandardPagination
+    expandable_many = ('majors',)
 
-class MajorViewSet(viewsets.ModelViewSet):
+class MajorViewSet(ModifiedSinceMixin, ExpandMixin, viewsets.ModelViewSet):
     """
     API برای مدیریت رشته‌ها
     - GET /api/majors/: لیست تمام رشته‌ها یا اطلاعات یک رشته با ID
@@ -51,7 +75,7 @@ class MajorViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticatedOrReadOnly]
     pagination_class = StandardPagination
 
-class StudentViewSet(viewsets.ModelViewSet):
+class StudentViewSet(TimetableMixin, PersonFilterMixin, ModifiedSinceMixin, ExpandMixin, viewsets.ModelViewSet):
     """
     API برای مدیریت دانشجویان
     - GET /api/students/: لیست تمام دانشجویان یا اطلاعات یک دانشجو با ID
@@ -59,6 +83,11 @@ class StudentViewSet(viewsets.ModelViewSet):
     - PUT /api/students/<id>/: به‌روزرسانی کامل دانشجو
     - PATCH /api/students/<id>/: به‌روزرسانی جزئی دانشجو
     - DELETE /api/students/<id>/: حذف دانشجو
+    - GET /api/students/?entry_year=1400: دانشجویان یک سال ورود
+    - GET /api/students/<id>/transcript/: کارنامه دانشجو به تفکیک ترم
+    - GET /api/students/<id>/eligible-classes/?term=<id>: کلاس‌های قابل ثبت‌نام دانشجو (پیش‌فرض ترم جاری)
+    - GET /api/students/<id>/ranking/: رتبه معدل دانشجو در رشته و سال ورود خود
+    - GET /api/students/<id>/timetable/: برنامه هفتگی ترم جاری (?format=ics برای فایل iCalendar)
     پاسخ‌ها:
     - 200: موفقیت
     - 400: خطای ورودی
@@ -68,8 +97,54 @@ class StudentViewSet(viewsets.ModelViewSet):
     serializer_class = StudentSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     pagination_class = StandardPagination
+    expandable_many = ('enrollments',)
+    timetable_kind = 'student'
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        entry_year = self.request.query_params.get('entry_year')
+        if self.action == 'list' and entry_year:
+            queryset = queryset.filter(entry_year=entry_year)
+        return queryset
+
+    @action(detail=True, methods=['get'])
+    def transcript(self, request, pk=None):
+        """
+        کارنامه دانشجو: دروس هر ترم با واحد، نمره و وضعیت، همراه با معدل ترم و معدل کل
+        نتیجه تا تغییر یکی از ثبت‌نام‌های دانشجو کش می‌شود.
+        """
+        try:
+            student_id = int(pk)
+        except (TypeError, ValueError):
+            raise Http404
+        return Response(get_transcript(student_id, self.get_object))
+
+    @action(detail=True, methods=['get'], url_path='eligible-classes')
+    def eligible_classes(self, request, pk=None):
+        """
+        کلاس‌های ترم که دانشجو می‌تواند در آن‌ها ثبت‌نام کند (رشته، دروس پاس‌شده، پیش‌نیازها، تداخل زمانی و ظرفیت)
+        """
+        student = self.get_object()
+        term_id = request.query_params.get('term')
+        if term_id:
+            if not term_id.isdigit() or not Term.objects.filter(pk=term_id).exists():
+                raise ValidationError({'term': 'ترم یافت نشد.'})
+            term_id = int(term_id)
+        else:
+            term_id = Term.objects.filter(is_current=True).values_list('pk', flat=True).first()
+            if term_id is None:
+                raise ValidationError({'term': 'ترم جاری تعریف نشده است؛ شناسه ترم را مشخص کنید.'})
+        return Response(eligible_classes(student, term_id))
 
-class ProfessorViewSet(viewsets.ModelViewSet):
+    @action(detail=True, methods=['get'])
+    def ranking(self, request, pk=None):
+        """
+        رتبه معدل دانشجو در میان دانشجویان هم‌رشته و هم‌ورودی (size: تعداد رتبه‌بندی‌شدگان گروه)
+        stale یعنی رتبه‌بندی گروه پس از آخرین محاسبه تغییر کرده و کار rankings هنوز آن را به‌روز نکرده است.
+        """
+        return Response(student_rank(self.get_object()))
+
+class ProfessorViewSet(TimetableMixin, PersonFilterMixin, ModifiedSinceMixin, ExpandMixin, viewsets.ModelViewSet):
     """
     API برای مدیریت اساتید
     - GET /api/professors/: لیست تمام اساتید یا اطلاعات یک استاد با ID
@@ -77,6 +152,7 @@ class ProfessorViewSet(viewsets.ModelViewSet):
     - PUT /api/professors/<id>/: به‌روزرسانی کامل استاد
     - PATCH /api/professors/<id>/: به‌روزرسانی جزئی استاد
     - DELETE /api/professors/<id>/: حذف استاد
+    - GET /api/professors/<id>/timetable/: برنامه هفتگی ترم جاری (?format=ics برای فایل iCalendar)
     پاسخ‌ها:
     - 200: موفقیت
     - 400: خطای ورودی
@@ -86,8 +162,10 @@ class ProfessorViewSet(viewsets.ModelViewSet):
     serializer_class = ProfessorSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     pagination_class = StandardPagination
+    expandable_many = ('course_assignments',)
+    timetable_kind = 'professor'
 
-class CourseViewSet(viewsets.ModelViewSet):
+class CourseViewSet(ModifiedSinceMixin, ExpandMixin, viewsets.ModelViewSet):
     """
     API برای مدیریت دروس
     - GET /api/courses/: لیست تمام دروس یا اطلاعات یک درس با ID
@@ -104,8 +182,21 @@ class CourseViewSet(viewsets.ModelViewSet):
     serializer_class = CourseSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     pagination_class = StandardPagination
+    expandable_many = ('classes', 'prerequisite_links')
+
+    @action(detail=True, methods=['get'])
+    def prerequisites(self, request, pk=None):
+        """
+        پیش‌نیازهای درس: پیش‌نیازهای مستقیم و همه پیش‌نیازهای مستقیم و غیرمستقیم (از جدول بستار)
+        """
+        course = self.get_object()
+        return Response({
+            'course': course.pk,
+            'direct': sorted(course.prerequisite_links.values_list('prerequisite_id', flat=True)),
+            'all': all_prerequisites(course.pk),
+        })
 
-class TermViewSet(viewsets.ModelViewSet):
+class TermViewSet(ModifiedSinceMixin, ExpandMixin, viewsets.ModelViewSet):
     """
     API برای مدیریت ترم‌ها
     - GET /api/terms/: لیست تمام ترم‌ها یا اطلاعات یک ترم با ID
@@ -113,6 +204,8 @@ class TermViewSet(viewsets.ModelViewSet):
     - PUT /api/terms/<id>/: به‌روزرسانی کامل ترم
     - PATCH /api/terms/<id>/: به‌روزرسانی جزئی ترم
     - DELETE /api/terms/<id>/: حذف ترم
+    - GET /api/terms/<id>/clashes/: گزارش تداخل‌های زمانی برنامه دانشجویان در ترم (صفحه‌بندی‌شده)
+    - GET /api/terms/<id>/utilization/: نقشه حرارتی اشغال اتاق‌ها و ظرفیت در ترم
     پاسخ‌ها:
     - 200: موفقیت
     - 400: خطای ورودی
@@ -123,7 +216,27 @@ class TermViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticatedOrReadOnly]
     pagination_class = StandardPagination
 
-class RoomViewSet(viewsets.ModelViewSet):
+    @action(detail=True, methods=['get'])
+    def clashes(self, request, pk=None):
+        """
+        تداخل‌های زمانی دانشجویان در ترم (هر مورد: دانشجو، روز و دو کلاس متداخل)
+        با صفحه‌بندی استاندارد (?page و ?page_size)؛ گزارش کامل با کار پس‌زمینه timetable_clashes
+        """
+        term = self.get_object()
+        response = self.get_paginated_response(self.paginate_queryset(term_clash_report(term.pk)))
+        response.data['term'] = term.pk
+        return response
+
+    @action(detail=True, methods=['get'])
+    def utilization(self, request, pk=None):
+        """
+        اشغال اتاق‌ها و نسبت پر شدن صندلی‌ها به تفکیک ساختمان، اتاق، روز و ساعت
+        ماتریس‌ها به ترتیب [اتاق یا ساختمان][روز][ساعت] هستند.
+        """
+        term = self.get_object()
+        return Response(get_utilization(term.pk))
+
+class RoomViewSet(TimetableMixin, ModifiedSinceMixin, ExpandMixin, viewsets.ModelViewSet):
     """
     API برای مدیریت اتاق‌ها
     - GET /api/rooms/: لیست تمام اتاق‌ها یا اطلاعات یک اتاق با ID
@@ -131,6 +244,7 @@ class RoomViewSet(viewsets.ModelViewSet):
     - PUT /api/rooms/<id>/: به‌روزرسانی کامل اتاق
     - PATCH /api/rooms/<id>/: به‌روزرسانی جزئی اتاق
     - DELETE /api/rooms/<id>/: حذف اتاق
+    - GET /api/rooms/<id>/timetable/: برنامه هفتگی ترم جاری (?format=ics برای فایل iCalendar)
     پاسخ‌ها:
     - 200: موفقیت
     - 400: خطای ورودی
@@ -140,8 +254,9 @@ class RoomViewSet(viewsets.ModelViewSet):
     serializer_class = RoomSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     pagination_class = StandardPagination
+    timetable_kind = 'room'
 
-class ClassViewSet(viewsets.ModelViewSet):
+class ClassViewSet(ModifiedSinceMixin, ExpandMixin, viewsets.ModelViewSet):
     """
     API برای مدیریت کلاس‌ها
     - GET /api/classes/: لیست تمام کلاس‌ها یا اطلاعات یک کلاس با ID
@@ -149,6 +264,8 @@ class ClassViewSet(viewsets.ModelViewSet):
     - PUT /api/classes/<id>/: به‌روزرسانی کامل کلاس
     - PATCH /api/classes/<id>/: به‌روزرسانی جزئی کلاس
     - DELETE /api/classes/<id>/: حذف کلاس
+    - GET /api/classes/<id>/grade-sheet/: برگه نمرات کلاس
+    - POST /api/classes/<id>/grade-sheet/: ثبت دسته‌ای نمرات کلاس
     پاسخ‌ها:
     - 200: موفقیت
     - 400: خطای ورودی
@@ -158,8 +275,25 @@ class ClassViewSet(viewsets.ModelViewSet):
     serializer_class = ClassSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     pagination_class = StandardPagination
+    expandable_many = ('enrollments', 'course_assignments')
+    throttle_scope = 'registration'
 
-class EnrollmentViewSet(viewsets.ModelViewSet):
+    @action(detail=True, methods=['get', 'post'], url_path='grade-sheet')
+    def grade_sheet(self, request, pk=None):
+        """
+        برگه نمرات کلاس
+        بدنه POST: {"grades": [{"student": <شناسه دانشجو>, "grade": <0 تا 20 یا null>}, ...]}
+        همه نمرات با هم اعتبارسنجی و در یک تراکنش ثبت می‌شوند و وضعیت قبولی از روی نمره تعیین می‌شود.
+        """
+        class_instance = self.get_object()
+        if request.method == 'POST':
+            serializer = GradeSheetSerializer(data=request.data, context={'class_instance': class_instance})
+            serializer.is_valid(raise_exception=True)
+            changed = serializer.save()
+            return Response({'updated': len(changed), 'grades': grade_sheet(class_instance)})
+        return Response({'grades': grade_sheet(class_instance)})
+
+class EnrollmentViewSet(ModifiedSinceMixin, ExpandMixin, viewsets.ModelViewSet):
     """
     API برای مدیریت ثبت‌نام‌ها
     - GET /api/enrollments/: لیست تمام ثبت‌نام‌ها یا اطلاعات یک ثبت‌نام با ID
@@ -176,8 +310,9 @@ class EnrollmentViewSet(viewsets.ModelViewSet):
     serializer_class = EnrollmentSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     pagination_class = StandardPagination
+    throttle_scope = 'registration'
 
-class CourseAssignmentViewSet(viewsets.ModelViewSet):
+class CourseAssignmentViewSet(ModifiedSinceMixin, ExpandMixin, viewsets.ModelViewSet):
     """
     API برای مدیریت تخصیص دروس
     - GET /api/course-assignments/: لیست تمام تخصیص‌ها یا اطلاعات یک تخصیص با ID
@@ -195,7 +330,25 @@ class CourseAssignmentViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticatedOrReadOnly]
     pagination_class = StandardPagination
 
-class ContactInfoViewSet(viewsets.ModelViewSet):
+class CoursePrerequisiteViewSet(ModifiedSinceMixin, ExpandMixin, viewsets.ModelViewSet):
+    """
+    API برای مدیریت پیش‌نیازهای دروس
+    - GET /api/course-prerequisites/: لیست تمام پیش‌نیازها یا اطلاعات یک پیش‌نیاز با ID
+    - POST /api/course-prerequisites/: ایجاد پیش‌نیاز جدید
+    - PUT /api/course-prerequisites/<id>/: به‌روزرسانی کامل پیش‌نیاز
+    - PATCH /api/course-prerequisites/<id>/: به‌روزرسانی جزئی پیش‌نیاز
+    - DELETE /api/course-prerequisites/<id>/: حذف پیش‌نیاز
+    پاسخ‌ها:
+    - 200: موفقیت
+    - 400: خطای ورودی (از جمله ایجاد حلقه در پیش‌نیازها)
+    - 404: پیش‌نیاز یافت نشد
+    """
+    queryset = CoursePrerequisite.objects.all()
+    serializer_class = CoursePrerequisiteSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = StandardPagination
+
+class ContactInfoViewSet(ModifiedSinceMixin, ExpandMixin, viewsets.ModelViewSet):
     """
     API برای مدیریت اطلاعات تماس
     - GET /api/contact-infos/: لیست تمام اطلاعات تماس یا اطلاعات یک تماس با ID
@@ -203,6 +356,7 @@ class ContactInfoViewSet(viewsets.ModelViewSet):
     - PUT /api/contact-infos/<id>/: به‌روزرسانی کامل اطلاعات تماس
     - PATCH /api/contact-infos/<id>/: به‌روزرسانی جزئی اطلاعات تماس
     - DELETE /api/contact-infos/<id>/: حذف اطلاعات تماس
+    - GET /api/contact-infos/lookup/?value=<شماره یا ایمیل>&value=...: صاحبان هر شماره یا ایمیل
     پاسخ‌ها:
     - 200: موفقیت
     - 400: خطای ورودی
@@ -212,15 +366,219 @@ class ContactInfoViewSet(viewsets.ModelViewSet):
     serializer_class = ContactInfoSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     pagination_class = StandardPagination
+    max_lookup_values = 100
+
+    @action(detail=False, methods=['get'])
+    def lookup(self, request):
+        """
+        جستجوی معکوس: دانشجویان و اساتیدی که هر شماره یا ایمیل به آن‌ها تعلق دارد
+        شماره‌ها با هر قالبی (مثلاً 09121234567 یا ‎+98 912 123 4567) و ایمیل‌ها بدون توجه به بزرگی حروف پذیرفته می‌شوند.
+        """
+        values = [value.strip() for value in request.query_params.getlist('value') if value.strip()]
+        if not values:
+            raise ValidationError({'value': 'حداقل یک شماره یا ایمیل لازم است.'})
+        if len(values) > self.max_lookup_values:
+            raise ValidationError({'value': f'حداکثر {self.max_lookup_values} مقدار در هر جستجو مجاز است.'})
+        return Response({'results': find_owners(values)})
+
+class ChangeEventViewSet(viewsets.GenericViewSet):
+    """
+    API فید تغییرات دانشجویان، کلاس‌ها، ثبت‌نام‌ها و اتاق‌ها (فقط خواندنی)
+    - GET /api/changes/?since=<sequence>: رویدادهای با شماره ترتیب بزرگ‌تر از since به ترتیب ثبت
+    پارامترهای اختیاری:
+    - limit: حداکثر تعداد رویداد در هر پاسخ (پیش‌فرض 500، حداکثر 1000)
+    - model: فیلتر بر اساس نام مدل، مثلاً model=enrollment,student
+    پاسخ شامل next_since است که باید در درخواست بعدی به عنوان since ارسال شود.
+    پاسخ‌ها:
+    - 200: موفقیت
+    - 400: خطای ورودی
+    """
+    queryset = ChangeEvent.objects.order_by('id')
+    serializer_class = ChangeEventSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    default_limit = 500
+    max_limit = 1000
+
+    def _int_param(self, name, default):
+        value = self.request.query_params.get(name, default)
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            raise ValidationError({name: 'باید یک عدد صحیح باشد.'})
+        if value < 0:
+            raise ValidationError({name: 'نمی‌تواند منفی باشد.'})
+        return value
+
+    def list(self, request):
+        since = self._int_param('since', 0)
+        limit = min(self._int_param('limit', self.default_limit), self.max_limit) or self.default_limit
+
+        queryset = self.get_queryset().filter(id__gt=since)
+        models = request.query_params.get('model')
+        if models:
+            queryset = queryset.filter(model__in=[name.strip().lower() for name in models.split(',')])
+
+        events = list(queryset[:limit + 1])
+        has_more = len(events) > limit
+        events = events[:limit]
+        return Response({
+            'events': self.get_serializer(events, many=True).data,
+            'next_since': events[-1].id if events else since,
+            'has_more': has_more,
+        })
+
+class JobViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    API کارهای پس‌زمینه (محاسبات سنگین خارج از مسیر درخواست)
+    - POST /api/jobs/: ثبت کار، مثلاً {"kind": "timetable_clashes", "params": {"term": 3}}
+    - GET /api/jobs/: لیست کارها؛ فیلترهای اختیاری ?status=Q|R|S|F و ?kind=
+    - GET /api/jobs/<id>/: وضعیت و پیشرفت کار
+    - GET /api/jobs/<id>/result/: نتیجه کار انجام‌شده
+    انواع کار: graduation، transcripts، rankings، timetable_clashes و utilization (دو مورد آخر با پارامتر term)
+    کارها با دستور manage.py run_jobs اجرا می‌شوند.
+    پاسخ‌ها:
+    - 200: موفقیت
+    - 201: کار در صف قرار گرفت
+    - 400: خطای ورودی
+    - 404: کار یافت نشد
+    - 409: کار هنوز تمام نشده یا ناموفق بوده است
+    """
+    queryset = Job.objects.all()
+    serializer_class = JobSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = StandardPagination
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            for param in ('status', 'kind'):
+                value = self.request.query_params.get(param)
+                if value:
+                    queryset = queryset.filter(**{param: value})
+        return queryset
+
+    @action(detail=True, methods=['get'])
+    def result(self, request, pk=None):
+        """نتیجه کار؛ فقط برای کارهای موفق"""
+        job = self.get_object()
+        if job.status != Job.Status.SUCCEEDED:
+            return Response(
+                {'id': job.pk, 'status': job.status, 'error': job.error,
+                 'detail': 'کار هنوز تمام نشده یا ناموفق بوده است.'},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return Response({'id': job.pk, 'status': job.status, 'result': job.result})
+
+class BatchView(APIView):
+    """
+    API دسته‌ای برای اجرای چند درخواست در یک رفت و برگشت
+    - POST /api/batch/: بدنه به شکل {"requests": [{"id": "me", "method": "GET", "path": "students/5/"}, ...], "parallel": false}
+    هر زیردرخواست با همان کاربر و نشست درخواست اصلی اجرا و مجوزهای endpoint خودش روی آن بررسی می‌شود.
+    با parallel=true زیردرخواست‌های فقط خواندنی به صورت موازی اجرا می‌شوند.
+    پاسخ: {"responses": [{"id": ..., "status": ..., "body": ...}, ...]} به ترتیب زیردرخواست‌ها
+    پاسخ‌ها:
+    - 200: اجرا شد (وضعیت هر زیردرخواست در status آن است)
+    - 400: خطای ورودی یا بیش از حد مجاز بودن تعداد زیردرخواست‌ها
+    """
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        serializer = BatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        responses = run_batch(request, serializer.validated_data['requests'], serializer.validated_data['parallel'])
+        return Response({'responses': responses})
+
+class StatsView(APIView):
+    """
+    API آمار داشبورد (کش‌شده)
+    - GET /api/stats/: تعداد دانشجویان هر دانشکده و رشته، کلاس‌های ترم جاری،
+      ثبت‌نام‌ها بر اساس وضعیت و اساتید بر اساس نوع قرارداد
+    پاسخ‌ها:
+    - 200: موفقیت
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        return Response(get_stats())
+
+class RankingView(APIView):
+    """
+    API برترین دانشجویان از نظر معدل در یک رشته و سال ورود
+    - GET /api/rankings/?major=<id>&entry_year=1400&limit=100
+    آخرین رتبه‌بندی ذخیره‌شده گروه برگردانده می‌شود و درخواست هیچ محاسبه یا نوشتنی انجام نمی‌دهد.
+    stale یعنی نمرات گروه پس از refreshed_at تغییر کرده‌اند؛ کار پس‌زمینه rankings گروه‌های قدیمی را دوباره محاسبه می‌کند.
+    پاسخ‌ها:
+    - 200: موفقیت
+    - 400: خطای ورودی
+    """
+    permission_classes = [AllowAny]
+    default_limit = 100
+    max_limit = 1000
+
+    def get(self, request):
+        major = request.query_params.get('major', '')
+        entry_year = request.query_params.get('entry_year', '')
+        limit = request.query_params.get('limit', str(self.default_limit))
+        errors = {}
+        if not major.isdigit() or not Major.objects.filter(pk=major).exists():
+            errors['major'] = 'رشته یافت نشد.'
+        if not (entry_year.isdigit() and len(entry_year) == 4):
+            errors['entry_year'] = 'سال ورود باید 4 رقم باشد.'
+        if not limit.isdigit() or not 1 <= int(limit) <= self.max_limit:
+            errors['limit'] = f'limit باید بین 1 و {self.max_limit} باشد.'
+        if errors:
+            raise ValidationError(errors)
+        return Response(top_students(int(major), entry_year, int(limit)))
+
+# حداکثر تعداد کلاس قابل مشاهده در یک اتصال
+SEAT_STREAM_MAX_CLASSES = 1000
+
+async def seat_stream(request):
+    """
+    جریان زنده ظرفیت کلاس‌ها با Server-Sent Events (فقط روی سرور ASGI، Config/asgi.py)
+    - GET /api/seats/stream/?classes=1,2,3 یا ?term=<id> (پیش‌فرض: کلاس‌های ترم جاری)
+    رویداد snapshot وضعیت فعلی همه کلاس‌ها و هر رویداد seats وضعیت کلاس‌هایی است که از پیام قبل
+    ثبت‌نامشان ایجاد یا حذف یا ظرفیتشان ویرایش شده است: [{"class", "enrolled", "capacity", "remaining"}, ...]
+    پاسخ‌ها:
+    - 200: جریان text/event-stream
+    - 400: خطای ورودی
+    - 501: سرور WSGI (مانند runserver) که پاسخ بی‌پایان را پیش از ارسال کامل می‌خواند
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {'detail': 'جریان ظرفیت کلاس‌ها فقط روی سرور ASGI در دسترس است، مثلاً: uvicorn Config.asgi:application'},
+            status=501,
+        )
+    classes = request.GET.get('classes', '')
+    term = request.GET.get('term', '')
+    if classes:
+        values = [value.strip() for value in classes.split(',')]
+        if not all(value.isdigit() for value in values):
+            return JsonResponse({'classes': 'شناسه کلاس‌ها باید اعداد صحیح جدا شده با کاما باشند.'}, status=400)
+        class_ids = {int(value) for value in values}
+    elif term and not term.isdigit():
+        return JsonResponse({'term': 'باید یک عدد صحیح باشد.'}, status=400)
+    else:
+        class_ids = await sync_to_async(term_class_ids)(int(term) if term else None)
+    if len(class_ids) > SEAT_STREAM_MAX_CLASSES:
+        return JsonResponse({'classes': f'حداکثر {SEAT_STREAM_MAX_CLASSES} کلاس در هر اتصال مجاز است.'}, status=400)
+
+    response = StreamingHttpResponse(seat_events(class_ids), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # جلوگیری از بافر شدن پاسخ در nginx
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 def api_docs(request):
     """
     نمایش صفحه مستندات API
     """
-    return render(request, 'api_docs.html')
+    return render(request, 'EducationApp/api_docs.html')
 
 def welcome(request):
     """
-    نمایش صفحه خوش‌آمدگویی
+    نمایش صفحه خوش‌آمدگویی به همراه آمار کش‌شده داشبورد
     """
-    return render(request, 'EducationApp/welcome.html')
\ No newline at end of file
+    return render(request, 'EducationApp/welcome.html', {'stats': get_stats()})
\ No newline at end of file
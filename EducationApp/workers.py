@@ -0,0 +1,48 @@
+"""
+ابزار مشترک برای اجرای پردازش‌های سنگین در pool پردازه‌ها
+
+این ماژول نباید در سطح ماژول مدل‌ها را import کند، چون در پردازه‌های spawn شده
+(مثلاً روی ویندوز) ابتدا باید django.setup() اجرا شود.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+def init_worker():
+    """آماده‌سازی جنگو در پردازه فرزند و کنار گذاشتن اتصال‌های پایگاه داده به ارث رسیده"""
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+    from django.db import connections
+    connections.close_all()
+
+
+def default_workers():
+    """تعداد پیش‌فرض پردازه‌ها برابر تعداد هسته‌های پردازنده"""
+    return os.cpu_count() or 1
+
+
+def process_pool(workers=None):
+    """
+    ساخت ProcessPoolExecutor برای اجرای موازی؛ اتصال‌های پردازه اصلی پیش از fork بسته می‌شوند
+    تا بین پردازه‌ها به اشتراک گذاشته نشوند.
+    """
+    from django.db import connections
+    connections.close_all()
+    return ProcessPoolExecutor(max_workers=workers or default_workers(), initializer=init_worker)
+
+
+def pk_ranges(queryset, size):
+    """بازه‌های [شروع، پایان) کلید اصلی سطرهای queryset برای تقسیم کار بین پردازه‌ها"""
+    from django.db.models import Max, Min
+    bounds = queryset.aggregate(first=Min('pk'), last=Max('pk'))
+    if bounds['first'] is None:
+        return []
+    return [(start, start + size) for start in range(bounds['first'], bounds['last'] + 1, size)]
+
+
+def batched(items, size):
+    """تقسیم لیست به دسته‌های با اندازه حداکثر size"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
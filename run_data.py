@@ -1,9 +1,15 @@
 import os
+import sys
 import django
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Config.settings')
 django.setup()
 
 from EducationApp import generate_data
+from EducationApp.snapshots import restore_snapshot
 
 if __name__ == '__main__':
-    generate_data.generate_sample_data()
\ No newline at end of file
+    # python run_data.py [نام snapshot]: بازیابی snapshot آماده به جای تولید دوباره داده
+    if len(sys.argv) > 1:
+        restore_snapshot(sys.argv[1])
+    else:
+        generate_data.generate_sample_data()